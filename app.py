@@ -3,6 +3,8 @@ from PyQt5 import QtWidgets
 from sqlalchemy import text
 from database import engine, db_session, close_session
 from models import Base
+from services.attendance_rollup import AttendanceRollup
+from services.schema_upgrade import SchemaUpgrade
 from views import LoginWindow
 from views import MainWindow
 from utils import get_logger
@@ -19,6 +21,21 @@ if __name__ == "__main__":
             session.execute(text("SELECT 1"))  # Обернули в text()
             logger.info("Database connection successful")
 
+            # Индексы, добавленные в модели после создания таблиц
+            SchemaUpgrade.ensure_indexes(session)
+            session.commit()
+
+            # Ограничения пересечения занятий для таблицы, созданной до их появления
+            added = SchemaUpgrade.ensure_lesson_constraints(session)
+            session.commit()
+            if added:
+                logger.info(f"Lesson constraints added: {', '.join(added)}")
+
+            # Заполняем сводку посещаемости, если она создана только что
+            if AttendanceRollup.ensure_built(session):
+                session.commit()
+                logger.info("Attendance rollup built")
+
         app = QtWidgets.QApplication(sys.argv)
 
         # # Загрузка стилей
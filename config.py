@@ -19,6 +19,13 @@ class Config:
     LOG_MAX_SIZE = 1024 * 1024  # 1 MB
     LOG_BACKUP_COUNT = 5
 
+    # Кэш результатов отчетов и статистики
+    REPORT_CACHE_SIZE = 64
+    REPORT_CACHE_TTL = 300  # секунд
+
+    # Расписание: длительность занятия (пары) для проверки пересечений
+    LESSON_DURATION_MINUTES = 90
+
     # Автоматическое создание необходимых директорий
     LOGS_PATH.mkdir(exist_ok=True, parents=True)
 
@@ -2,10 +2,10 @@ from .base import Base
 from .user import User
 from .student import Student
 from .lesson import Lesson
-from .attendance import Attendance
+from .attendance import Attendance, AttendanceDaily
 from .group import Group
 from .teacher import Teacher, Subject, TeacherSubject
 
-__all__ = ['Base', 'User', 'Student', 'Lesson', 'Attendance', 'Group', 'Teacher', 'Subject', 'TeacherSubject']
+__all__ = ['Base', 'User', 'Student', 'Lesson', 'Attendance', 'AttendanceDaily', 'Group', 'Teacher', 'Subject', 'TeacherSubject']
 
 
@@ -1,8 +1,18 @@
-from sqlalchemy import Column, Integer, ForeignKey, String, CheckConstraint, Text, TIMESTAMP
+from sqlalchemy import Column, Integer, ForeignKey, String, CheckConstraint, Text, TIMESTAMP, Index, Date
 from sqlalchemy.orm import relationship
 from models import Base
 
 
+# Статусы посещаемости в порядке пунктов выбора и их подписи
+STATUS_CODES = [None, 'present', 'absent', 'late', 'sick']
+STATUS_LABELS = {
+    None: "Не отмечено",
+    'present': "Присутствовал",
+    'absent': "Отсутствовал",
+    'late': "Опоздал",
+    'sick': "Болеет"
+}
+
 class Attendance(Base):
     __tablename__ = 'attendance'
 
@@ -14,6 +24,11 @@ class Attendance(Base):
     student = relationship("Student", back_populates="attendance")
     lesson = relationship("Lesson", back_populates="attendance")
 
+    __table_args__ = (
+        # Первичный ключ начинается со student_id, поиск по занятию нужен отдельно
+        Index('ix_attendance_lesson_id', 'lesson_id'),
+    )
+
     def __repr__(self):
         return (f"<Attendance(student_id={self.student_id}, lesson_id={self.lesson_id}, status='{self.status}'")
 
@@ -35,5 +50,30 @@ class AttendanceReport(Base):
         return f"<AttendanceReport(id={self.id}, student_id={self.student_id}, lesson_id={self.lesson_id}, report_date={self.report_date}, status='{self.status}')>"
 
 
+class AttendanceDaily(Base):
+    """Сводка посещаемости за день по группе и предмету.
+
+    Строки пересчитываются при каждой записи посещаемости (см.
+    services.attendance_rollup), поэтому отчеты и графики за месяц или семестр
+    читают O(дни x группы) строк вместо всех отметок.
+    """
+    __tablename__ = 'attendance_daily'
 
+    day = Column(Date, primary_key=True)
+    group_id = Column(Integer, ForeignKey('groups.id'), primary_key=True)
+    subject_id = Column(Integer, ForeignKey('subjects.id'), primary_key=True)
+    lesson_count = Column(Integer, nullable=False, default=0)
+    expected_count = Column(Integer, nullable=False, default=0)  # Студенты группы x занятия
+    present_count = Column(Integer, nullable=False, default=0)
+    late_count = Column(Integer, nullable=False, default=0)
+    absent_count = Column(Integer, nullable=False, default=0)
+    sick_count = Column(Integer, nullable=False, default=0)
 
+    __table_args__ = (
+        # Первичный ключ начинается с дня, выборки по группе за период идут отдельно
+        Index('ix_attendance_daily_group_id_day', 'group_id', 'day'),
+    )
+
+    def __repr__(self):
+        return (f"<AttendanceDaily(day={self.day}, group_id={self.group_id}, subject_id={self.subject_id},"
+                f" present={self.present_count}, expected={self.expected_count})>")
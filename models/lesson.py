@@ -1,5 +1,6 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, TIMESTAMP
+from sqlalchemy import Column, Integer, String, ForeignKey, TIMESTAMP, Index, DDL, event
 from sqlalchemy.orm import relationship
+from config import Config
 from models import Base
 
 
@@ -18,13 +19,42 @@ class Lesson(Base):
     attendance = relationship("Attendance", back_populates="lesson")  # Добавлено обратное отношение
     group = relationship("Group")
 
+    __table_args__ = (
+        # Выборки занятий за период для группы и для преподавателя
+        Index('ix_lessons_group_id_date_time', 'group_id', 'date_time'),
+        Index('ix_lessons_teacher_id_date_time', 'teacher_id', 'date_time'),
+        # Постраничный отчет по всем студентам идет в порядке date_time
+        Index('ix_lessons_date_time', 'date_time'),
+    )
+
     def __repr__(self):
         return (f"<Lesson(id={self.id}, subject_id={self.subject_id}, date_time={self.date_time},"
                 f" location='{self.location}')>")
 
 
+# Ограничения PostgreSQL: у преподавателя, группы и аудитории не может быть
+# пересекающихся по времени занятий. Проверка в приложении (services.schedule_conflicts)
+# сообщает о конфликте заранее, ограничения гарантируют это и при параллельной записи.
+# Для равенства целых и строк в индексе GiST нужно расширение btree_gist.
+LESSON_PERIOD = f"tsrange(date_time, date_time + interval '{Config.LESSON_DURATION_MINUTES} minutes')"
+LESSON_EXCLUSION_CONSTRAINTS = (
+    ('ex_lessons_teacher_id_period', 'teacher_id', "date_time IS NOT NULL"),
+    ('ex_lessons_group_id_period', 'group_id', "date_time IS NOT NULL"),
+    ('ex_lessons_location_period', 'location',
+     "date_time IS NOT NULL AND location IS NOT NULL AND location <> ''"),
+)
 
+BTREE_GIST_DDL = "CREATE EXTENSION IF NOT EXISTS btree_gist"
 
 
+def exclusion_constraint_ddl(constraint_name, column, condition) -> str:
+    """ALTER TABLE для ограничения из LESSON_EXCLUSION_CONSTRAINTS (и при создании таблицы,
+    и при дополнении существующей БД в services.schema_upgrade)"""
+    return (f"ALTER TABLE lessons ADD CONSTRAINT {constraint_name} "
+            f"EXCLUDE USING gist ({column} WITH =, {LESSON_PERIOD} WITH &&) WHERE ({condition})")
 
 
+event.listen(Lesson.__table__, 'after_create', DDL(BTREE_GIST_DDL).execute_if(dialect='postgresql'))
+for constraint in LESSON_EXCLUSION_CONSTRAINTS:
+    event.listen(Lesson.__table__, 'after_create',
+                 DDL(exclusion_constraint_ddl(*constraint)).execute_if(dialect='postgresql'))
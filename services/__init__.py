@@ -1,4 +1,13 @@
 from .auth import AuthService
+from .attendance_service import AttendanceService
+from .attendance_rollup import AttendanceRollup
 from .report_generator import ReportGenerator
+from .report_queries import ReportQueries
+from .query_executor import QueryExecutor, get_query_executor
+from .report_cache import ReportCache, get_report_cache
+from .trend_analytics import TrendAnalytics
+from .lesson_generator import LessonGenerator
+from .schedule_conflicts import ScheduleConflicts
+from .schema_upgrade import SchemaUpgrade
 
-__all__ = ['AuthService', 'ReportGenerator']
\ No newline at end of file
+__all__ = ['AuthService', 'AttendanceService', 'AttendanceRollup', 'ReportGenerator', 'ReportQueries', 'QueryExecutor', 'get_query_executor', 'ReportCache', 'get_report_cache', 'TrendAnalytics', 'LessonGenerator', 'ScheduleConflicts', 'SchemaUpgrade']
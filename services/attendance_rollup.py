@@ -0,0 +1,122 @@
+from sqlalchemy import and_, or_, delete, distinct, insert, select, tuple_
+from sqlalchemy.dialects.postgresql import insert as upsert
+from sqlalchemy.sql import func, case
+
+from models import Student, Attendance, Lesson, AttendanceDaily
+from utils.date_ranges import day_range
+
+
+class AttendanceRollup:
+    """Поддержка сводки посещаемости attendance_daily.
+
+    Сводка пересчитывается не целиком, а только для затронутых пар
+    (группа, день): после сохранения отметок, изменения занятий или
+    состава группы. Пересчет идет одним INSERT ... SELECT ... ON CONFLICT
+    из исходных таблиц, поэтому параллельные сохранения за одну группу и день
+    не конфликтуют по первичному ключу сводки.
+    """
+
+    COLUMNS = [
+        'day', 'group_id', 'subject_id', 'lesson_count', 'expected_count',
+        'present_count', 'late_count', 'absent_count', 'sick_count'
+    ]
+
+    @staticmethod
+    def aggregate_query(db):
+        """Агрегаты посещаемости по (день, группа, предмет) из исходных таблиц"""
+        lesson_day = func.date(Lesson.date_time)
+
+        def status_count(status):
+            return func.count(case((Attendance.status == status, 1)))
+
+        return db.query(
+            lesson_day,
+            Lesson.group_id,
+            Lesson.subject_id,
+            func.count(distinct(Lesson.id)),
+            func.count(Student.id),
+            status_count('present'),
+            status_count('late'),
+            status_count('absent'),
+            status_count('sick')
+        ).outerjoin(Student, Student.group_id == Lesson.group_id)\
+         .outerjoin(Attendance, (Attendance.lesson_id == Lesson.id) & (Attendance.student_id == Student.id))\
+         .group_by(lesson_day, Lesson.group_id, Lesson.subject_id)
+
+    @staticmethod
+    def refresh(db, scope):
+        """Пересчитывает сводку для набора пар (group_id, день).
+
+        День None означает все дни группы (например, после перевода студента).
+        Фиксацию транзакции выполняет вызывающий код.
+        """
+        if not scope:
+            return
+
+        source, target = [], []
+        for group_id, day in scope:
+            if day is None:
+                source.append(Lesson.group_id == group_id)
+                target.append(AttendanceDaily.group_id == group_id)
+            else:
+                day_start, day_end = day_range(day)
+                source.append(and_(Lesson.group_id == group_id,
+                                   Lesson.date_time >= day_start, Lesson.date_time < day_end))
+                target.append(and_(AttendanceDaily.group_id == group_id, AttendanceDaily.day == day))
+
+        # Строки, ключей которых больше нет (занятие удалено или перенесено)
+        lesson_day = func.date(Lesson.date_time)
+        current_keys = select(lesson_day, Lesson.group_id, Lesson.subject_id)\
+            .where(or_(*source), Lesson.date_time.isnot(None))
+        db.execute(delete(AttendanceDaily).where(
+            or_(*target),
+            tuple_(AttendanceDaily.day, AttendanceDaily.group_id, AttendanceDaily.subject_id).notin_(current_keys)
+        ))
+
+        query = AttendanceRollup.aggregate_query(db).filter(or_(*source))
+        stmt = upsert(AttendanceDaily).from_select(AttendanceRollup.COLUMNS, query.statement)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[AttendanceDaily.day, AttendanceDaily.group_id, AttendanceDaily.subject_id],
+            set_={column: stmt.excluded[column] for column in AttendanceRollup.COLUMNS[3:]}  # Счетчики после ключа
+        )
+        db.execute(stmt)
+
+    @staticmethod
+    def refresh_lessons(db, lesson_ids):
+        """Пересчитывает сводку за дни и группы указанных занятий"""
+        if not lesson_ids:
+            return
+        rows = db.query(Lesson.group_id, Lesson.date_time).filter(Lesson.id.in_(set(lesson_ids))).all()
+        AttendanceRollup.refresh(db, {(group_id, date_time.date()) for group_id, date_time in rows})
+
+    @staticmethod
+    def scope_of(db, model_class, item_id):
+        """Пары (group_id, день), на которые влияет запись занятия или студента.
+
+        Значения читаются из БД, поэтому перед вызовом изменения нужно сбросить flush().
+        """
+        if model_class is Lesson:
+            row = db.query(Lesson.group_id, Lesson.date_time).filter(Lesson.id == item_id).first()
+            return {(row.group_id, row.date_time.date())} if row and row.date_time else set()
+        if model_class is Student:
+            row = db.query(Student.group_id).filter(Student.id == item_id).first()
+            return {(row.group_id, None)} if row else set()
+        return set()
+
+    @staticmethod
+    def rebuild(db):
+        """Полностью пересобирает сводку из исходных таблиц"""
+        db.execute(delete(AttendanceDaily))
+        AttendanceRollup._insert(db, AttendanceRollup.aggregate_query(db))
+
+    @staticmethod
+    def ensure_built(db) -> bool:
+        """Заполняет сводку, если таблица пуста, а занятия уже есть (первый запуск)"""
+        if db.query(AttendanceDaily.day).first() is not None or db.query(Lesson.id).first() is None:
+            return False
+        AttendanceRollup.rebuild(db)
+        return True
+
+    @staticmethod
+    def _insert(db, query):
+        db.execute(insert(AttendanceDaily).from_select(AttendanceRollup.COLUMNS, query.statement))
@@ -0,0 +1,68 @@
+from sqlalchemy import delete, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from models import Student, Attendance, Lesson, Subject, Group
+from utils.date_ranges import day_range
+from services.attendance_rollup import AttendanceRollup
+
+
+class AttendanceService:
+    @staticmethod
+    def day_roster_query(db, selected_date, subject_id=None, group_id=None, teacher_id=None):
+        """Запрос студентов и занятий за день.
+
+        Идентификатор занятия выбирается в том же соединении, поэтому загрузка
+        списка стоит один запрос независимо от размера группы.
+        """
+        day_start, day_end = day_range(selected_date)
+        query = db.query(
+            Student.id, Student.full_name, Group.name.label('group_name'),
+            Subject.name.label('subject_name'), Lesson.id.label('lesson_id'),
+            Lesson.date_time, Attendance.status
+        ).join(Group, Group.id == Student.group_id)\
+         .join(Lesson, Lesson.group_id == Student.group_id)\
+         .join(Subject, Subject.id == Lesson.subject_id)\
+         .outerjoin(Attendance, (Attendance.student_id == Student.id) & (Attendance.lesson_id == Lesson.id))\
+         .filter(Lesson.date_time >= day_start, Lesson.date_time < day_end)
+
+        if subject_id:
+            query = query.filter(Lesson.subject_id == subject_id)
+        if group_id:
+            query = query.filter(Student.group_id == group_id)
+        if teacher_id:
+            query = query.filter(Lesson.teacher_id == teacher_id)
+
+        return query
+
+    @staticmethod
+    def save_changes(db, changes: dict) -> int:
+        """Пакетное сохранение измененных отметок.
+
+        changes: {(student_id, lesson_id): status}, где пустой статус означает
+        удаление отметки. Все отметки записываются одним INSERT ... ON CONFLICT,
+        а снятые удаляются одним DELETE; затем в той же транзакции пересчитывается
+        сводка attendance_daily за затронутые дни. Фиксацию транзакции выполняет
+        вызывающий код.
+        """
+        upserts = [
+            {'student_id': student_id, 'lesson_id': lesson_id, 'status': status}
+            for (student_id, lesson_id), status in changes.items() if status
+        ]
+        removals = [key for key, status in changes.items() if not status]
+
+        if upserts:
+            stmt = insert(Attendance).values(upserts)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[Attendance.student_id, Attendance.lesson_id],
+                set_={'status': stmt.excluded.status}
+            )
+            db.execute(stmt)
+
+        if removals:
+            db.execute(
+                delete(Attendance).where(
+                    tuple_(Attendance.student_id, Attendance.lesson_id).in_(removals)
+                )
+            )
+
+        AttendanceRollup.refresh_lessons(db, {lesson_id for _, lesson_id in changes})
+        return len(upserts) + len(removals)
@@ -0,0 +1,73 @@
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import insert
+
+from models import Lesson
+from services.attendance_rollup import AttendanceRollup
+
+
+class LessonGenerator:
+    """Создание занятий семестра по недельному шаблону.
+
+    Шаблон - пары (день недели, время), где понедельник = 0. Занятия на все
+    подходящие даты периода, кроме праздников, собираются в памяти и
+    добавляются одним пакетным INSERT в одной транзакции; предпросмотр
+    (dry run) строит те же строки без записи в БД.
+    """
+
+    @staticmethod
+    def parse_holidays(text: str) -> set:
+        """Даты праздников из строки вида '04.11.2024, 30.12.2024-08.01.2025'.
+
+        Диапазон через дефис включает обе границы. Неверный формат вызывает ValueError.
+        """
+        holidays = set()
+        for part in text.replace(';', ',').split(','):
+            part = part.strip()
+            if not part:
+                continue
+            first, _, last = part.partition('-')
+            start = datetime.strptime(first.strip(), '%d.%m.%Y').date()
+            end = datetime.strptime(last.strip(), '%d.%m.%Y').date() if last else start
+            if end < start:
+                raise ValueError(f"Конец периода раньше начала: {part}")
+            holidays.update(start + timedelta(days=i) for i in range((end - start).days + 1))
+        return holidays
+
+    @staticmethod
+    def occurrences(start: date, end: date, pattern, holidays=()):
+        """Даты и время занятий по шаблону за [start, end] без праздников, по порядку"""
+        times_by_weekday = {}
+        for weekday, lesson_time in pattern:
+            times_by_weekday.setdefault(weekday, set()).add(lesson_time)
+        holidays = set(holidays)
+        result = []
+        day = start
+        while day <= end:
+            if day not in holidays:
+                result.extend(datetime.combine(day, t) for t in sorted(times_by_weekday.get(day.weekday(), ())))
+            day += timedelta(days=1)
+        return result
+
+    @staticmethod
+    def build_rows(start, end, pattern, group_id, teacher_id, subject_id, location=None, holidays=()):
+        """Строки таблицы lessons для пакетной вставки (и для предпросмотра)"""
+        return [
+            {'subject_id': subject_id, 'teacher_id': teacher_id, 'group_id': group_id,
+             'date_time': date_time, 'location': location}
+            for date_time in LessonGenerator.occurrences(start, end, pattern, holidays)
+        ]
+
+    @staticmethod
+    def create(db, rows) -> int:
+        """Добавляет занятия одним пакетным INSERT и пересчитывает сводку их дней.
+
+        Фиксацию транзакции выполняет вызывающий код: при ошибке не будет
+        добавлено ни одного занятия.
+        """
+        if not rows:
+            return 0
+        db.execute(insert(Lesson), rows)
+        AttendanceRollup.refresh(db, {(row['group_id'], row['date_time'].date()) for row in rows})
+        return len(rows)
+
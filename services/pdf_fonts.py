@@ -0,0 +1,118 @@
+import os
+import shutil
+import subprocess
+import threading
+
+from config import Config
+from utils import get_logger
+
+logger = get_logger()
+
+# Имя, под которым шрифт с кириллицей регистрируется в reportlab
+PDF_FONT_NAME = 'CustomFont'
+# Встроенный шрифт reportlab на случай, если шрифт с кириллицей не найден
+FALLBACK_FONT_NAME = 'Helvetica'
+
+# Известные расположения шрифтов с кириллицей по системам
+LINUX_FONT_PATHS = (
+    '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf',  # Debian, Ubuntu
+    '/usr/share/fonts/dejavu-sans-fonts/DejaVuSans.ttf',  # Fedora
+    '/usr/share/fonts/dejavu/DejaVuSans.ttf',  # CentOS, openSUSE
+    '/usr/share/fonts/TTF/DejaVuSans.ttf',  # Arch
+    '/usr/share/fonts/truetype/liberation/LiberationSans-Regular.ttf',
+)
+MACOS_FONT_PATHS = (
+    '/System/Library/Fonts/Supplemental/Arial.ttf',
+    '/Library/Fonts/Arial.ttf',
+)
+
+_lock = threading.Lock()
+_font_name = None
+_table_style = None
+
+
+def _fontconfig_path():
+    """Путь к шрифту Sans с кириллицей по данным fontconfig (Linux)"""
+    fc_match = shutil.which('fc-match')
+    if not fc_match:
+        return None
+    try:
+        result = subprocess.run([fc_match, '-f', '%{file}', 'DejaVu Sans:lang=ru'],
+                                capture_output=True, text=True, timeout=5)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    path = result.stdout.strip()
+    # reportlab читает только TrueType
+    return path if result.returncode == 0 and path.lower().endswith('.ttf') else None
+
+
+def font_candidates():
+    """Пути к шрифтам с кириллицей в порядке предпочтения.
+
+    Генератор: fontconfig опрашивается, только если шрифта нет в папке проекта
+    и в системной папке Windows.
+    """
+    yield os.path.join(Config.BASE_DIR, 'fonts', 'DejaVuSans.ttf')
+    windir = os.environ.get('WINDIR')
+    if windir:
+        yield os.path.join(windir, 'Fonts', 'arial.ttf')
+    fontconfig_path = _fontconfig_path()
+    if fontconfig_path:
+        yield fontconfig_path
+    yield from LINUX_FONT_PATHS
+    yield from MACOS_FONT_PATHS
+
+
+def pdf_font_name() -> str:
+    """Регистрирует шрифт с кириллицей один раз на процесс и возвращает его имя.
+
+    Если ни один из шрифтов не найден, используется встроенный Helvetica
+    (кириллица в нем не отображается, но отчет строится).
+    """
+    global _font_name
+    if _font_name is not None:
+        return _font_name
+
+    with _lock:
+        if _font_name is None:
+            from reportlab.pdfbase import pdfmetrics
+            from reportlab.pdfbase.ttfonts import TTFont
+
+            font_name = FALLBACK_FONT_NAME
+            for path in font_candidates():
+                if not os.path.isfile(path):
+                    continue
+                try:
+                    pdfmetrics.registerFont(TTFont(PDF_FONT_NAME, path))
+                except Exception as e:
+                    logger.error(f"Не удалось загрузить шрифт {path}: {str(e)}")
+                    continue
+                logger.info(f"Шрифт PDF-отчетов: {path}")
+                font_name = PDF_FONT_NAME
+                break
+            else:
+                logger.error("Шрифт с кириллицей не найден, PDF-отчеты используют Helvetica")
+            _font_name = font_name
+    return _font_name
+
+
+def pdf_table_style():
+    """Общий для процесса стиль таблиц PDF-отчетов"""
+    global _table_style
+    if _table_style is None:
+        from reportlab.lib import colors
+        from reportlab.platypus import TableStyle
+
+        font_name = pdf_font_name()
+        _table_style = TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('FONTNAME', (0, 0), (-1, 0), font_name),
+            ('FONTNAME', (0, 1), (-1, -1), font_name),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black),
+            ('ENCODING', (0, 0), (-1, -1), 'utf-8')
+        ])
+    return _table_style
@@ -0,0 +1,111 @@
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal, Qt
+from sqlalchemy.orm import Query
+
+from database import get_session
+from utils import get_logger
+
+logger = get_logger()
+
+
+class _QuerySignals(QObject):
+    finished = pyqtSignal(str, int, object)
+    failed = pyqtSignal(str, int, str)
+
+
+class _QueryTask(QRunnable):
+    """Выполняет функцию запроса в пуле потоков со своей сессией БД"""
+
+    def __init__(self, key, token, query_fn, args, kwargs, signals):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.key = key
+        self.token = token
+        self.query_fn = query_fn
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = signals
+
+    def run(self):
+        try:
+            with get_session() as db:
+                result = self.query_fn(db, *self.args, **self.kwargs)
+                if isinstance(result, Query):
+                    result = result.all()
+            self.signals.finished.emit(self.key, self.token, result)
+        except Exception as e:
+            self.signals.failed.emit(self.key, self.token, str(e))
+
+
+class QueryExecutor(QObject):
+    """Выполнение запросов вне потока GUI.
+
+    Запросы различаются ключом (например, 'schedule'). Новый запрос с тем же
+    ключом отменяет предыдущий: если тот еще в очереди, он снимается с пула,
+    а результат уже запущенного просто отбрасывается.
+    """
+
+    def __init__(self, pool=None):
+        super().__init__()
+        self.pool = pool or QThreadPool.globalInstance()
+        self.signals = _QuerySignals()
+        self.signals.finished.connect(self._on_finished, Qt.QueuedConnection)
+        self.signals.failed.connect(self._on_failed, Qt.QueuedConnection)
+        self._last_token = 0
+        self._pending = {}  # key -> (token, task, on_result, on_error)
+
+    def submit(self, key: str, query_fn, *args, on_result, on_error=None, **kwargs) -> int:
+        """Ставит query_fn(db, *args, **kwargs) в очередь; on_result получит строки в потоке GUI"""
+        self.cancel(key)
+        self._last_token += 1
+        task = _QueryTask(key, self._last_token, query_fn, args, kwargs, self.signals)
+        self._pending[key] = (self._last_token, task, on_result, on_error)
+        self.pool.start(task)
+        return self._last_token
+
+    def cancel(self, key: str):
+        pending = self._pending.pop(key, None)
+        if pending:
+            self.pool.tryTake(pending[1])
+
+    def is_pending(self, key: str) -> bool:
+        return key in self._pending
+
+    def _take(self, key, token):
+        pending = self._pending.get(key)
+        if not pending or pending[0] != token:
+            return None  # Устаревший результат
+        del self._pending[key]
+        return pending
+
+    def _on_finished(self, key, token, rows):
+        pending = self._take(key, token)
+        if pending:
+            pending[2](rows)
+
+    def _on_failed(self, key, token, message):
+        pending = self._take(key, token)
+        if not pending:
+            return
+        logger.error(f"Ошибка фонового запроса '{key}': {message}")
+        if pending[3]:
+            pending[3](message)
+
+
+_executor = None
+
+
+def get_query_executor() -> QueryExecutor:
+    """Возвращает общий исполнитель запросов приложения"""
+    global _executor
+    if _executor is None:
+        _executor = QueryExecutor()
+    return _executor
+
+
+def set_busy(widget, busy: bool):
+    """Показывает состояние загрузки вместо блокировки окна"""
+    widget.setEnabled(not busy)
+    if busy:
+        widget.setCursor(Qt.BusyCursor)
+    else:
+        widget.unsetCursor()
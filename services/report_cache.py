@@ -0,0 +1,80 @@
+import threading
+import time
+from collections import OrderedDict
+
+from config import Config
+from utils import get_logger
+
+logger = get_logger()
+
+
+class ReportCache:
+    """LRU-кэш результатов отчетов с ограниченным временем жизни.
+
+    Ключ - (тип отчета, параметры фильтров, версия данных). Запись отметок или
+    изменение справочников увеличивает версию, и старые результаты больше не
+    находятся; TTL ограничивает устаревание данных, измененных другими клиентами.
+    """
+
+    def __init__(self, max_entries=Config.REPORT_CACHE_SIZE, ttl=Config.REPORT_CACHE_TTL, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.clock = clock
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> (время сохранения, значение)
+        self._lock = threading.Lock()
+
+    def make_key(self, report_type, *args, **kwargs):
+        """Ключ для текущей версии данных; значения фильтров должны быть хэшируемыми"""
+        return report_type, args, tuple(sorted(kwargs.items())), self.version
+
+    def get(self, key):
+        """Возвращает (True, значение) при попадании или (False, None)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.clock() - entry[0] < self.ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, entry[1]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return False, None
+
+    def put(self, key, value):
+        with self._lock:
+            if key[-1] != self.version:
+                return  # Результат получен до изменения данных
+            self._entries[key] = (self.clock(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self):
+        """Сбрасывает кэш после записи данных"""
+        with self._lock:
+            self.version += 1
+            self._entries.clear()
+        logger.info(f"Кэш отчетов сброшен: {self.stats()}")
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'size': len(self._entries),
+            'hit_rate': round(self.hits / total, 3) if total else 0.0
+        }
+
+
+_cache = None
+
+
+def get_report_cache() -> ReportCache:
+    """Возвращает общий кэш отчетов приложения"""
+    global _cache
+    if _cache is None:
+        _cache = ReportCache()
+    return _cache
@@ -1,12 +1,49 @@
-from reportlab.lib.pagesizes import A4
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle
-from reportlab.lib import colors
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
-import openpyxl
+# reportlab и openpyxl импортируются внутри методов: библиотеки тяжелые
+# и нужны только при первом экспорте, а не при запуске приложения
 from config import Config
+from services.pdf_fonts import pdf_table_style
 from PyQt5.QtCore import QObject, pyqtSignal
+import csv
+import multiprocessing
 import os
+import re
+import tempfile
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from importlib.util import find_spec
+from itertools import chain, islice
+
+# Шаг, с которым Excel-экспорт сообщает о количестве записанных строк
+EXCEL_PROGRESS_STEP = 1000
+# Число первых строк, по которым оценивается ширина колонок
+EXCEL_WIDTH_SAMPLE_ROWS = 100
+EXCEL_MAX_COLUMN_WIDTH = 60
+# Размер порции строк для CSV- и Parquet-экспорта
+EXPORT_BATCH_ROWS = 5000
+CSV_BUFFER_SIZE = 1 << 20
+# Количество строк в одной порции таблицы PDF (примерно одна страница A4)
+PDF_ROWS_PER_PAGE = 35
+# Сколько листов пакетного экспорта держать в очереди на каждый процесс пула
+BATCH_QUEUE_PER_WORKER = 2
+
+
+class _ChunkedStory(list):
+    """Список flowables для doc.build, пополняемый по мере отрисовки.
+
+    doc.build забирает элементы из начала списка, пока len() не вернет 0;
+    когда список опустел, в него подкладывается следующая порция.
+    """
+
+    def __init__(self, chunks):
+        super().__init__()
+        self.chunks = chunks
+
+    def __len__(self):
+        if not super().__len__():
+            chunk = next(self.chunks, None)
+            if chunk is not None:
+                self.append(chunk)
+        return super().__len__()
 
 
 class ReportGenerator(QObject):
@@ -14,116 +51,318 @@ class ReportGenerator(QObject):
     
     def __init__(self):
         super().__init__()
-        # Регистрируем шрифт с поддержкой кириллицы
-        font_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'fonts')
-        if not os.path.exists(font_path):
-            os.makedirs(font_path)
-            
-        # Проверяем наличие шрифта DejaVuSans
-        dejavu_path = os.path.join(font_path, 'DejaVuSans.ttf')
-        if not os.path.exists(dejavu_path):
-            # Если шрифта нет, используем Arial из системы Windows
-            windows_font_path = os.path.join(os.environ['WINDIR'], 'Fonts', 'arial.ttf')
-            if os.path.exists(windows_font_path):
-                pdfmetrics.registerFont(TTFont('CustomFont', windows_font_path))
-            else:
-                # Если Arial не найден, используем стандартный Helvetica
-                pass
-        else:
-            pdfmetrics.registerFont(TTFont('CustomFont', dejavu_path))
-
-    def generate_attendance_pdf(self, data: list, filename: str) -> bool:
-        """Генерация PDF-отчета"""
+        self._batch_cancelled = False
+
+    @property
+    def pdf_table_style(self):
+        """Стиль таблиц PDF-отчета, общий для всех генераторов процесса.
+
+        Шрифт регистрируется при первом обращении (см. services.pdf_fonts).
+        """
+        return pdf_table_style()
+
+    @staticmethod
+    def _prepare_rows(data, headers=None):
+        """Возвращает заголовки и итератор строк отчета.
+
+        data — итератор строк (списков значений), тогда заголовки передаются
+        в headers, либо список словарей с метаданными _header_* в ключах.
+        Для пустых данных возвращает (None, None).
+        """
+        rows = iter(data)
+        first = next(rows, None)
+        if first is None:
+            return None, None
+        rows = chain([first], rows)
+
+        if headers is not None:
+            return list(headers), rows
+
+        # Получаем ключи из первого элемента данных, фильтруя метаданные
+        keys = [key for key in first.keys() if not key.startswith('_')]
+        # Получаем заголовки (значения) для каждого ключа - используем русские названия
+        headers = [first.get(f'_header_{key}', key) for key in keys]
+        return headers, ([item[key] for key in keys] for item in rows)
+
+    @staticmethod
+    def _resolve_path(filename: str) -> str:
+        # Use the filename directly or create a path in the reports directory
+        if ':' in filename or filename.startswith('/'):
+            return filename
+        reports_dir = Config.BASE_DIR / "ОТчеты"
+        reports_dir.mkdir(exist_ok=True, parents=True)
+        return f"{reports_dir}/{filename}"
+
+    def generate_attendance_pdf(self, data, filename: str, headers=None,
+                                rows_per_page: int = PDF_ROWS_PER_PAGE) -> bool:
+        """Генерация PDF-отчета.
+
+        Строки читаются из итератора порциями по rows_per_page и превращаются
+        в отдельные LongTable с повторяющимся заголовком. Следующая порция
+        создается только после отрисовки предыдущей, поэтому память не растет
+        с размером отчета. После каждой порции испускается progress_updated
+        с количеством выведенных строк.
+        """
         try:
-            # Use the filename directly or create a path in the reports directory
-            if ':' in filename or filename.startswith('/'):
-                file_path = filename
-            else:
-                reports_dir = Config.BASE_DIR / "ОТчеты"
-                reports_dir.mkdir(exist_ok=True, parents=True)
-                file_path = f"{reports_dir}/{filename}"
-                
+            from reportlab.lib.pagesizes import A4
+            from reportlab.platypus import SimpleDocTemplate, LongTable
+
+            file_path = self._resolve_path(filename)
             doc = SimpleDocTemplate(
                 file_path,
                 pagesize=A4
             )
 
             # Создание таблицы с динамическими заголовками
-            if not data:
+            headers, rows = self._prepare_rows(data, headers)
+            if headers is None:
                 return False
-                
-            # Получаем ключи из первого элемента данных, фильтруя метаданные
-            keys = [key for key in data[0].keys() if not key.startswith('_')]
-            # Получаем заголовки (значения) для каждого ключа - используем русские названия
-            headers = [data[0].get(f'_header_{key}', key) for key in keys]
-            
-            # Создание таблицы с динамическими заголовками
-            table_data = [headers]
-            
-            # Добавление данных
-            for item in data:
-                row = []
-                for key in keys:
-                    # Добавляем % к полю attendance, если оно существует
-                    if key == 'attendance':
-                        row.append(f"{item[key]}%")
-                    else:
-                        row.append(item[key])
-                table_data.append(row)
-
-            table = Table(table_data)
-            style = TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, 0), 'CustomFont'),
-                ('FONTNAME', (0, 1), (-1, -1), 'CustomFont'),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black),
-                ('ENCODING', (0, 0), (-1, -1), 'utf-8')
-            ])
-
-            table.setStyle(style)
-            doc.build([table])
+
+            # Ширины колонок считаются один раз, чтобы все страницы совпадали
+            # и ReportLab не измерял каждую порцию заново
+            first_chunk = list(islice(rows, rows_per_page))
+            col_widths = self._pdf_column_widths(headers, first_chunk, doc.width)
+
+            def table_chunks():
+                chunk = first_chunk
+                written = 0
+                while chunk:
+                    yield LongTable([headers] + chunk, colWidths=col_widths,
+                                    repeatRows=1, style=self.pdf_table_style)
+                    written += len(chunk)
+                    self.progress_updated.emit(written)
+                    chunk = list(islice(rows, rows_per_page))
+
+            doc.build(_ChunkedStory(table_chunks()))
             return True
         except Exception as e:
             print(f"PDF generation error: {str(e)}")
             return False
 
-    def generate_attendance_excel(self, data: list, filename: str) -> bool:
-        """Генерация Excel-отчета"""
+    @staticmethod
+    def _pdf_column_widths(headers, sample, total_width):
+        """Делит ширину страницы между колонками пропорционально длине текста"""
+        lengths = [
+            max([len(str(header))] + [len(str(row[idx])) for row in sample])
+            for idx, header in enumerate(headers)
+        ]
+        total = sum(lengths) or 1
+        return [total_width * length / total for length in lengths]
+
+    def generate_attendance_excel(self, data, filename: str, headers=None,
+                                  progress_step: int = EXCEL_PROGRESS_STEP) -> bool:
+        """Генерация Excel-отчета.
+
+        Книга открывается в режиме write_only: строки сразу уходят в файл и не
+        хранятся в памяти. Каждые progress_step строк испускается
+        progress_updated с количеством записанных строк.
+        """
         try:
-            wb = openpyxl.Workbook()
-            ws = wb.active
-            ws.title = "Отчет"
+            import openpyxl
+            from openpyxl.utils import get_column_letter
 
-            if not data:
+            wb = openpyxl.Workbook(write_only=True)
+            ws = wb.create_sheet("Отчет")
+
+            headers, rows = self._prepare_rows(data, headers)
+            if headers is None:
                 return False
-                
-            # Получаем ключи из первого элемента данных, фильтруя метаданные
-            keys = [key for key in data[0].keys() if not key.startswith('_')]
-            
+
+            # Ширину колонок нужно задать до первой строки, поэтому
+            # оцениваем ее по заголовкам и первым строкам отчета
+            sample = list(islice(rows, EXCEL_WIDTH_SAMPLE_ROWS))
+            for idx, header in enumerate(headers, start=1):
+                width = max([len(str(header))] + [len(str(row[idx - 1])) for row in sample])
+                ws.column_dimensions[get_column_letter(idx)].width = min(width + 2, EXCEL_MAX_COLUMN_WIDTH)
+            ws.freeze_panes = 'A2'
+
             # Заголовки (используем русские названия как заголовки)
-            headers = [data[0].get(f'_header_{key}', key) for key in keys]
-            ws.append(headers)
+            ws.append([self._excel_header_cell(ws, header) for header in headers])
 
             # Данные
-            for item in data:
-                row = [item[key] for key in keys]
+            written = 0
+            for row in chain(sample, rows):
                 ws.append(row)
-                
-            # Use the filename directly or create a path in the reports directory
-            if ':' in filename or filename.startswith('/'):
-                file_path = filename
-            else:
-                reports_dir = Config.BASE_DIR / "ОТчеты"
-                reports_dir.mkdir(exist_ok=True, parents=True)
-                file_path = f"{reports_dir}/{filename}"
-                
-            wb.save(file_path)
+                written += 1
+                if written % progress_step == 0:
+                    self.progress_updated.emit(written)
+
+            wb.save(self._resolve_path(filename))
+            self.progress_updated.emit(written)
             return True
         except Exception as e:
             print(f"Excel generation error: {str(e)}")
             return False
 
+    @staticmethod
+    def _excel_header_cell(ws, value):
+        from openpyxl.cell import WriteOnlyCell
+        from openpyxl.styles import Font, PatternFill, Alignment
+
+        cell = WriteOnlyCell(ws, value=value)
+        cell.font = Font(bold=True, color='FFFFFF')
+        cell.fill = PatternFill('solid', fgColor='808080')
+        cell.alignment = Alignment(horizontal='center')
+        return cell
+
+    def generate_attendance_csv(self, data, filename: str, headers=None,
+                                batch_size: int = EXPORT_BATCH_ROWS) -> bool:
+        """Генерация CSV-отчета.
+
+        Файл пишется в UTF-8 с BOM, чтобы Excel сразу определял кодировку,
+        через буферизованный вывод порциями по batch_size строк.
+        """
+        try:
+            headers, rows = self._prepare_rows(data, headers)
+            if headers is None:
+                return False
+
+            with open(self._resolve_path(filename), 'w', encoding='utf-8-sig',
+                      newline='', buffering=CSV_BUFFER_SIZE) as file:
+                writer = csv.writer(file)
+                writer.writerow(headers)
+                written = 0
+                for batch in self._batches(rows, batch_size):
+                    writer.writerows(batch)
+                    written += len(batch)
+                    self.progress_updated.emit(written)
+            return True
+        except Exception as e:
+            print(f"CSV generation error: {str(e)}")
+            return False
+
+    @staticmethod
+    def parquet_available() -> bool:
+        """Parquet-экспорт доступен только при установленном pyarrow"""
+        return find_spec('pyarrow') is not None
+
+    def generate_attendance_parquet(self, data, filename: str, headers=None,
+                                    batch_size: int = EXPORT_BATCH_ROWS) -> bool:
+        """Генерация Parquet-отчета.
+
+        Строки группируются в record batch по batch_size и дописываются
+        в файл через ParquetWriter, поэтому отчет не собирается в памяти.
+        Колонки называются заголовками отчета и хранятся как строки.
+        """
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            print("Parquet generation error: pyarrow is not installed")
+            return False
+
+        try:
+            headers, rows = self._prepare_rows(data, headers)
+            if headers is None:
+                return False
+
+            schema = pa.schema([(str(header), pa.string()) for header in headers])
+            written = 0
+            with pq.ParquetWriter(self._resolve_path(filename), schema) as writer:
+                for batch in self._batches(rows, batch_size):
+                    columns = [pa.array(column, type=pa.string()) for column in zip(*batch)]
+                    writer.write_batch(pa.record_batch(columns, schema=schema))
+                    written += len(batch)
+                    self.progress_updated.emit(written)
+            return True
+        except Exception as e:
+            print(f"Parquet generation error: {str(e)}")
+            return False
+
+    @staticmethod
+    def _batches(rows, batch_size):
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch:
+                return
+            yield batch
+
+    def cancel_batch(self):
+        """Прерывает текущий пакетный экспорт после готовых листов"""
+        self._batch_cancelled = True
+
+    def generate_batch_archive(self, sheets, filename: str, headers, method_name: str,
+                               extension: str, max_workers=None) -> bool:
+        """Пакетный экспорт: отдельный файл на каждый лист в одном zip-архиве.
+
+        sheets — итератор пар (имя листа, строки); method_name — метод генерации
+        одного файла (например, generate_attendance_pdf). Файлы рендерятся
+        в ProcessPoolExecutor, а готовые сразу дописываются в архив, поэтому
+        в памяти находятся только листы из очереди пула. Процессы пула
+        запускаются через spawn: fork многопоточного процесса Qt (потоки
+        QThreadPool, блокировки logging) может привести к взаимоблокировке.
+        После каждого файла испускается progress_updated с количеством готовых
+        файлов. При отмене через cancel_batch незавершенный архив удаляется.
+        """
+        self._batch_cancelled = False
+        file_path = self._resolve_path(filename)
+        queue_limit = (max_workers or os.cpu_count() or 1) * BATCH_QUEUE_PER_WORKER
+        used_names = set()
+        written = 0
+        try:
+            with zipfile.ZipFile(file_path, 'w', zipfile.ZIP_DEFLATED) as archive, \
+                    ProcessPoolExecutor(max_workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+                pending = {}  # future -> имя файла в архиве
+
+                def write_ready():
+                    # Дожидается хотя бы одного файла и переносит готовые в архив
+                    nonlocal written
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        archive.writestr(pending.pop(future), future.result())
+                        written += 1
+                        self.progress_updated.emit(written)
+
+                for sheet_name, rows in sheets:
+                    if self._batch_cancelled:
+                        break
+                    while len(pending) >= queue_limit:
+                        write_ready()
+                    name = self._archive_name(sheet_name, extension, used_names)
+                    pending[pool.submit(_render_sheet, method_name, extension, headers, rows)] = name
+
+                while pending and not self._batch_cancelled:
+                    write_ready()
+                for future in pending:
+                    future.cancel()
+        except Exception as e:
+            print(f"Batch generation error: {str(e)}")
+            self._remove_file(file_path)
+            return False
+
+        if self._batch_cancelled:
+            self._remove_file(file_path)
+            return False
+        return written > 0
+
+    @staticmethod
+    def _archive_name(sheet_name, extension, used_names):
+        """Имя файла в архиве без недопустимых символов и повторов"""
+        base = re.sub(r'[\\/:*?"<>|]+', '_', str(sheet_name)).strip() or 'report'
+        name, number = f"{base}{extension}", 1
+        while name in used_names:
+            number += 1
+            name = f"{base} ({number}){extension}"
+        used_names.add(name)
+        return name
+
+    @staticmethod
+    def _remove_file(file_path):
+        if os.path.exists(file_path):
+            os.remove(file_path)
+
+
+_sheet_generator = None
+
+
+def _render_sheet(method_name, extension, headers, rows):
+    """Создает один файл пакетного экспорта в процессе пула и возвращает его содержимое"""
+    global _sheet_generator
+    if _sheet_generator is None:
+        _sheet_generator = ReportGenerator()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, f"sheet{extension}")
+        if not getattr(_sheet_generator, method_name)(rows, path, headers):
+            raise RuntimeError(f"{method_name} failed")
+        with open(path, 'rb') as file:
+            return file.read()
@@ -0,0 +1,218 @@
+from itertools import groupby
+from sqlalchemy import tuple_, distinct
+from sqlalchemy.sql import func
+
+from models import Student, Attendance, AttendanceDaily, Lesson, Teacher, Subject, Group
+from models.attendance import STATUS_LABELS
+from utils.date_ranges import day_range
+
+# Количество строк, читаемых из курсора за один раз при экспорте
+EXPORT_BATCH_SIZE = 1000
+
+
+def teacher_full_name(last_name, first_name, patronymic):
+    return f"{last_name} {first_name} {patronymic or ''}".strip()
+
+
+class ReportQueries:
+    """Запросы отчетов и форматирование их строк.
+
+    Каждый запрос определен один раз и используется как для отображения
+    в таблице, так и для экспорта.
+    """
+
+    @staticmethod
+    def fetch_rows(db, query_fn, row_formatter, *args, **kwargs):
+        """Выполняет запрос отчета и форматирует строки для таблицы"""
+        return [row_formatter(row) for row in query_fn(db, *args, **kwargs)]
+
+    @staticmethod
+    def stream_rows(db, query_fn, row_formatter, *args, batch_size=EXPORT_BATCH_SIZE, **kwargs):
+        """Построчно отдает отформатированные строки отчета для экспорта.
+
+        Результат читается порциями через yield_per (в PostgreSQL — серверным
+        курсором), поэтому отчет целиком не загружается ни в таблицу, ни в память.
+        """
+        for row in query_fn(db, *args, **kwargs).yield_per(batch_size):
+            yield row_formatter(row)
+
+    @staticmethod
+    def student_attendance(db, start_date, end_date, student_id=None, subject_id=None):
+        range_start, range_end = day_range(start_date, end_date)
+        query = db.query(
+            Student.full_name,
+            Subject.name.label('subject_name'),
+            Lesson.date_time,
+            Attendance.status,
+            Teacher.last_name,
+            Teacher.first_name,
+            Teacher.patronymic
+        ).join(Attendance, Student.id == Attendance.student_id)\
+         .join(Lesson, Lesson.id == Attendance.lesson_id)\
+         .join(Subject, Subject.id == Lesson.subject_id)\
+         .join(Teacher, Teacher.id == Lesson.teacher_id)\
+         .filter(Lesson.date_time >= range_start, Lesson.date_time < range_end)
+
+        if student_id:
+            query = query.filter(Student.id == student_id)
+        if subject_id:
+            query = query.filter(Subject.id == subject_id)
+        return query
+
+    @staticmethod
+    def student_attendance_page(db, after, limit, start_date, end_date, student_id=None, subject_id=None):
+        """Страница отчета по студентам с пагинацией по ключу.
+
+        Строки упорядочены по (date_time, student_id, lesson_id); следующая
+        страница начинается строго после ключа after, поэтому ее стоимость не
+        зависит от того, сколько строк уже прокручено. Возвращает
+        (отформатированные строки, ключ последней строки).
+        """
+        key = (Lesson.date_time, Student.id, Lesson.id)
+        query = ReportQueries.student_attendance(db, start_date, end_date, student_id, subject_id)\
+            .add_columns(Student.id, Lesson.id)\
+            .order_by(*key)
+        if after is not None:
+            query = query.filter(tuple_(*key) > after)
+
+        rows = query.limit(limit).all()
+        if not rows:
+            return [], after
+        last = rows[-1]
+        return [ReportQueries.student_attendance_row(row[:-2]) for row in rows], (last.date_time, last[-2], last[-1])
+
+    @staticmethod
+    def _attendance_sheet_query(db, start_date, end_date, by, ids=None, subject_id=None):
+        """Отчет по студентам с ключом и именем листа (студента или группы) в конце строки"""
+        query = ReportQueries.student_attendance(db, start_date, end_date, subject_id=subject_id)
+        if by == 'group':
+            query = query.join(Group, Group.id == Lesson.group_id)
+            key, name = Group.id, Group.name
+        else:
+            key, name = Student.id, Student.full_name
+        if ids:
+            query = query.filter(key.in_(ids))
+        return query, key, name
+
+    @staticmethod
+    def attendance_sheet_count(db, start_date, end_date, by='student', ids=None, subject_id=None):
+        """Количество листов пакетного отчета: студентов (групп) с отметками за период"""
+        query, key, _ = ReportQueries._attendance_sheet_query(db, start_date, end_date, by, ids, subject_id)
+        return query.with_entities(func.count(distinct(key))).scalar()
+
+    @staticmethod
+    def attendance_sheets(db, start_date, end_date, by='student', ids=None, subject_id=None,
+                          batch_size=EXPORT_BATCH_SIZE):
+        """Листы посещаемости для пакетного экспорта: по одному на студента или группу.
+
+        Все листы читаются одним запросом, упорядоченным по студенту (группе)
+        и дате, и собираются по мере чтения курсора. Отдает пары
+        (имя листа, отформатированные строки).
+        """
+        query, key, name = ReportQueries._attendance_sheet_query(db, start_date, end_date, by, ids, subject_id)
+        rows = query.add_columns(key, name).order_by(key, Lesson.date_time).yield_per(batch_size)
+        for (_, sheet_name), sheet_rows in groupby(rows, key=lambda row: (row[-2], row[-1])):
+            if by == 'group':
+                sheet_name = f"Группа {sheet_name}"
+            yield sheet_name, [ReportQueries.student_attendance_row(row[:-2]) for row in sheet_rows]
+
+    @staticmethod
+    def student_attendance_row(row):
+        student_name, subject_name, date_time, status, last_name, first_name, patronymic = row
+        return [
+            student_name,
+            subject_name,
+            date_time.strftime("%d.%m.%Y %H:%M"),
+            STATUS_LABELS.get(status, STATUS_LABELS[None]),
+            teacher_full_name(last_name, first_name, patronymic)
+        ]
+
+    @staticmethod
+    def date_attendance(db, start_date, end_date):
+        # Читаем сводку attendance_daily: строк столько же, сколько дней x групп x предметов.
+        # Процент считается от ожидаемых отметок (студенты x занятия), как в отчете по группам:
+        # занятие без отметок учитывается как непосещенное
+        return db.query(
+            AttendanceDaily.day.label('lesson_date'),
+            func.sum(AttendanceDaily.lesson_count).label('lesson_count'),
+            func.coalesce(100.0 * func.sum(AttendanceDaily.present_count) /
+                          func.nullif(func.sum(AttendanceDaily.expected_count), 0), 0).label('attendance_percent')
+        ).filter(AttendanceDaily.day >= start_date, AttendanceDaily.day <= end_date)\
+         .group_by(AttendanceDaily.day)\
+         .order_by(AttendanceDaily.day)
+
+    @staticmethod
+    def date_attendance_row(row):
+        lesson_date, lesson_count, attendance_percent = row
+        return [lesson_date.strftime("%d.%m.%Y"), str(lesson_count), f"{attendance_percent:.2f}%"]
+
+    @staticmethod
+    def group_attendance(db, start_date, end_date, group_id=None, subject_id=None):
+        query = db.query(
+            Group.name.label('group_name'),
+            Subject.name.label('subject_name'),
+            func.sum(AttendanceDaily.lesson_count).label('lesson_count'),
+            # В строке сводки expected_count = студенты группы x занятия дня
+            func.max(AttendanceDaily.expected_count // AttendanceDaily.lesson_count).label('student_count'),
+            func.coalesce(func.round(100.0 * func.sum(AttendanceDaily.present_count) /
+                                     func.nullif(func.sum(AttendanceDaily.expected_count), 0), 2), 0).label('attendance_percent')
+        ).join(Group, Group.id == AttendanceDaily.group_id)\
+         .join(Subject, Subject.id == AttendanceDaily.subject_id)\
+         .filter(AttendanceDaily.day >= start_date, AttendanceDaily.day <= end_date)
+
+        if group_id:
+            query = query.filter(AttendanceDaily.group_id == group_id)
+        if subject_id:
+            query = query.filter(AttendanceDaily.subject_id == subject_id)
+
+        return query.group_by(Group.id, Group.name, Subject.id, Subject.name)
+
+    @staticmethod
+    def group_attendance_row(row):
+        group_name, subject_name, lesson_count, student_count, attendance_percent = row
+        return [group_name, subject_name, str(lesson_count), str(student_count), f"{attendance_percent}%"]
+
+    @staticmethod
+    def teacher_lessons(db, start_date, end_date, teacher_id=None):
+        range_start, range_end = day_range(start_date, end_date)
+        query = db.query(
+            Teacher.last_name,
+            Teacher.first_name,
+            Teacher.patronymic,
+            Subject.name.label('subject_name'),
+            Group.name.label('group_name'),
+            Lesson.date_time,
+            Lesson.location
+        ).join(Lesson, Lesson.teacher_id == Teacher.id)\
+         .join(Subject, Subject.id == Lesson.subject_id)\
+         .join(Group, Group.id == Lesson.group_id)\
+         .filter(Lesson.date_time >= range_start, Lesson.date_time < range_end)
+
+        if teacher_id:
+            query = query.filter(Teacher.id == teacher_id)
+        return query
+
+    @staticmethod
+    def teacher_lessons_row(row):
+        last_name, first_name, patronymic, subject_name, group_name, date_time, location = row
+        return [
+            teacher_full_name(last_name, first_name, patronymic),
+            subject_name,
+            group_name,
+            date_time.strftime("%d.%m.%Y %H:%M"),
+            location or ""
+        ]
+
+    @staticmethod
+    def group_size(db):
+        return db.query(
+            Group.name,
+            func.count(Student.id).label('student_count'),
+            Group.description
+        ).outerjoin(Student, Student.group_id == Group.id)\
+         .group_by(Group.id)
+
+    @staticmethod
+    def group_size_row(row):
+        group_name, student_count, description = row
+        return [group_name, str(student_count), description or ""]
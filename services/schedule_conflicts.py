@@ -0,0 +1,148 @@
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
+
+from config import Config
+from models import Lesson
+
+# Ресурсы, которые не могут быть заняты двумя занятиями одновременно
+CONFLICT_RESOURCES = {
+    'teacher_id': "Преподаватель",
+    'group_id': "Группа",
+    'location': "Аудитория",
+}
+LESSON_COLUMNS = (Lesson.id, Lesson.date_time, Lesson.teacher_id, Lesson.group_id, Lesson.location)
+# SQLSTATE нарушения ограничения EXCLUDE (ex_lessons_*_period в models.lesson)
+EXCLUSION_VIOLATION = '23P01'
+
+
+def lesson_duration() -> timedelta:
+    return timedelta(minutes=Config.LESSON_DURATION_MINUTES)
+
+
+class ScheduleConflicts:
+    """Интервальный индекс занятий по преподавателям, группам и аудиториям.
+
+    Все занятия длятся Config.LESSON_DURATION_MINUTES, поэтому два занятия
+    одного ресурса пересекаются, если их начала ближе длительности. Для
+    каждого ресурса хранится отсортированный список начал: проверка одного
+    занятия - два бинарных поиска (O(log n)), проверка пакета (семестра) -
+    поиск по индексу и один проход по пакету, отсортированному по ресурсу и времени.
+
+    Занятия - словари с ключами id, date_time, teacher_id, group_id, location
+    (строки LessonGenerator.build_rows без id подходят как есть).
+    """
+
+    def __init__(self, lessons=(), duration=None):
+        self.duration = duration or lesson_duration()
+        self._starts = {}  # (ресурс, значение) -> отсортированные начала занятий
+        self._ids = {}  # (ресурс, значение) -> id занятий в том же порядке
+        for lesson in sorted(lessons, key=lambda item: item['date_time']):
+            for key in self.resource_keys(lesson):
+                self._starts.setdefault(key, []).append(lesson['date_time'])
+                self._ids.setdefault(key, []).append(lesson.get('id'))
+
+    @staticmethod
+    def resource_keys(lesson):
+        """Ресурсы занятия: [(поле, значение)]; занятия без даты и пустые аудитории не проверяются"""
+        if lesson.get('date_time') is None:
+            return []
+        return [(field, lesson.get(field)) for field in CONFLICT_RESOURCES if lesson.get(field) not in (None, '')]
+
+    @classmethod
+    def load(cls, db, start, end, exclude_ids=()):
+        """Индекс занятий, которые могут пересекаться с интервалом [start, end).
+
+        Читаются занятия, начинающиеся в (start - длительность, end), по индексу
+        ix_lessons_date_time; exclude_ids исключает проверяемые занятия.
+        """
+        duration = lesson_duration()
+        query = db.query(*LESSON_COLUMNS)\
+            .filter(Lesson.date_time > start - duration, Lesson.date_time < end)
+        if exclude_ids:
+            query = query.filter(Lesson.id.notin_(exclude_ids))
+        return cls((row._asdict() for row in query), duration)
+
+    def conflicts(self, lesson):
+        """Занятия индекса, пересекающиеся с lesson: [словарь конфликта]"""
+        found = []
+        start = lesson.get('date_time')
+        for key in self.resource_keys(lesson):
+            starts, ids = self._starts.get(key, ()), self._ids.get(key, ())
+            first = bisect_right(starts, start - self.duration)
+            last = bisect_left(starts, start + self.duration)
+            for position in range(first, last):
+                if ids[position] is not None and ids[position] == lesson.get('id'):
+                    continue  # То же занятие (проверка после редактирования)
+                found.append(self._conflict(lesson, key, ids[position], starts[position]))
+        return found
+
+    def check_batch(self, lessons):
+        """Конфликты пакета занятий с индексом и между собой: {номер занятия: [конфликты]}"""
+        found = {}
+        for number, lesson in enumerate(lessons):
+            conflicts = self.conflicts(lesson)
+            if conflicts:
+                found[number] = conflicts
+
+        # Занятия пакета между собой: соседние по времени занятия одного ресурса
+        keyed = sorted(
+            (key, lesson['date_time'], number)
+            for number, lesson in enumerate(lessons) for key in self.resource_keys(lesson)
+        )
+        for (key, start, number), (next_key, next_start, next_number) in zip(keyed, keyed[1:]):
+            if key == next_key and next_start - start < self.duration:
+                found.setdefault(next_number, []).append(
+                    self._conflict(lessons[next_number], key, lessons[number].get('id'), start)
+                )
+        return found
+
+    @classmethod
+    def check_lesson(cls, db, lesson):
+        """Конфликты занятия (еще не записанного в БД) с занятиями в БД; id исключает само занятие"""
+        if lesson.get('date_time') is None:
+            return []
+        exclude_ids = [lesson['id']] if lesson.get('id') is not None else ()
+        index = cls.load(db, lesson['date_time'], lesson['date_time'] + lesson_duration(), exclude_ids)
+        return index.conflicts(lesson)
+
+    @classmethod
+    def check_saved(cls, db, lesson_id):
+        """Конфликты записанного (после flush) занятия с остальными занятиями в БД"""
+        row = db.query(*LESSON_COLUMNS).filter(Lesson.id == lesson_id).first()
+        return cls.check_lesson(db, row._asdict()) if row is not None else []
+
+    @staticmethod
+    def pending_lesson(values, lesson_id=None):
+        """Занятие для check_lesson из значений формы (строк) до записи в БД.
+
+        Дата - 'YYYY-MM-DD HH:MM[:SS]' (ValueError, если не разбирается), пустая
+        дата не проверяется; id преподавателя и группы приводятся к целым.
+        """
+        def to_id(value):
+            return int(value) if value not in (None, '', 'None') else None
+
+        date_time = values.get('date_time')
+        if isinstance(date_time, str):
+            date_time = datetime.fromisoformat(date_time.strip()) if date_time.strip() else None
+        return {'id': lesson_id, 'date_time': date_time, 'teacher_id': to_id(values.get('teacher_id')),
+                'group_id': to_id(values.get('group_id')), 'location': values.get('location')}
+
+    @staticmethod
+    def is_exclusion_violation(error) -> bool:
+        """IntegrityError от ограничений ex_lessons_*_period (пересечение, найденное самой БД)"""
+        orig = getattr(error, 'orig', None)
+        return getattr(orig, 'pgcode', None) == EXCLUSION_VIOLATION
+
+    @staticmethod
+    def _conflict(lesson, key, other_id, other_time):
+        field, value = key
+        return {'date_time': lesson['date_time'], 'resource': field, 'value': value,
+                'other_id': other_id, 'other_time': other_time}
+
+    @staticmethod
+    def describe(conflict) -> str:
+        """Описание конфликта для сообщения пользователю"""
+        other = f"занятием #{conflict['other_id']}" if conflict['other_id'] is not None else "другим занятием"
+        return (f"{CONFLICT_RESOURCES[conflict['resource']]} {conflict['value']}: "
+                f"{conflict['date_time']:%d.%m.%Y %H:%M} пересекается с {other} "
+                f"{conflict['other_time']:%d.%m.%Y %H:%M}")
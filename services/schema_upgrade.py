@@ -0,0 +1,56 @@
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.schema import CreateIndex
+
+from models import Base
+from models.lesson import BTREE_GIST_DDL, LESSON_EXCLUSION_CONSTRAINTS, exclusion_constraint_ddl
+from utils import get_logger
+
+logger = get_logger()
+
+
+class SchemaUpgrade:
+    """Дополнение схемы уже существующей БД при запуске.
+
+    Base.metadata.create_all пропускает существующие таблицы, поэтому индексы,
+    добавленные в модели позже, в рабочей БД сами не появятся. Шаги здесь
+    идемпотентны и выполняются при каждом запуске приложения.
+    """
+
+    @staticmethod
+    def ensure_indexes(db):
+        """Создает индексы моделей, которых нет в БД (CREATE INDEX IF NOT EXISTS).
+
+        Фиксацию транзакции выполняет вызывающий код.
+        """
+        for table in Base.metadata.sorted_tables:
+            for index in sorted(table.indexes, key=lambda item: item.name):
+                db.execute(CreateIndex(index, if_not_exists=True))
+
+    @staticmethod
+    def ensure_lesson_constraints(db) -> list:
+        """Добавляет в таблицу lessons недостающие ограничения ex_lessons_*_period (только PostgreSQL).
+
+        Ограничения создаются событием after_create, поэтому в таблицу, созданную
+        раньше, их нужно добавить отдельно. Если в расписании уже есть пересечения,
+        ограничение не добавляется (предупреждение в журнале), а запуск продолжается.
+        Возвращает имена добавленных ограничений; фиксацию выполняет вызывающий код.
+        """
+        if db.get_bind().dialect.name != 'postgresql':
+            return []
+        db.execute(text(BTREE_GIST_DDL))
+        existing = set(db.execute(text(
+            "SELECT conname FROM pg_constraint WHERE conrelid = 'lessons'::regclass"
+        )).scalars())
+
+        added = []
+        for constraint in LESSON_EXCLUSION_CONSTRAINTS:
+            if constraint[0] in existing:
+                continue
+            try:
+                with db.begin_nested():
+                    db.execute(text(exclusion_constraint_ddl(*constraint)))
+                added.append(constraint[0])
+            except IntegrityError as e:
+                logger.warning(f"Ограничение {constraint[0]} не добавлено, в расписании есть пересечения: {str(e)}")
+        return added
@@ -0,0 +1,182 @@
+import warnings
+from datetime import date, timedelta
+
+from sqlalchemy.sql import func
+
+from models import AttendanceDaily, Group, Subject
+
+# Ряды динамики: колонка ключа в сводке, справочник и формат подписи
+TREND_SERIES = {
+    'group': (AttendanceDaily.group_id, Group, "Группа {}"),
+    'subject': (AttendanceDaily.subject_id, Subject, "{}"),
+}
+# Процентили посещаемости по группам (предметам) для полосы на графике
+TREND_PERCENTILES = (25, 50, 75)
+
+
+class _LazyNumPy:
+    """Имя np модуля до первого расчета: импортирует NumPy и заменяет себя им"""
+
+    def __getattr__(self, name):
+        global np
+        import numpy
+        np = numpy
+        return getattr(numpy, name)
+
+
+np = _LazyNumPy()
+
+
+class TrendAnalytics:
+    """Динамика посещаемости за произвольный период (например, учебный год).
+
+    Дневные суммы по группам или предметам читаются из сводки attendance_daily
+    одним запросом в матрицы NumPy (ряд x день); скользящие проценты, изменения
+    неделя к неделе и процентили считаются векторно, без циклов по дням.
+    NumPy импортируется при первом расчете (см. _LazyNumPy), а не при старте приложения.
+    """
+
+    @staticmethod
+    def daily_counts_query(db, start, end, by='group'):
+        """Суммы отметок по (ряд, день) за период [start, end] из сводки"""
+        key, model, _ = TREND_SERIES[by]
+        return db.query(
+            key,
+            model.name,
+            AttendanceDaily.day,
+            func.sum(AttendanceDaily.present_count + AttendanceDaily.late_count),
+            func.sum(AttendanceDaily.present_count + AttendanceDaily.late_count +
+                     AttendanceDaily.absent_count + AttendanceDaily.sick_count)
+        ).join(model, model.id == key)\
+         .filter(AttendanceDaily.day >= start, AttendanceDaily.day <= end)\
+         .group_by(key, model.name, AttendanceDaily.day)
+
+    @staticmethod
+    def fetch_daily(db, start, end, by='group'):
+        """Дневные суммы в виде (дни, подписи рядов, пришедшие, отмеченные).
+
+        Дни - массив datetime64[D] на каждый день периода, суммы - матрицы
+        int64 размером (ряды x дни); дни без занятий заполнены нулями.
+        """
+        _, _, label_format = TREND_SERIES[by]
+        days = np.arange(np.datetime64(start, 'D'), np.datetime64(end + timedelta(days=1), 'D'))
+        rows = TrendAnalytics.daily_counts_query(db, start, end, by).all()
+        if not rows:
+            empty = np.zeros((0, len(days)), dtype=np.int64)
+            return days, [], empty, empty.copy()
+
+        keys, names, row_days, attended, marked = zip(*rows)
+        unique_keys, series = np.unique(np.array(keys), return_inverse=True)
+        names_by_key = dict(zip(keys, names))
+        labels = [label_format.format(names_by_key[k]) for k in unique_keys.tolist()]
+        # Порядковые номера дат в десятки раз быстрее разбора date в datetime64
+        day_index = np.fromiter(map(date.toordinal, row_days), np.int64, len(row_days)) - start.toordinal()
+
+        shape = (len(unique_keys), len(days))
+        attended_matrix = np.zeros(shape, dtype=np.int64)
+        marked_matrix = np.zeros(shape, dtype=np.int64)
+        attended_matrix[series, day_index] = np.array(attended, dtype=np.int64)
+        marked_matrix[series, day_index] = np.array(marked, dtype=np.int64)
+        return days, labels, attended_matrix, marked_matrix
+
+    @staticmethod
+    def rates(attended, marked):
+        """Процент посещаемости; NaN там, где отметок не было"""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(marked > 0, 100.0 * attended / marked, np.nan)
+
+    @staticmethod
+    def rolling_rate(attended, marked, window=7):
+        """Посещаемость за последние window дней на каждый день периода.
+
+        Суммы окна считаются через накопленные суммы по последней оси, поэтому
+        дни без занятий не искажают процент, а учитываются как пустые.
+        """
+        def window_sum(values):
+            cumulative = np.cumsum(values, axis=-1)
+            shifted = np.zeros_like(cumulative)
+            shifted[..., window:] = cumulative[..., :-window]
+            return cumulative - shifted
+
+        return TrendAnalytics.rates(window_sum(attended), window_sum(marked))
+
+    @staticmethod
+    def weekly_rates(days, attended, marked):
+        """Посещаемость по календарным неделям: (понедельники недель, проценты)"""
+        if not len(days):
+            return days, np.empty(attended.shape[:-1] + (0,))
+        # 1970-01-01 - четверг: сдвиг до понедельника первой недели периода
+        lead = int((days[0].astype(np.int64) + 3) % 7)
+        total = lead + len(days)
+        width = -(-total // 7) * 7
+
+        def week_sum(values):
+            padded = np.zeros(values.shape[:-1] + (width,), dtype=values.dtype)
+            padded[..., lead:total] = values
+            return padded.reshape(values.shape[:-1] + (width // 7, 7)).sum(axis=-1)
+
+        weeks = days[0] - lead + np.arange(0, width, 7)
+        return weeks, TrendAnalytics.rates(week_sum(attended), week_sum(marked))
+
+    @staticmethod
+    def week_over_week(weekly):
+        """Изменение посещаемости относительно предыдущей недели (п.п.); первая неделя - NaN"""
+        delta = np.full(weekly.shape, np.nan)
+        delta[..., 1:] = np.diff(weekly, axis=-1)
+        return delta
+
+    @staticmethod
+    def percentiles(rates, q=TREND_PERCENTILES):
+        """Процентили по рядам (ось 0) на каждый день; NaN, если отметок не было ни у кого"""
+        if not len(rates):
+            return np.full((len(q), rates.shape[-1]), np.nan)
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)  # All-NaN slice для дней без занятий
+            return np.nanpercentile(rates, q, axis=0)
+
+    @staticmethod
+    def downsample(days, values, max_points):
+        """Прореживает ряды до max_points точек средним по корзинам соседних дней.
+
+        Возвращает (первый день каждой корзины, средние значения); NaN внутри
+        корзины пропускаются.
+        """
+        size = -(-len(days) // max_points) if max_points else 1
+        if size <= 1:
+            return days, values
+        width = -(-len(days) // size) * size
+        padded = np.full(values.shape[:-1] + (width,), np.nan)
+        padded[..., :len(days)] = values
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)  # Mean of empty slice
+            means = np.nanmean(padded.reshape(values.shape[:-1] + (width // size, size)), axis=-1)
+        return days[::size], means
+
+    @staticmethod
+    def trend(db, start, end, by='group', window=7, max_points=200):
+        """Все ряды вкладки динамики за период (выполняется в фоновом потоке).
+
+        Возвращает словарь: days и rolling (общая скользящая посещаемость),
+        percentiles (процентили скользящей посещаемости рядов), weeks и
+        week_delta (изменение общей посещаемости неделя к неделе), series -
+        число рядов. Дневные ряды прорежены до max_points точек.
+        """
+        days, labels, attended, marked = TrendAnalytics.fetch_daily(db, start, end, by)
+        rolling = TrendAnalytics.rolling_rate(attended.sum(axis=0), marked.sum(axis=0), window)
+        spread = TrendAnalytics.percentiles(TrendAnalytics.rolling_rate(attended, marked, window))
+        weeks, weekly = TrendAnalytics.weekly_rates(days, attended.sum(axis=0), marked.sum(axis=0))
+
+        plot_days, plot_values = TrendAnalytics.downsample(days, np.vstack([rolling, spread]), max_points)
+        return {
+            'days': plot_days,
+            'rolling': plot_values[0],
+            'percentiles': plot_values[1:],
+            'weeks': weeks,
+            'week_delta': TrendAnalytics.week_over_week(weekly),
+            'series': len(labels),
+        }
+
+    @staticmethod
+    def academic_year_start(today: date) -> date:
+        """1 сентября текущего учебного года"""
+        return date(today.year if today.month >= 9 else today.year - 1, 9, 1)
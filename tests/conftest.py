@@ -0,0 +1,28 @@
+import pytest  # Импортируем фреймворк для тестирования pytest
+from PyQt5.QtWidgets import QApplication  # Импортируем приложение Qt для создания виджетов
+from sqlalchemy import create_engine  # Импортируем функцию создания движка SQLAlchemy
+from sqlalchemy.orm import sessionmaker  # Импортируем фабрику сессий
+from models import Base  # Импортируем метаданные моделей
+
+
+@pytest.fixture(scope="session")
+def qapp():
+    """Фикстура с экземпляром приложения Qt, общим для всех тестов с виджетами и сигналами"""
+    return QApplication.instance() or QApplication([])
+
+
+@pytest.fixture
+def engine():
+    """Фикстура с движком SQLite в памяти и созданными таблицами"""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def db(engine):
+    """Фикстура с пустой сессией; тестовые данные добавляет фикстура db модуля теста"""
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
@@ -0,0 +1,154 @@
+import pytest  # Импортируем фреймворк для тестирования pytest
+from datetime import datetime, date  # Импортируем классы для работы с датой и временем
+from sqlalchemy import delete, event  # Импортируем удаление и систему событий SQLAlchemy
+from models import Student, Group, Subject, Lesson, Attendance, AttendanceDaily, Teacher, User  # Импортируем модели
+from services.attendance_rollup import AttendanceRollup  # Импортируем тестируемый класс
+from services.attendance_service import AttendanceService  # Импортируем сервис сохранения отметок
+from services.report_queries import ReportQueries  # Импортируем запросы отчетов
+from widgets.stats import StatsWidget  # Импортируем виджет статистики для проверки его запросов
+
+
+@pytest.fixture
+def db(db):
+    """Фикстура с сессией SQLite: две группы, два предмета и занятия за два дня"""
+    db.add(User(id=1, login="teacher", password="x", role="teacher", email="t@example.com"))
+    db.add(Teacher(id=1, first_name="Иван", last_name="Петров", user_id=1))
+    db.add_all([Group(id=1, name="101"), Group(id=2, name="102")])
+    db.add_all([Subject(id=1, name="Математика"), Subject(id=2, name="Физика")])
+    for i in range(4):
+        db.add(Student(id=i + 1, full_name=f"Студент {i + 1}", group_id=1))  # 4 студента в группе 101
+    db.add(Student(id=5, full_name="Студент 5", group_id=2))  # 1 студент в группе 102
+    db.add_all([
+        Lesson(id=1, subject_id=1, teacher_id=1, group_id=1, date_time=datetime(2024, 9, 2, 9, 0)),
+        Lesson(id=2, subject_id=1, teacher_id=1, group_id=1, date_time=datetime(2024, 9, 2, 11, 0)),
+        Lesson(id=3, subject_id=2, teacher_id=1, group_id=1, date_time=datetime(2024, 9, 3, 9, 0)),
+        Lesson(id=4, subject_id=2, teacher_id=1, group_id=2, date_time=datetime(2024, 9, 3, 11, 0)),
+    ])
+    db.add_all([
+        Attendance(student_id=1, lesson_id=1, status="present"),
+        Attendance(student_id=2, lesson_id=1, status="late"),
+        Attendance(student_id=3, lesson_id=2, status="absent"),
+        Attendance(student_id=5, lesson_id=4, status="sick"),
+    ])
+    db.commit()
+    AttendanceRollup.rebuild(db)
+    db.commit()
+    return db
+
+
+def rollup_rows(db):
+    """Содержимое сводки в виде сравнимых кортежей"""
+    return [
+        (row.day, row.group_id, row.subject_id, row.lesson_count, row.expected_count,
+         row.present_count, row.late_count, row.absent_count, row.sick_count)
+        for row in db.query(AttendanceDaily).order_by(AttendanceDaily.day, AttendanceDaily.group_id,
+                                                      AttendanceDaily.subject_id)
+    ]
+
+
+class TestAttendanceRollup:
+    def test_rebuild_counts(self, db):
+        """Тест полной сборки сводки из исходных таблиц"""
+        # Assert - по строке на (день, группа, предмет), ожидаемое число = студенты x занятия
+        assert rollup_rows(db) == [
+            (date(2024, 9, 2), 1, 1, 2, 8, 1, 1, 1, 0),
+            (date(2024, 9, 3), 1, 2, 1, 4, 0, 0, 0, 0),
+            (date(2024, 9, 3), 2, 2, 1, 1, 0, 0, 0, 1),
+        ]
+
+    def test_save_changes_keeps_rollup_current(self, db):
+        """Тест: после сохранения отметок сводка совпадает с полной пересборкой"""
+        # Act - меняем, добавляем и снимаем отметки через сервис
+        AttendanceService.save_changes(db, {(1, 1): 'absent', (4, 2): 'present', (3, 2): None})
+        db.commit()
+        incremental = rollup_rows(db)
+        AttendanceRollup.rebuild(db)
+
+        # Assert - инкрементальный пересчет дает тот же результат
+        assert incremental == rollup_rows(db)  # Проверяем совпадение с пересборкой
+        assert incremental[0] == (date(2024, 9, 2), 1, 1, 2, 8, 1, 1, 1, 0)  # Проверяем пересчитанный день
+
+    def test_refresh_touches_only_scope(self, db):
+        """Тест: пересчет затрагивает только указанные группу и день"""
+        # Arrange - добавляем отметку в обход сервиса
+        db.add(Attendance(student_id=4, lesson_id=3, status="present"))
+        db.commit()
+
+        # Act - пересчитываем сводку только для группы 2
+        AttendanceRollup.refresh(db, {(2, date(2024, 9, 3))})
+
+        # Assert - строка группы 1 за 3 сентября осталась прежней
+        assert rollup_rows(db)[1] == (date(2024, 9, 3), 1, 2, 1, 4, 0, 0, 0, 0)
+
+    def test_student_scope_refreshes_all_group_days(self, db):
+        """Тест: перевод студента пересчитывает все дни обеих групп"""
+        # Arrange - запоминаем затронутые группы до и после перевода
+        scope = AttendanceRollup.scope_of(db, Student, 4)
+        db.query(Student).filter(Student.id == 4).update({'group_id': 2})
+        db.flush()
+        scope |= AttendanceRollup.scope_of(db, Student, 4)
+
+        # Act - пересчитываем сводку
+        AttendanceRollup.refresh(db, scope)
+
+        # Assert - ожидаемое число отметок изменилось в обеих группах
+        assert scope == {(1, None), (2, None)}  # Проверяем область пересчета
+        expected = [row[4] for row in rollup_rows(db)]
+        assert expected == [6, 3, 2]  # Проверяем новые ожидаемые значения
+
+    def test_reports_read_rollup(self, db):
+        """Тест отчетов по датам и группам на основе сводки"""
+        # Act - формируем отчеты за сентябрь
+        by_date = ReportQueries.fetch_rows(db, ReportQueries.date_attendance, ReportQueries.date_attendance_row,
+                                           date(2024, 9, 1), date(2024, 9, 30))
+        by_group = ReportQueries.fetch_rows(db, ReportQueries.group_attendance, ReportQueries.group_attendance_row,
+                                            date(2024, 9, 1), date(2024, 9, 30), group_id=1)
+
+        # Assert - проверяем значения строк отчетов
+        assert by_date == [["02.09.2024", "2", "12.50%"], ["03.09.2024", "2", "0.00%"]]  # Проверяем отчет по датам
+        assert sorted(by_group) == [["101", "Математика", "2", "4", "12.5%"], ["101", "Физика", "1", "4", "0.0%"]]
+
+    def test_stats_read_rollup(self, db):
+        """Тест агрегатов графиков статистики на основе сводки"""
+        # Act - запрашиваем данные графиков за сентябрь
+        september = date(2024, 9, 1)
+        by_group, by_subject, lessons = StatsWidget.query_stats(db, [september])[september]
+
+        # Assert - доля присутствий считается по выставленным отметкам
+        assert sorted((name, round(rate, 2)) for name, rate in by_group) == [("Группа 101", 66.67), ("Группа 102", 0)]
+        assert sorted((name, round(rate, 2)) for name, rate in by_subject) == [("Математика", 33.33), ("Физика", 0)]
+        assert sorted(lessons) == [("Математика", 2), ("Физика", 2)]
+
+    def test_refresh_upserts_row_inserted_concurrently(self, db):
+        """Тест: строка сводки, записанная параллельной транзакцией после DELETE, обновляется без ошибки ключа"""
+        # Arrange - после удаления устаревших строк "другая транзакция" записывает строку того же ключа
+        def insert_concurrent_row(conn, cursor, statement, *args):
+            if statement.startswith("DELETE FROM attendance_daily"):
+                cursor.connection.cursor().execute("INSERT INTO attendance_daily VALUES ('2024-09-02', 1, 1, 0, 0, 0, 0, 0, 0)")
+        db.execute(delete(AttendanceDaily))
+        event.listen(db.get_bind(), "after_cursor_execute", insert_concurrent_row)
+
+        # Act - пересчитываем сводку за группу и день
+        try:
+            AttendanceRollup.refresh(db, {(1, date(2024, 9, 2))})
+        finally:
+            event.remove(db.get_bind(), "after_cursor_execute", insert_concurrent_row)
+
+        # Assert - строка содержит пересчитанные значения
+        assert rollup_rows(db) == [(date(2024, 9, 2), 1, 1, 2, 8, 1, 1, 1, 0)]  # Проверяем строку сводки
+
+    def test_refresh_removes_stale_keys(self, db):
+        """Тест: строки сводки за удаленные занятия удаляются, остальные обновляются"""
+        # Arrange - переносим занятие по физике группы 1 на другой день
+        db.query(Lesson).filter(Lesson.id == 3).update({'date_time': datetime(2024, 9, 4, 9, 0)})
+        db.flush()
+
+        # Act - пересчитываем старый и новый день
+        AttendanceRollup.refresh(db, {(1, date(2024, 9, 3)), (1, date(2024, 9, 4))})
+
+        # Assert - строка за 3 сентября удалена, за 4 сентября добавлена
+        assert rollup_rows(db) == [
+            (date(2024, 9, 2), 1, 1, 2, 8, 1, 1, 1, 0),
+            (date(2024, 9, 3), 2, 2, 1, 1, 0, 0, 0, 1),
+            (date(2024, 9, 4), 1, 2, 1, 4, 0, 0, 0, 0),
+        ]
@@ -0,0 +1,128 @@
+import pytest  # Импортируем фреймворк для тестирования pytest
+from datetime import datetime, date  # Импортируем классы для работы с датой и временем
+from sqlalchemy import event  # Импортируем систему событий SQLAlchemy
+from sqlalchemy.dialects import postgresql  # Импортируем диалект PostgreSQL для компиляции запросов
+from unittest.mock import MagicMock, patch  # Импортируем инструменты для создания моков
+from models import Student, Group, Subject, Lesson, Attendance, Teacher, User  # Импортируем модели
+from services.attendance_service import AttendanceService  # Импортируем тестируемый сервис
+
+
+@pytest.fixture
+def db(db):
+    """Фикстура с сессией, заполненной группой из 30 студентов и 6 занятиями за день"""
+    db.add(User(id=1, login="teacher", password="x", role="teacher", email="t@example.com"))
+    db.add(Teacher(id=1, first_name="Иван", last_name="Петров", user_id=1))
+    db.add(Group(id=1, name="101"))
+    db.add(Subject(id=1, name="Математика"))
+    for i in range(30):
+        db.add(Student(id=i + 1, full_name=f"Студент {i + 1}", group_id=1))
+    for hour in range(6):
+        db.add(Lesson(id=hour + 1, subject_id=1, teacher_id=1, group_id=1,
+                           date_time=datetime(2024, 9, 2, 8 + hour, 0)))
+    db.add(Attendance(student_id=1, lesson_id=1, status="present"))
+    db.commit()
+    return db
+
+
+@pytest.fixture
+def query_counter(engine):
+    """Фикстура для подсчета SQL-запросов, отправленных в базу данных"""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)  # Запоминаем каждый выполненный запрос
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    yield statements
+    event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+class TestAttendanceService:
+    def test_day_roster_single_query(self, db, query_counter):
+        """Тест: загрузка списка за день выполняется одним запросом"""
+        # Act - загружаем список студентов и занятий за день
+        results = AttendanceService.day_roster_query(db, date(2024, 9, 2)).all()
+
+        # Assert - 30 студентов x 6 занятий и ровно один запрос
+        assert len(results) == 180  # Проверяем количество строк
+        assert len(query_counter) == 1  # Проверяем, что выполнен только один запрос
+
+    def test_day_roster_contains_lesson_id(self, db):
+        """Тест: каждая строка содержит идентификатор своего занятия"""
+        # Act - загружаем список за день
+        results = AttendanceService.day_roster_query(db, date(2024, 9, 2)).all()
+
+        # Assert - каждому студенту соответствуют все шесть занятий
+        lesson_ids = {row.lesson_id for row in results if row.id == 1}
+        assert lesson_ids == {1, 2, 3, 4, 5, 6}  # Проверяем идентификаторы занятий
+        marked = [row for row in results if row.status is not None]
+        assert [(row.id, row.lesson_id) for row in marked] == [(1, 1)]  # Проверяем отметку посещаемости
+
+    def test_day_roster_filters(self, db):
+        """Тест фильтрации списка по группе и другой дате"""
+        # Act - загружаем список по несуществующей группе и по дню без занятий
+        by_group = AttendanceService.day_roster_query(db, date(2024, 9, 2), group_id=2).all()
+        by_date = AttendanceService.day_roster_query(db, date(2024, 9, 3)).all()
+
+        # Assert - оба запроса возвращают пустой результат
+        assert by_group == []  # Проверяем фильтр по группе
+        assert by_date == []  # Проверяем фильтр по дате
+
+    def test_day_roster_uses_group_date_index(self, db):
+        """Тест: фильтр по дню использует индекс lessons(group_id, date_time)"""
+        # Arrange - компилируем запрос списка за день для SQLite
+        query = AttendanceService.day_roster_query(db, date(2024, 9, 2))
+        compiled = query.statement.compile(dialect=db.get_bind().dialect)
+        params = tuple(compiled.params[name] for name in compiled.positiontup)
+
+        # Act - получаем план выполнения запроса
+        plan = db.connection().exec_driver_sql("EXPLAIN QUERY PLAN " + str(compiled), params).fetchall()
+        details = " ".join(row[-1] for row in plan)
+
+        # Assert - занятия ищутся по индексу, а не полным просмотром таблицы
+        assert "ix_lessons_group_id_date_time" in details  # Проверяем использование индекса
+        assert "SCAN lessons" not in details  # Проверяем отсутствие полного просмотра занятий
+
+    def test_save_changes_postgresql_upsert(self):
+        """Тест: изменения записываются одним INSERT ... ON CONFLICT и одним DELETE"""
+        # Arrange - подготавливаем мок сессии и набор изменений
+        mock_db = MagicMock()
+        changes = {(student_id, 1): 'present' for student_id in range(1, 200)}
+        changes[(200, 1)] = None  # Снятая отметка
+
+        # Act - сохраняем изменения (пересчет сводки проверяется отдельно)
+        with patch('services.attendance_service.AttendanceRollup.refresh_lessons') as mock_refresh:
+            saved = AttendanceService.save_changes(mock_db, changes)
+
+        # Assert - выполнено ровно два запроса
+        assert saved == 200  # Проверяем количество сохраненных изменений
+        assert mock_db.execute.call_count == 2  # Проверяем количество запросов
+        mock_refresh.assert_called_once_with(mock_db, {1})  # Проверяем пересчет сводки за занятие
+        upsert_sql = str(mock_db.execute.call_args_list[0].args[0].compile(dialect=postgresql.dialect()))
+        delete_sql = str(mock_db.execute.call_args_list[1].args[0].compile(dialect=postgresql.dialect()))
+        assert "ON CONFLICT (student_id, lesson_id) DO UPDATE" in upsert_sql  # Проверяем upsert
+        assert delete_sql.startswith("DELETE FROM attendance")  # Проверяем массовое удаление
+        mock_db.query.assert_not_called()  # Проверяем отсутствие построчных SELECT
+
+    def test_save_changes_applies_upserts_and_deletes(self, db, query_counter):
+        """Тест применения изменений: обновление, вставка и удаление отметок"""
+        # Arrange - добавляем отметку, которую затем снимем
+        db.add(Attendance(student_id=2, lesson_id=1, status="absent"))
+        db.commit()
+        query_counter.clear()
+
+        # Act - обновляем, добавляем и удаляем отметки
+        AttendanceService.save_changes(db, {(1, 1): 'late', (3, 1): 'sick', (2, 1): None})
+        db.commit()
+
+        # Assert - данные в базе соответствуют изменениям
+        rows = db.query(Attendance.student_id, Attendance.status).order_by(Attendance.student_id).all()
+        assert rows == [(1, 'late'), (3, 'sick')]  # Проверяем итоговые отметки
+        writes = [q for q in query_counter if q.startswith(("INSERT INTO attendance ", "DELETE FROM attendance "))]
+        assert len(writes) == 2  # Проверяем число запросов к таблице отметок
+
+    def test_save_changes_empty(self):
+        """Тест: пустой набор изменений не обращается к базе данных"""
+        mock_db = MagicMock()
+        assert AttendanceService.save_changes(mock_db, {}) == 0  # Проверяем результат
+        mock_db.execute.assert_not_called()  # Проверяем отсутствие запросов
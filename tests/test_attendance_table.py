@@ -0,0 +1,57 @@
+import pytest  # Импортируем фреймворк для тестирования pytest
+from datetime import datetime  # Импортируем класс для работы с датой и временем
+from PyQt5.QtCore import Qt  # Импортируем константы Qt
+from widgets.attendance_table import AttendanceTableModel, STATUS_COLUMN  # Импортируем тестируемую модель
+
+
+@pytest.fixture
+def model():
+    """Фикстура с моделью таблицы, заполненной тремя строками"""
+    model = AttendanceTableModel()
+    model.set_rows([
+        (1, "Иванов Иван", "101", "Математика", 10, datetime(2024, 9, 2, 9, 0), 'present'),
+        (2, "Петров Петр", "101", "Математика", 10, datetime(2024, 9, 2, 9, 0), None),
+        (3, "Сидоров Сидор", "101", "Математика", None, datetime(2024, 9, 2, 9, 0), None),
+    ])
+    model.set_editable(True)
+    return model
+
+
+class TestAttendanceTableModel:
+    def test_display_data(self, model):
+        """Тест отображения данных строки"""
+        # Assert - проверяем текст ячеек первой строки
+        assert model.rowCount() == 3  # Проверяем количество строк
+        assert model.data(model.index(0, 1)) == "Группа 101"  # Проверяем колонку группы
+        assert model.data(model.index(0, 3)) == "02.09.2024 09:00"  # Проверяем форматирование даты
+        assert model.data(model.index(0, STATUS_COLUMN)) == "Присутствовал"  # Проверяем статус
+        assert model.data(model.index(1, STATUS_COLUMN)) == "Не отмечено"  # Проверяем пустой статус
+
+    def test_change_set_tracks_only_modified_cells(self, model):
+        """Тест: в набор изменений попадают только измененные ячейки"""
+        # Act - меняем две отметки, затем возвращаем одну из них к исходному значению
+        model.setData(model.index(0, STATUS_COLUMN), 'late', Qt.EditRole)
+        model.setData(model.index(1, STATUS_COLUMN), 'absent', Qt.EditRole)
+        model.setData(model.index(0, STATUS_COLUMN), 'present', Qt.EditRole)
+
+        # Assert - в наборе осталась только вторая строка
+        assert model.changes == {(2, 10): [None, 'absent']}  # Проверяем набор изменений
+        assert model.pending_changes() == {(2, 10): 'absent'}  # Проверяем данные для сохранения
+
+    def test_undo_restores_old_status(self, model):
+        """Тест отмены изменений без перезагрузки модели"""
+        # Arrange - меняем отметку
+        model.setData(model.index(0, STATUS_COLUMN), 'sick', Qt.EditRole)
+
+        # Act - отменяем изменения
+        model.undo_changes()
+
+        # Assert - исходный статус восстановлен, набор изменений пуст
+        assert model.data(model.index(0, STATUS_COLUMN), Qt.EditRole) == 'present'  # Проверяем статус
+        assert model.changes == {}  # Проверяем набор изменений
+
+    def test_row_without_lesson_is_not_editable(self, model):
+        """Тест: строка без занятия недоступна для редактирования"""
+        assert model.flags(model.index(0, STATUS_COLUMN)) & Qt.ItemIsEditable  # Редактируемая строка
+        assert not model.flags(model.index(2, STATUS_COLUMN)) & Qt.ItemIsEditable  # Строка без занятия
+        assert not model.flags(model.index(0, 0)) & Qt.ItemIsEditable  # Колонка с именем студента
@@ -0,0 +1,78 @@
+import pytest  # Импортируем фреймворк для тестирования pytest
+from datetime import datetime  # Импортируем класс для работы с датой и временем
+from unittest.mock import patch, MagicMock  # Импортируем инструменты для создания моков
+from PyQt5.QtCore import Qt  # Импортируем константы Qt
+from views.attendance_window import AttendanceWindow  # Импортируем тестируемое окно
+from widgets.attendance_table import STATUS_COLUMN  # Импортируем номер колонки статуса
+
+ROWS = [
+    (1, "Иванов Иван", "101", "Математика", 10, datetime(2024, 9, 2, 9, 0), 'present'),
+    (2, "Петров Петр", "101", "Математика", 10, datetime(2024, 9, 2, 9, 0), None),
+]
+
+
+@pytest.fixture
+def window(qapp):
+    """Фикстура с окном преподавателя в режиме редактирования; загрузка данных перехвачена"""
+    executor = MagicMock()
+    with patch('views.attendance_window.get_query_executor', return_value=executor), \
+            patch('views.attendance_window.get_session'):
+        window = AttendanceWindow(role='teacher', user_id=1)
+    window.fill_table(ROWS)
+    window.toggle_editing()
+    executor.submit.reset_mock()
+    return window
+
+
+def set_status(window, row, status):
+    """Меняет отметку в строке так же, как делегат колонки статуса"""
+    window.model.setData(window.model.index(row, STATUS_COLUMN), status, Qt.EditRole)
+
+
+class TestChangeSet:
+    def test_edit_back_drops_change(self, window):
+        """Тест: отметка, возвращенная к исходному значению, выпадает из набора изменений"""
+        # Act - меняем отметку и возвращаем ее обратно
+        set_status(window, 0, 'late')
+        enabled_after_edit = window.btn_save.isEnabled()
+        set_status(window, 0, 'present')
+
+        # Assert - изменений нет, кнопки сохранения и отмены недоступны
+        assert enabled_after_edit  # Проверяем доступность сохранения после изменения
+        assert window.model.changes == {}  # Проверяем пустой набор изменений
+        assert not window.btn_save.isEnabled()  # Проверяем блокировку сохранения
+        assert not window.btn_undo.isEnabled()  # Проверяем блокировку отмены
+
+    def test_undo_restores_without_reload(self, window):
+        """Тест: отмена возвращает исходные отметки без повторной загрузки"""
+        # Arrange - меняем две отметки
+        set_status(window, 0, 'absent')
+        set_status(window, 1, 'sick')
+
+        # Act
+        window.btn_undo.click()
+
+        # Assert - исходные статусы на месте, запроса к БД не было
+        assert window.model.data(window.model.index(0, STATUS_COLUMN), Qt.EditRole) == 'present'  # Первая строка
+        assert window.model.data(window.model.index(1, STATUS_COLUMN), Qt.EditRole) is None  # Вторая строка
+        assert window.model.changes == {}  # Проверяем пустой набор изменений
+        window.executor.submit.assert_not_called()  # Проверяем отсутствие перезагрузки
+
+    def test_save_sends_only_changes_and_applies_in_place(self, window):
+        """Тест: сохраняются только измененные ячейки, строки обновляются без перезагрузки"""
+        # Arrange - меняем одну отметку
+        set_status(window, 1, 'absent')
+
+        # Act - сохраняем
+        with patch('views.attendance_window.get_session'), \
+                patch('views.attendance_window.AttendanceService.save_changes') as save_changes, \
+                patch('views.attendance_window.show_info'):
+            window.save_attendance()
+
+        # Assert - отправлено одно изменение, новая отметка стала исходной
+        save_changes.assert_called_once()  # Проверяем один вызов сохранения
+        assert save_changes.call_args.args[1] == {(2, 10): 'absent'}  # Проверяем набор изменений
+        assert window.model.changes == {}  # Проверяем очистку набора
+        assert not window.is_editing  # Проверяем выход из режима редактирования
+        assert window.model.data(window.model.index(1, STATUS_COLUMN), Qt.EditRole) == 'absent'  # Проверяем строку
+        window.executor.submit.assert_not_called()  # Проверяем отсутствие перезагрузки
@@ -0,0 +1,127 @@
+import pytest  # Импортируем фреймворк для тестирования pytest
+from datetime import datetime, date  # Импортируем классы для работы с датой и временем
+from unittest.mock import patch, MagicMock  # Импортируем инструменты для создания моков
+from PyQt5.QtCore import QDate  # Импортируем класс даты Qt
+from sqlalchemy import event  # Импортируем систему событий SQLAlchemy
+from models import Group, Subject, Lesson, Teacher, User  # Импортируем модели
+from services.report_cache import ReportCache  # Импортируем кэш результатов
+from widgets.calendar import CalendarWidget, add_months  # Импортируем тестируемый виджет
+
+
+@pytest.fixture
+def db(db):
+    """Фикстура с SQLite: занятия в августе, сентябре и ноябре 2024 года"""
+    db.add(User(id=1, login="teacher", password="x", role="teacher", email="t@example.com"))
+    db.add(Teacher(id=1, first_name="Иван", last_name="Петров", user_id=1))
+    db.add(Group(id=1, name="101"))
+    db.add(Subject(id=1, name="Математика"))
+    for date_time in (datetime(2024, 8, 30, 9, 0), datetime(2024, 9, 2, 11, 0),
+                      datetime(2024, 9, 2, 9, 0), datetime(2024, 11, 5, 9, 0)):
+        db.add(Lesson(subject_id=1, teacher_id=1, group_id=1, date_time=date_time))
+    db.commit()
+    return db
+
+
+@pytest.fixture
+def widget(qapp, db):
+    """Фикстура с календарем на сентябре 2024; фоновые запросы выполняются сразу"""
+    executor = MagicMock()
+    executor.submit.side_effect = lambda key, fn, *args, on_result, on_error: on_result(fn(db, *args))
+    with patch('widgets.calendar.get_query_executor', return_value=executor), \
+            patch('widgets.calendar.get_report_cache', return_value=ReportCache()):
+        widget = CalendarWidget()
+        widget.calendar.setSelectedDate(QDate(2024, 9, 2))
+    executor.submit.reset_mock()
+    return widget
+
+
+class TestQueryMonths:
+    def test_day_index(self, db):
+        """Тест: занятия месяцев разложены по дням в порядке времени"""
+        # Act - загружаем август - октябрь
+        months = CalendarWidget.query_months(db, date(2024, 8, 1), date(2024, 10, 1))
+
+        # Assert - индекс по дням, пустой октябрь тоже загружен
+        assert list(months) == [date(2024, 8, 1), date(2024, 9, 1), date(2024, 10, 1)]  # Проверяем месяцы
+        assert months[date(2024, 10, 1)] == {}  # Проверяем пустой месяц
+        assert [row[0] for row in months[date(2024, 9, 1)][date(2024, 9, 2)]] == ["09:00", "11:00"]  # Проверяем порядок
+        assert months[date(2024, 8, 1)][date(2024, 8, 30)] == [("09:00", "Математика", "Петров Иван", "101")]  # Проверяем строку
+
+    def test_single_query(self, db):
+        """Тест: несколько месяцев читаются одним запросом"""
+        # Arrange - перехватываем выполненные запросы
+        statements = []
+        event.listen(db.get_bind(), "before_cursor_execute",
+                     lambda conn, cursor, statement, *args: statements.append(statement))
+
+        # Act
+        CalendarWidget.query_months(db, date(2024, 8, 1), date(2024, 12, 1))
+
+        # Assert
+        assert len(statements) == 1  # Проверяем один запрос
+
+    def test_add_months_across_year(self):
+        """Тест: сдвиг месяца через границу года"""
+        # Assert
+        assert add_months(date(2024, 12, 1), 1) == date(2025, 1, 1)  # Проверяем переход вперед
+        assert add_months(date(2024, 1, 1), -1) == date(2023, 12, 1)  # Проверяем переход назад
+
+
+class TestCalendarWidget:
+    def test_selected_day_from_index(self, widget):
+        """Тест: выбор даты показывает занятия из индекса без запроса"""
+        # Act - выбираем день без занятий, затем день с двумя занятиями
+        widget.calendar.setSelectedDate(QDate(2024, 9, 3))
+        empty_day_rows = widget.lessons_table.rowCount()
+        widget.calendar.setSelectedDate(QDate(2024, 9, 2))
+
+        # Assert - занятия показаны, запросов не было
+        widget.executor.submit.assert_not_called()  # Проверяем отсутствие запроса
+        assert empty_day_rows == 0  # Проверяем пустой день
+        assert widget.lessons_table.rowCount() == 2  # Проверяем строки занятий
+        assert widget.lessons_table.item(0, 0).text() == "09:00"  # Проверяем порядок по времени
+
+    def test_days_with_lessons_marked(self, widget):
+        """Тест: дни с занятиями видимого и соседних месяцев выделены"""
+        # Act - читаем форматы дат календаря
+        formats = widget.calendar.dateTextFormat()
+
+        # Assert - отмечены 30 августа и 2 сентября
+        assert set(formats) == {QDate(2024, 8, 30), QDate(2024, 9, 2)}  # Проверяем отмеченные дни
+
+    def test_page_change_loads_only_missing_months(self, widget):
+        """Тест: при листании загружаются только недостающие месяцы"""
+        # Act - переходим на октябрь: сентябрь и октябрь уже загружены
+        widget.calendar.setCurrentPage(2024, 10)
+
+        # Assert - один запрос только за ноябрь
+        widget.executor.submit.assert_called_once()  # Проверяем один запрос
+        assert widget.executor.submit.call_args.args[2:] == (date(2024, 11, 1), date(2024, 11, 1))
+        assert QDate(2024, 11, 5) in widget.calendar.dateTextFormat()  # Проверяем отметку ноября
+
+    def test_reload_after_invalidation(self, widget):
+        """Тест: после изменения данных календарь при показе загружает месяцы заново"""
+        # Arrange - данные изменены (например, на вкладке управления)
+        widget.cache.invalidate()
+
+        # Act - календарь снова показывается
+        widget.show()
+
+        # Assert - видимый и соседние месяцы загружены одним запросом
+        widget.executor.submit.assert_called_once()  # Проверяем запрос
+        assert widget.executor.submit.call_args.args[2:] == (date(2024, 8, 1), date(2024, 10, 1))
+        assert widget.loaded_version == widget.cache.version  # Проверяем актуальную версию
+        widget.close()
+
+    def test_report_cache_untouched(self, widget):
+        """Тест: индекс месяцев не занимает общий кэш отчетов и не влияет на его статистику"""
+        # Act - листаем календарь и выбираем даты
+        widget.calendar.setCurrentPage(2024, 10)
+        widget.calendar.setSelectedDate(QDate(2024, 10, 1))
+        widget.calendar.setCurrentPage(2024, 9)
+
+        # Assert - в кэше отчетов нет записей и обращений, месяцы хранит календарь
+        stats = widget.cache.stats()
+        assert stats['size'] == 0  # Проверяем пустой кэш отчетов
+        assert stats['hits'] == stats['misses'] == 0  # Проверяем отсутствие обращений
+        assert {date(2024, 8, 1), date(2024, 9, 1), date(2024, 10, 1), date(2024, 11, 1)} <= set(widget.months)  # Проверяем месяцы
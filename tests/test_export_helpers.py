@@ -0,0 +1,97 @@
+import pytest  # Импортируем фреймворк для тестирования pytest
+from contextlib import contextmanager  # Импортируем декоратор контекстных менеджеров
+from unittest.mock import patch, MagicMock  # Импортируем инструменты для создания моков
+from utils.export_helpers import export_report, export_batch_report  # Импортируем тестируемые функции
+
+COLUMNS = {'date': 'Дата', 'attendance': 'Посещаемость (%)'}
+
+
+@pytest.fixture
+def events():
+    """Фикстура со списком событий: выбор файла, открытие и закрытие источника строк"""
+    return []
+
+
+def rows_source(events, rows):
+    """Источник строк, который записывает момент открытия и закрытия (как сессия БД)"""
+    @contextmanager
+    def open_rows():
+        events.append('open')
+        yield iter(rows)
+        events.append('close')
+    return open_rows
+
+
+def save_dialog(events, filename):
+    """Диалог сохранения, который записывает момент своего вызова"""
+    def get_save_file_name(*args):
+        events.append('dialog')
+        return filename, ""
+    return get_save_file_name
+
+
+class TestExportReport:
+    def test_file_chosen_before_rows_opened(self, events):
+        """Тест: файл выбирается до открытия источника строк, строки пишутся в генератор"""
+        # Arrange
+        generator = MagicMock()
+        generator.generate_attendance_csv.side_effect = lambda rows, filename, headers: bool(list(rows))
+
+        # Act
+        with patch('utils.export_helpers.QFileDialog.getSaveFileName', side_effect=save_dialog(events, "/tmp/report")), \
+                patch('utils.export_helpers.show_info'):
+            result = export_report(None, COLUMNS, generator, "csv", rows_source(events, [["02.09.2024", "50.0%"]]))
+
+        # Assert - сначала диалог, затем открытие и закрытие источника
+        assert result is True  # Проверяем успешный экспорт
+        assert events == ['dialog', 'open', 'close']  # Проверяем порядок
+        assert generator.generate_attendance_csv.call_args.args[1:] == ("/tmp/report.csv", list(COLUMNS.values()))
+
+    def test_cancelled_dialog_does_not_open_rows(self, events):
+        """Тест: при отмене выбора файла источник строк не открывается"""
+        # Act
+        with patch('utils.export_helpers.QFileDialog.getSaveFileName', side_effect=save_dialog(events, "")):
+            result = export_report(None, COLUMNS, MagicMock(), "csv", rows_source(events, [["02.09.2024", "50.0%"]]))
+
+        # Assert
+        assert result is False  # Проверяем отказ от экспорта
+        assert events == ['dialog']  # Проверяем, что источник не открывался
+
+    def test_empty_result_checked_inside_stream(self, events):
+        """Тест: пустой результат обнаруживается по первой строке, файл не создается"""
+        # Arrange
+        generator = MagicMock()
+
+        # Act
+        with patch('utils.export_helpers.QFileDialog.getSaveFileName', side_effect=save_dialog(events, "/tmp/report.csv")), \
+                patch('utils.export_helpers.show_error') as show_error:
+            result = export_report(None, COLUMNS, generator, "csv", rows_source(events, []))
+
+        # Assert - сообщение об отсутствии данных, генератор не вызывался, источник закрыт
+        assert result is False  # Проверяем отказ от экспорта
+        show_error.assert_called_once_with("Ошибка", "Нет данных для экспорта")  # Проверяем сообщение
+        generator.generate_attendance_csv.assert_not_called()  # Проверяем отсутствие записи файла
+        assert events[:2] == ['dialog', 'open']  # Проверяем порядок
+
+
+class TestExportBatchReport:
+    def test_file_chosen_before_sheets_opened(self, events):
+        """Тест: архив выбирается до открытия источника листов"""
+        # Arrange - источник с одним листом
+        @contextmanager
+        def open_sheets():
+            events.append('open')
+            yield iter([("Иванов Иван", [["02.09.2024", "50.0%"]])]), 1
+            events.append('close')
+        generator = MagicMock()
+        generator.generate_batch_archive.return_value = True
+
+        # Act
+        with patch('utils.export_helpers.QFileDialog.getSaveFileName', side_effect=save_dialog(events, "/tmp/sheets")), \
+                patch('utils.export_helpers.QProgressDialog'), patch('utils.export_helpers.show_info'):
+            result = export_batch_report(None, COLUMNS, generator, "csv", open_sheets)
+
+        # Assert - сначала диалог, затем открытие и закрытие источника
+        assert result is True  # Проверяем успешный экспорт
+        assert events == ['dialog', 'open', 'close']  # Проверяем порядок
+        assert generator.generate_batch_archive.call_args.args[1] == "/tmp/sheets.zip"  # Проверяем имя архива
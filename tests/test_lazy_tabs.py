@@ -0,0 +1,61 @@
+import pytest  # Импортируем фреймворк для тестирования pytest
+from unittest.mock import MagicMock  # Импортируем инструменты для создания моков
+from PyQt5.QtWidgets import QWidget  # Импортируем класс виджета Qt
+from widgets.lazy_tabs import LazyTabWidget  # Импортируем тестируемый виджет вкладок
+
+
+@pytest.fixture
+def factories():
+    """Фикстура с тремя фабриками, создающими пустые виджеты"""
+    return [MagicMock(side_effect=QWidget) for _ in range(3)]
+
+
+@pytest.fixture
+def tabs(qapp, factories):
+    """Фикстура с тремя ленивыми вкладками"""
+    widget = LazyTabWidget()
+    for i, factory in enumerate(factories):
+        widget.add_lazy_tab(factory, f"Вкладка {i}")
+    return widget
+
+
+class TestLazyTabWidget:
+    def test_only_current_tab_built(self, tabs, factories):
+        """Тест: при создании строится только текущая (первая) вкладка"""
+        # Assert
+        factories[0].assert_called_once()  # Проверяем, что первая вкладка создана
+        factories[1].assert_not_called()  # Проверяем, что вторая вкладка не создана
+        factories[2].assert_not_called()  # Проверяем, что третья вкладка не создана
+        assert tabs.content(1) is None  # Проверяем, что у второй вкладки нет содержимого
+
+    def test_tab_built_on_activation(self, tabs, factories):
+        """Тест: вкладка строится при первом открытии и помещается в заготовку"""
+        # Act
+        tabs.setCurrentIndex(2)  # Открываем третью вкладку
+
+        # Assert
+        factories[2].assert_called_once()  # Проверяем, что фабрика вызвана
+        factories[1].assert_not_called()  # Проверяем, что пропущенная вкладка не создана
+        assert tabs.content(2).parent() is tabs.widget(2)  # Проверяем, что содержимое в заготовке вкладки
+
+    def test_tab_built_once(self, tabs, factories):
+        """Тест: повторное открытие вкладки не создает содержимое заново"""
+        # Arrange
+        tabs.setCurrentIndex(1)  # Открываем вторую вкладку
+        content = tabs.content(1)  # Запоминаем созданное содержимое
+
+        # Act
+        tabs.setCurrentIndex(0)  # Возвращаемся на первую вкладку
+        tabs.setCurrentIndex(1)  # Снова открываем вторую
+
+        # Assert
+        factories[1].assert_called_once()  # Проверяем, что фабрика вызвана один раз
+        assert tabs.content(1) is content  # Проверяем, что содержимое то же самое
+
+    def test_built_contents(self, tabs):
+        """Тест: built_contents возвращает только открытые вкладки по порядку"""
+        # Act
+        tabs.setCurrentIndex(2)  # Открываем третью вкладку
+
+        # Assert
+        assert tabs.built_contents() == [tabs.content(0), tabs.content(2)]  # Проверяем список содержимого
@@ -0,0 +1,144 @@
+import pytest  # Импортируем фреймворк для тестирования pytest
+from datetime import datetime, date, time  # Импортируем классы для работы с датой и временем
+from unittest.mock import patch  # Импортируем инструменты для создания моков
+from PyQt5.QtCore import QDate  # Импортируем класс даты Qt
+from sqlalchemy import event  # Импортируем систему событий SQLAlchemy
+from models import Group, Subject, Lesson, Teacher, User, AttendanceDaily  # Импортируем модели
+from services.lesson_generator import LessonGenerator  # Импортируем тестируемый класс
+from views.admin_window import RecurringLessonsDialog  # Импортируем диалог генерации занятий
+
+# Понедельник и среда в 9:00, пятница в 13:30
+PATTERN = [(0, time(9, 0)), (2, time(9, 0)), (4, time(13, 30))]
+
+
+@pytest.fixture
+def db(db):
+    """Фикстура с SQLite: группа, преподаватель и предмет без занятий"""
+    db.add(User(id=1, login="teacher", password="x", role="teacher", email="t@example.com"))
+    db.add(Teacher(id=1, first_name="Иван", last_name="Петров", user_id=1))
+    db.add(Group(id=1, name="101"))
+    db.add(Subject(id=1, name="Математика"))
+    db.commit()
+    return db
+
+
+class TestOccurrences:
+    def test_weekly_pattern(self):
+        """Тест: занятия создаются по дням недели шаблона в порядке времени"""
+        # Act - неделя со 2 по 8 сентября 2024 (понедельник - воскресенье)
+        result = LessonGenerator.occurrences(date(2024, 9, 2), date(2024, 9, 8), PATTERN)
+
+        # Assert
+        assert result == [datetime(2024, 9, 2, 9, 0), datetime(2024, 9, 4, 9, 0),
+                          datetime(2024, 9, 6, 13, 30)]  # Проверяем даты и время
+
+    def test_holidays_excluded(self):
+        """Тест: праздничные дни пропускаются"""
+        # Arrange - среда 4 сентября и период со 2 по 3 сентября - праздники
+        holidays = LessonGenerator.parse_holidays("04.09.2024; 02.09.2024-03.09.2024")
+
+        # Act
+        result = LessonGenerator.occurrences(date(2024, 9, 2), date(2024, 9, 8), PATTERN, holidays)
+
+        # Assert - осталась только пятница
+        assert holidays == {date(2024, 9, 2), date(2024, 9, 3), date(2024, 9, 4)}  # Проверяем разбор праздников
+        assert result == [datetime(2024, 9, 6, 13, 30)]  # Проверяем оставшееся занятие
+
+    def test_invalid_holidays(self):
+        """Тест: неверная строка праздников вызывает ValueError"""
+        # Assert
+        with pytest.raises(ValueError):
+            LessonGenerator.parse_holidays("31.02.2024")  # Проверяем несуществующую дату
+        with pytest.raises(ValueError):
+            LessonGenerator.parse_holidays("10.09.2024-01.09.2024")  # Проверяем обратный период
+
+
+class TestCreate:
+    def test_semester_single_insert(self, db):
+        """Тест: семестр добавляется одним пакетным INSERT и попадает в сводку"""
+        # Arrange - строки занятий на осенний семестр и перехват запросов
+        rows = LessonGenerator.build_rows(date(2024, 9, 1), date(2024, 12, 31), PATTERN,
+                                          group_id=1, teacher_id=1, subject_id=1, location="101")
+        statements = []
+        event.listen(db.get_bind(), "before_cursor_execute",
+                     lambda conn, cursor, statement, *args: statements.append(statement))
+
+        # Act - добавляем занятия и фиксируем транзакцию
+        count = LessonGenerator.create(db, rows)
+        db.commit()
+
+        # Assert - все занятия добавлены одной командой INSERT в lessons, сводка обновлена
+        inserts = [s for s in statements if s.startswith("INSERT INTO lessons")]
+        assert count == len(rows) == db.query(Lesson).count()  # Проверяем число занятий
+        assert len(inserts) == 1  # Проверяем одну пакетную вставку
+        assert db.query(AttendanceDaily).count() == len(rows)  # Проверяем строки сводки по дням
+
+    def test_rollback_leaves_no_lessons(self, db):
+        """Тест: при ошибке транзакция откатывается целиком"""
+        # Arrange - строки занятий
+        rows = LessonGenerator.build_rows(date(2024, 9, 1), date(2024, 9, 30), PATTERN,
+                                          group_id=1, teacher_id=1, subject_id=1)
+
+        # Act - пересчет сводки падает после вставки
+        with patch('services.lesson_generator.AttendanceRollup.refresh', side_effect=RuntimeError):
+            with pytest.raises(RuntimeError):
+                LessonGenerator.create(db, rows)
+        db.rollback()
+
+        # Assert
+        assert db.query(Lesson).count() == 0  # Проверяем отсутствие занятий
+
+
+class TestRecurringLessonsDialog:
+    def test_preview_without_writes(self, qapp, db):
+        """Тест: предпросмотр показывает занятия, не записывая их в БД"""
+        # Arrange - диалог со справочниками из тестовой БД
+        with patch('views.admin_window.get_session', return_value=db):
+            dialog = RecurringLessonsDialog()
+            dialog.start_date.setDate(QDate(2024, 9, 2))
+            dialog.end_date.setDate(QDate(2024, 9, 15))
+            dialog.weekday_checks[0].setChecked(True)  # Понедельник
+            dialog.weekday_checks[3].setChecked(True)  # Четверг
+
+            # Act
+            dialog.preview()
+
+        # Assert - четыре занятия в таблице, кнопка создания доступна, БД не изменилась
+        assert dialog.preview_table.rowCount() == 4  # Проверяем строки предпросмотра
+        assert dialog.preview_table.item(1, 1).text() == "Четверг"  # Проверяем день недели
+        assert dialog.create_button.isEnabled()  # Проверяем доступность создания
+        assert db.query(Lesson).count() == 0  # Проверяем отсутствие записи
+
+    def test_change_resets_preview(self, qapp, db):
+        """Тест: изменение параметров сбрасывает предпросмотр"""
+        # Arrange - построенный предпросмотр
+        with patch('views.admin_window.get_session', return_value=db):
+            dialog = RecurringLessonsDialog()
+            dialog.weekday_checks[0].setChecked(True)
+            dialog.preview()
+
+        # Act - меняем шаблон
+        dialog.weekday_checks[1].setChecked(True)
+
+        # Assert
+        assert dialog.rows == []  # Проверяем сброс строк
+        assert not dialog.create_button.isEnabled()  # Проверяем блокировку создания
+
+    def test_conflicts_block_creation(self, qapp, db):
+        """Тест: занятия, пересекающиеся с расписанием, отмечаются и не создаются"""
+        # Arrange - у группы уже есть занятие в понедельник 2 сентября в 10:00
+        db.add(Lesson(subject_id=1, teacher_id=1, group_id=1, date_time=datetime(2024, 9, 2, 10, 0)))
+        db.commit()
+        with patch('views.admin_window.get_session', return_value=db):
+            dialog = RecurringLessonsDialog()
+            dialog.start_date.setDate(QDate(2024, 9, 2))
+            dialog.end_date.setDate(QDate(2024, 9, 15))
+            dialog.weekday_checks[0].setChecked(True)  # Понедельник в 9:00
+
+            # Act
+            dialog.preview()
+
+        # Assert - конфликт у первого занятия, создание недоступно
+        assert dialog.preview_table.item(0, 3).text().startswith("Преподаватель")  # Проверяем описание конфликта
+        assert dialog.preview_table.item(1, 3).text() == ""  # Проверяем занятие без конфликта
+        assert not dialog.create_button.isEnabled()  # Проверяем блокировку создания
@@ -0,0 +1,69 @@
+import pytest  # Импортируем фреймворк для тестирования pytest
+from unittest.mock import patch, MagicMock  # Импортируем инструменты для создания моков
+from PyQt5.QtCore import QThreadPool, Qt  # Импортируем классы Qt
+from services.query_executor import QueryExecutor  # Импортируем исполнитель фоновых запросов
+from widgets.paged_table import KeysetTableModel  # Импортируем тестируемую модель
+
+
+def number_pages(total):
+    """Функция страниц по числам 0..total-1 с ключом - последним числом страницы"""
+    def page_fn(db, after, limit):
+        start = 0 if after is None else after + 1
+        rows = [[str(n), str(n * n)] for n in range(start, min(start + limit, total))]
+        return rows, int(rows[-1][0]) if rows else after
+    return page_fn
+
+
+@pytest.fixture
+def model(qapp):
+    """Фикстура с моделью на отдельном пуле потоков и страницами по 10 строк"""
+    pool = QThreadPool()
+    with patch('services.query_executor.get_session', return_value=MagicMock()):
+        yield KeysetTableModel(["Число", "Квадрат"], 'numbers', QueryExecutor(pool), page_size=10)
+        pool.waitForDone()
+
+
+def wait_for(model, qapp):
+    """Дожидается загрузки страницы и доставляет сигналы в поток GUI"""
+    model.executor.pool.waitForDone()
+    qapp.processEvents()
+
+
+class TestKeysetTableModel:
+    def test_first_page_loaded_on_reset(self, model, qapp):
+        """Тест: после сброса загружается только первая страница"""
+        # Act - задаем источник строк и ждем первую страницу
+        model.reset(number_pages(25))
+        wait_for(model, qapp)
+
+        # Assert - загружено 10 строк, можно подгрузить еще
+        assert model.rowCount() == 10  # Проверяем размер первой страницы
+        assert model.data(model.index(3, 1), Qt.DisplayRole) == "9"  # Проверяем значение ячейки
+        assert model.canFetchMore()  # Проверяем возможность подгрузки
+
+    def test_fetch_more_until_exhausted(self, model, qapp):
+        """Тест подгрузки страниц до конца данных"""
+        # Arrange - загружаем первую страницу
+        model.reset(number_pages(25))
+        wait_for(model, qapp)
+
+        # Act - подгружаем страницы, пока модель это разрешает
+        while model.canFetchMore():
+            model.fetchMore()
+            wait_for(model, qapp)
+
+        # Assert - загружены все строки по порядку
+        assert model.rowCount() == 25  # Проверяем общее количество строк
+        assert [model.rows[i][0] for i in (0, 10, 24)] == ["0", "10", "24"]  # Проверяем порядок строк
+
+    def test_no_duplicate_fetch_while_loading(self, model, qapp):
+        """Тест: пока страница грузится, повторная подгрузка не запускается"""
+        # Act - сбрасываем модель и сразу запрашиваем следующую страницу
+        model.reset(number_pages(25))
+        loading = not model.canFetchMore()
+        model.fetchMore()
+        wait_for(model, qapp)
+
+        # Assert - загружена только одна страница
+        assert loading  # Проверяем блокировку подгрузки во время загрузки
+        assert model.rowCount() == 10  # Проверяем отсутствие дублирующей страницы
@@ -0,0 +1,105 @@
+import pytest  # Импортируем фреймворк для тестирования pytest
+from unittest.mock import patch, MagicMock  # Импортируем инструменты для создания моков
+from services import pdf_fonts  # Импортируем тестируемый модуль реестра шрифтов
+from services.report_generator import ReportGenerator  # Импортируем генератор отчетов
+
+
+@pytest.fixture
+def registry():
+    """Фикстура с пустым реестром шрифтов и замоканной загрузкой TTF"""
+    with patch.object(pdf_fonts, '_font_name', None), patch.object(pdf_fonts, '_table_style', None):
+        with patch('reportlab.pdfbase.pdfmetrics.registerFont') as register_font:
+            with patch('reportlab.pdfbase.ttfonts.TTFont') as ttfont:
+                yield register_font, ttfont
+
+
+class TestFontCandidates:
+    def test_no_windir(self):
+        """Тест: без переменной WINDIR поиск шрифтов не падает (Linux)"""
+        # Arrange - окружение без WINDIR и без fontconfig
+        with patch.dict('os.environ', {}, clear=True), patch.object(pdf_fonts, '_fontconfig_path', return_value=None):
+            # Act - получаем список кандидатов
+            candidates = list(pdf_fonts.font_candidates())
+
+        # Assert - в списке шрифт проекта и системные пути DejaVu
+        assert candidates[0].endswith('DejaVuSans.ttf')  # Проверяем шрифт из папки проекта
+        assert '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf' in candidates  # Проверяем путь Debian/Ubuntu
+        assert not any('arial' in path for path in candidates[:2])  # Проверяем отсутствие пути Windows
+
+    def test_windows_and_fontconfig(self):
+        """Тест: учитываются шрифт Windows и путь, найденный fontconfig"""
+        # Arrange - окружение Windows и ответ fontconfig
+        with patch.dict('os.environ', {'WINDIR': 'C:\\Windows'}), \
+                patch.object(pdf_fonts, '_fontconfig_path', return_value='/opt/fonts/Sans.ttf'):
+            # Act - получаем список кандидатов
+            candidates = list(pdf_fonts.font_candidates())
+
+        # Assert - порядок: проект, Windows, fontconfig
+        assert 'arial.ttf' in candidates[1]  # Проверяем шрифт Windows
+        assert candidates[2] == '/opt/fonts/Sans.ttf'  # Проверяем путь fontconfig
+
+    def test_fontconfig_ignores_non_ttf(self):
+        """Тест: шрифты не в формате TrueType из fontconfig не используются"""
+        # Arrange - fc-match возвращает шрифт OpenType
+        result = MagicMock(returncode=0, stdout='/usr/share/fonts/noto/NotoSans.otf')
+        with patch('services.pdf_fonts.shutil.which', return_value='/usr/bin/fc-match'), \
+                patch('services.pdf_fonts.subprocess.run', return_value=result):
+            # Act - запрашиваем путь у fontconfig
+            path = pdf_fonts._fontconfig_path()
+
+        # Assert - путь отброшен
+        assert path is None  # Проверяем результат
+
+
+class TestFontRegistry:
+    def test_registers_once(self, registry):
+        """Тест: шрифт регистрируется один раз на процесс"""
+        # Arrange - первый кандидат существует
+        register_font, ttfont = registry
+        with patch('services.pdf_fonts.os.path.isfile', return_value=True):
+            # Act - обращаемся к шрифту и стилю несколько раз
+            names = [pdf_fonts.pdf_font_name() for _ in range(3)]
+            ReportGenerator().pdf_table_style
+            ReportGenerator().pdf_table_style
+
+        # Assert - TTF загружен один раз, имя зарегистрированного шрифта
+        assert names == [pdf_fonts.PDF_FONT_NAME] * 3  # Проверяем имя шрифта
+        register_font.assert_called_once()  # Проверяем однократную регистрацию
+        ttfont.assert_called_once()  # Проверяем однократный разбор TTF
+
+    def test_fallback_without_fonts(self, registry):
+        """Тест: без шрифтов с кириллицей используется Helvetica"""
+        # Arrange - ни один кандидат не существует
+        register_font, _ = registry
+        with patch('services.pdf_fonts.os.path.isfile', return_value=False), \
+                patch.object(pdf_fonts, '_fontconfig_path', return_value=None):
+            # Act - получаем стиль таблиц
+            style = pdf_fonts.pdf_table_style()
+
+        # Assert - шрифт не регистрировался, стиль использует Helvetica
+        register_font.assert_not_called()  # Проверяем отсутствие регистрации
+        assert ('FONTNAME', (0, 1), (-1, -1), 'Helvetica') in style.getCommands()  # Проверяем шрифт в стиле
+
+    def test_skips_broken_font(self, registry):
+        """Тест: поврежденный файл шрифта пропускается"""
+        # Arrange - первый найденный файл не читается
+        register_font, ttfont = registry
+        ttfont.side_effect = [Exception("bad font"), MagicMock()]
+        with patch('services.pdf_fonts.os.path.isfile', return_value=True):
+            # Act - регистрируем шрифт
+            name = pdf_fonts.pdf_font_name()
+
+        # Assert - зарегистрирован следующий кандидат
+        assert name == pdf_fonts.PDF_FONT_NAME  # Проверяем имя шрифта
+        assert ttfont.call_count == 2  # Проверяем попытку второго кандидата
+        register_font.assert_called_once()  # Проверяем регистрацию
+
+    def test_style_shared(self, registry):
+        """Тест: генераторы отчетов используют один общий стиль"""
+        # Arrange - шрифт найден
+        with patch('services.pdf_fonts.os.path.isfile', return_value=True):
+            # Act - получаем стиль из двух генераторов
+            first, second = ReportGenerator().pdf_table_style, ReportGenerator().pdf_table_style
+
+        # Assert - это один и тот же объект
+        assert first is second  # Проверяем общий стиль
@@ -0,0 +1,71 @@
+import pytest  # Импортируем фреймворк для тестирования pytest
+import threading  # Импортируем модуль для синхронизации потоков
+from unittest.mock import patch, MagicMock  # Импортируем инструменты для создания моков
+from PyQt5.QtCore import QThreadPool  # Импортируем пул потоков Qt
+from services.query_executor import QueryExecutor  # Импортируем тестируемый класс
+
+
+@pytest.fixture
+def executor(qapp):
+    """Фикстура с исполнителем запросов на отдельном пуле потоков"""
+    pool = QThreadPool()
+    pool.setMaxThreadCount(1)  # Один поток, чтобы запросы выполнялись по очереди
+    # Патчим get_session, чтобы фоновые задачи не обращались к реальной базе данных
+    with patch('services.query_executor.get_session', return_value=MagicMock()):
+        yield QueryExecutor(pool)
+        pool.waitForDone()
+
+
+def wait_for(executor, qapp):
+    """Дожидается завершения задач и доставляет сигналы в поток GUI"""
+    executor.pool.waitForDone()
+    qapp.processEvents()
+
+
+class TestQueryExecutor:
+    def test_result_delivered_to_callback(self, executor, qapp):
+        """Тест доставки результата запроса в обработчик"""
+        # Arrange - подготавливаем функцию запроса и обработчик
+        received = []
+        query_fn = MagicMock(return_value=[(1, "Иванов Иван")])
+
+        # Act - запускаем запрос и ждем его завершения
+        executor.submit('students', query_fn, 5, on_result=received.append)
+        wait_for(executor, qapp)
+
+        # Assert - обработчик получил строки, функция получила сессию и аргументы
+        assert received == [[(1, "Иванов Иван")]]  # Проверяем полученные строки
+        assert query_fn.call_args.args[1] == 5  # Проверяем переданный аргумент
+        assert not executor.is_pending('students')  # Проверяем, что запрос завершен
+
+    def test_stale_request_is_discarded(self, executor, qapp):
+        """Тест: новый запрос с тем же ключом отменяет предыдущий"""
+        # Arrange - блокируем пул первой задачей, чтобы запросы остались в очереди
+        release = threading.Event()
+        executor.submit('blocker', lambda db: release.wait(5), on_result=lambda rows: None)
+        received = []
+
+        # Act - отправляем два запроса с одним ключом и отпускаем пул
+        executor.submit('report', lambda db: 'старый', on_result=received.append)
+        executor.submit('report', lambda db: 'новый', on_result=received.append)
+        release.set()
+        wait_for(executor, qapp)
+
+        # Assert - получен только результат последнего запроса
+        assert received == ['новый']  # Проверяем, что устаревший результат отброшен
+
+    def test_error_delivered_to_error_callback(self, executor, qapp):
+        """Тест передачи ошибки запроса в обработчик ошибок"""
+        # Arrange - подготавливаем функцию, вызывающую исключение
+        def failing_query(db):
+            raise ValueError("нет соединения")
+        errors = []
+        results = []
+
+        # Act - запускаем запрос
+        executor.submit('schedule', failing_query, on_result=results.append, on_error=errors.append)
+        wait_for(executor, qapp)
+
+        # Assert - вызван только обработчик ошибок
+        assert errors == ["нет соединения"]  # Проверяем текст ошибки
+        assert results == []  # Проверяем, что результат не доставлен
@@ -0,0 +1,96 @@
+import pytest  # Импортируем фреймворк для тестирования pytest
+from datetime import date  # Импортируем класс даты для параметров фильтров
+from services.report_cache import ReportCache  # Импортируем тестируемый класс
+
+
+class FakeClock:
+    """Управляемые часы для проверки времени жизни записей"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    """Фикстура с управляемыми часами"""
+    return FakeClock()
+
+
+@pytest.fixture
+def cache(clock):
+    """Фикстура с кэшем на 3 записи и временем жизни 60 секунд"""
+    return ReportCache(max_entries=3, ttl=60, clock=clock)
+
+
+class TestReportCache:
+    def test_hit_after_put(self, cache):
+        """Тест попадания в кэш для тех же фильтров"""
+        # Arrange - сохраняем результат отчета
+        key = cache.make_key('group_attendance', date(2024, 9, 1), date(2024, 9, 30), group_id=1)
+        cache.put(key, [["101", "Математика", "2", "50%"]])
+
+        # Act - ищем результат по ключу с теми же фильтрами
+        found, rows = cache.get(cache.make_key('group_attendance', date(2024, 9, 1), date(2024, 9, 30), group_id=1))
+
+        # Assert - результат найден, счетчик попаданий увеличен
+        assert found and rows == [["101", "Математика", "2", "50%"]]  # Проверяем найденный результат
+        assert cache.stats()['hits'] == 1  # Проверяем счетчик попаданий
+
+    def test_miss_for_other_filters(self, cache):
+        """Тест промаха для других параметров фильтра"""
+        # Arrange - сохраняем результат для группы 1
+        cache.put(cache.make_key('group_attendance', group_id=1), ["строки"])
+
+        # Act - ищем результат для группы 2
+        found, _ = cache.get(cache.make_key('group_attendance', group_id=2))
+
+        # Assert - промах учтен в статистике
+        assert not found  # Проверяем промах
+        assert cache.stats() == {'hits': 0, 'misses': 1, 'size': 1, 'hit_rate': 0.0}  # Проверяем статистику
+
+    def test_entries_expire(self, cache, clock):
+        """Тест истечения времени жизни записи"""
+        # Arrange - сохраняем результат и сдвигаем часы за пределы TTL
+        key = cache.make_key('stats', date(2024, 9, 1))
+        cache.put(key, "графики")
+        clock.now = 61
+
+        # Act - ищем устаревший результат
+        found, _ = cache.get(key)
+
+        # Assert - запись удалена
+        assert not found  # Проверяем промах
+        assert cache.stats()['size'] == 0  # Проверяем удаление записи
+
+    def test_least_recently_used_evicted(self, cache):
+        """Тест вытеснения давно не использованной записи при переполнении"""
+        # Arrange - заполняем кэш и обращаемся к первой записи
+        keys = [cache.make_key('date_attendance', n) for n in range(3)]
+        for n, key in enumerate(keys):
+            cache.put(key, n)
+        cache.get(keys[0])
+
+        # Act - добавляем четвертую запись
+        cache.put(cache.make_key('date_attendance', 3), 3)
+
+        # Assert - вытеснена вторая запись, первая сохранилась
+        assert cache.get(keys[0]) == (True, 0)  # Проверяем недавно использованную запись
+        assert cache.get(keys[1]) == (False, None)  # Проверяем вытесненную запись
+
+    def test_invalidate_drops_results_and_late_puts(self, cache):
+        """Тест сброса кэша после записи данных"""
+        # Arrange - сохраняем результат и запоминаем ключ выполняющегося запроса
+        old_key = cache.make_key('group_size')
+        cache.put(old_key, ["до изменения"])
+        running_key = cache.make_key('teacher_lessons')
+
+        # Act - сбрасываем кэш и сохраняем результат запроса, начатого до сброса
+        cache.invalidate()
+        cache.put(running_key, ["устаревшие строки"])
+
+        # Assert - ни старый, ни запоздавший результат не находятся
+        assert cache.get(cache.make_key('group_size')) == (False, None)  # Проверяем сброс
+        assert cache.stats()['size'] == 0  # Проверяем, что запоздавший результат не сохранен
@@ -1,6 +1,10 @@
 import pytest  # Импортируем фреймворк для тестирования pytest
 from unittest.mock import patch, MagicMock, mock_open  # Импортируем инструменты для создания моков
 import os  # Импортируем модуль os для работы с операционной системой
+import openpyxl  # Импортируем openpyxl для чтения сохраненных отчетов
+import zipfile  # Импортируем zipfile для чтения архивов пакетного экспорта
+from io import BytesIO  # Импортируем буфер для чтения файлов из архива
+from os.path import join  # Сохраняем ссылку на настоящий os.path.join до патчей фикстуры
 from services.report_generator import ReportGenerator  # Импортируем тестируемый класс генератора отчетов
 
 
@@ -8,18 +12,15 @@ from services.report_generator import ReportGenerator  # Импортируем
 def report_generator():
     """Фикстура для создания экземпляра ReportGenerator"""
     # Используем множественные патчи для изоляции тестов от внешних зависимостей
-    # Патчим registerFont из reportlab.pdfbase.pdfmetrics, чтобы не регистрировать реальные шрифты
-    with patch('services.report_generator.pdfmetrics.registerFont'):
+    # Подменяем реестр шрифтов: встроенный Helvetica без поиска и загрузки TTF,
+    # общий стиль таблиц создается заново и не переживает тест
+    with patch('services.pdf_fonts._font_name', 'Helvetica'), patch('services.pdf_fonts._table_style', None):
         # Патчим os.path.exists, чтобы всегда возвращал True при проверке существования файлов
         with patch('services.report_generator.os.path.exists', return_value=True):
-            # Патчим TTFont из reportlab.pdfbase.ttfonts, чтобы не загружать реальные шрифты
-            with patch('services.report_generator.TTFont'):
-                # Патчим os.environ для имитации переменных окружения Windows
-                with patch('services.report_generator.os.environ', {'WINDIR': 'C:\\Windows'}):
-                    # Патчим os.path.join, чтобы всегда возвращал фиксированный путь
-                    with patch('services.report_generator.os.path.join', return_value='dummy_path'):
-                        # Возвращаем экземпляр ReportGenerator для использования в тестах
-                        yield ReportGenerator()
+            # Патчим os.path.join, чтобы всегда возвращал фиксированный путь
+            with patch('services.report_generator.os.path.join', return_value='dummy_path'):
+                # Возвращаем экземпляр ReportGenerator для использования в тестах
+                yield ReportGenerator()
 
 
 @pytest.fixture
@@ -56,28 +57,60 @@ def sample_data():
     ]
 
 
+def consume_story(story):
+    """Забирает элементы документа так же, как SimpleDocTemplate.build"""
+    while len(story):
+        del story[0]
+
+
 class TestReportGenerator:
     def test_generate_attendance_pdf_success(self, report_generator, sample_data):
         """Тест успешной генерации PDF-отчета о посещаемости"""
         # Arrange - подготавливаем тестовое окружение
         # Патчим классы из reportlab для работы с PDF
-        with patch('services.report_generator.SimpleDocTemplate') as mock_doc:
-            with patch('services.report_generator.Table') as mock_table:
-                with patch('services.report_generator.TableStyle') as mock_style:
-                    with patch('services.report_generator.Config') as mock_config:
-                        # Настраиваем моки
-                        mock_config.BASE_DIR = MagicMock()  # Мокируем базовую директорию
-                        mock_table_instance = mock_table.return_value  # Получаем экземпляр мока таблицы
-                        mock_doc_instance = mock_doc.return_value  # Получаем экземпляр мока документа
-                        
-                        # Act - вызываем тестируемый метод
-                        result = report_generator.generate_attendance_pdf(sample_data, "test_report.pdf")
-                        
-                        # Assert - проверяем результаты
-                        assert result is True  # Проверяем, что метод вернул True (успешное выполнение)
-                        mock_table.assert_called_once()  # Проверяем, что была создана таблица
-                        mock_table_instance.setStyle.assert_called_once()  # Проверяем, что был установлен стиль таблицы
-                        mock_doc_instance.build.assert_called_once()  # Проверяем, что документ был построен
+        with patch('reportlab.platypus.SimpleDocTemplate') as mock_doc:
+            with patch('reportlab.platypus.LongTable') as mock_table:
+                with patch('services.report_generator.Config') as mock_config:
+                    # Настраиваем моки
+                    mock_config.BASE_DIR = MagicMock()  # Мокируем базовую директорию
+                    mock_doc_instance = mock_doc.return_value  # Получаем экземпляр мока документа
+                    mock_doc_instance.width = 500  # Задаем ширину области страницы
+                    mock_doc_instance.build.side_effect = consume_story  # Разбираем документ, как reportlab
+                    
+                    # Act - вызываем тестируемый метод
+                    result = report_generator.generate_attendance_pdf(sample_data, "test_report.pdf")
+                    
+                    # Assert - проверяем результаты
+                    assert result is True  # Проверяем, что метод вернул True (успешное выполнение)
+                    mock_table.assert_called_once()  # Проверяем, что была создана таблица
+                    assert mock_table.call_args.kwargs['style'] is report_generator.pdf_table_style  # Проверяем стиль таблицы
+                    mock_doc_instance.build.assert_called_once()  # Проверяем, что документ был построен
+    
+    def test_generate_attendance_pdf_from_row_iterator(self, report_generator):
+        """Тест постраничной генерации PDF-отчета из итератора строк"""
+        # Arrange - подготавливаем генератор строк, как при чтении из курсора БД
+        headers = ['Группа', 'Количество студентов']
+        rows = (['10' + str(i), str(i)] for i in range(7))
+        progress = []
+        report_generator.progress_updated.connect(progress.append)
+        with patch('reportlab.platypus.SimpleDocTemplate') as mock_doc:
+            with patch('reportlab.platypus.LongTable') as mock_table:
+                mock_doc.return_value.width = 500  # Задаем ширину области страницы
+                mock_doc.return_value.build.side_effect = consume_story  # Разбираем документ, как reportlab
+                
+                # Act - вызываем тестируемый метод с порциями по 3 строки
+                result = report_generator.generate_attendance_pdf(rows, "/tmp/test_report.pdf", headers, rows_per_page=3)
+
+                # Assert - строки разбиты на три таблицы с повторяющимся заголовком
+                assert result is True  # Проверяем успешное выполнение
+                chunks = [call.args[0] for call in mock_table.call_args_list]  # Получаем данные каждой таблицы
+                assert [len(chunk) - 1 for chunk in chunks] == [3, 3, 1]  # Проверяем размеры порций
+                assert all(chunk[0] == headers for chunk in chunks)  # Проверяем заголовок в каждой порции
+                assert chunks[2][1] == ['106', '6']  # Проверяем последнюю строку
+                assert all(call.kwargs['repeatRows'] == 1 for call in mock_table.call_args_list)  # Проверяем повтор заголовка
+                widths = {tuple(call.kwargs['colWidths']) for call in mock_table.call_args_list}
+                assert len(widths) == 1 and sum(widths.pop()) == pytest.approx(500)  # Проверяем общие ширины колонок
+                assert progress == [3, 6, 7]  # Проверяем сообщения о прогрессе
     
     def test_generate_attendance_pdf_empty_data(self, report_generator):
         """Тест генерации PDF-отчета с пустыми данными"""
@@ -91,7 +124,7 @@ class TestReportGenerator:
         """Тест обработки исключений при генерации PDF-отчета"""
         # Arrange - подготавливаем тестовое окружение
         # Патчим SimpleDocTemplate, чтобы он вызывал исключение
-        with patch('services.report_generator.SimpleDocTemplate') as mock_doc:
+        with patch('reportlab.platypus.SimpleDocTemplate') as mock_doc:
             mock_doc.side_effect = Exception("Test exception")  # Настраиваем мок на вызов исключения
             
             # Act - вызываем тестируемый метод
@@ -104,23 +137,62 @@ class TestReportGenerator:
         """Тест успешной генерации Excel-отчета о посещаемости"""
         # Arrange - подготавливаем тестовое окружение
         # Патчим openpyxl.Workbook для работы с Excel
-        with patch('services.report_generator.openpyxl.Workbook') as mock_workbook:
+        with patch('openpyxl.Workbook') as mock_workbook:
             with patch('services.report_generator.Config') as mock_config:
                 # Настраиваем моки
                 mock_config.BASE_DIR = MagicMock()  # Мокируем базовую директорию
                 mock_wb = MagicMock()  # Создаем мок рабочей книги
                 mock_ws = MagicMock()  # Создаем мок рабочего листа
                 mock_workbook.return_value = mock_wb  # Настраиваем возвращаемое значение
-                mock_wb.active = mock_ws  # Устанавливаем активный лист
+                mock_wb.create_sheet.return_value = mock_ws  # Лист создается в режиме write_only
                 
                 # Act - вызываем тестируемый метод
                 result = report_generator.generate_attendance_excel(sample_data, "test_report.xlsx")
                 
                 # Assert - проверяем результаты
                 assert result is True  # Проверяем, что метод вернул True (успешное выполнение)
+                mock_workbook.assert_called_once_with(write_only=True)  # Проверяем потоковый режим книги
                 mock_ws.append.assert_called()  # Проверяем, что данные были добавлены в лист
                 mock_wb.save.assert_called_once()  # Проверяем, что файл был сохранен
     
+    def test_generate_attendance_excel_from_row_iterator(self, report_generator):
+        """Тест генерации Excel-отчета из итератора строк с отдельными заголовками"""
+        # Arrange - подготавливаем генератор строк и мок рабочей книги
+        headers = ['Дата', 'Количество занятий']
+        rows = iter([['01.09.2024', '2'], ['02.09.2024', '3']])
+        with patch('openpyxl.Workbook') as mock_workbook:
+            mock_ws = mock_workbook.return_value.create_sheet.return_value  # Получаем мок листа
+            
+            # Act - вызываем тестируемый метод
+            result = report_generator.generate_attendance_excel(rows, "/tmp/test_report.xlsx", headers)
+            
+            # Assert - в лист записаны заголовки и обе строки
+            assert result is True  # Проверяем успешное выполнение
+            appended = [call.args[0] for call in mock_ws.append.call_args_list]  # Получаем записанные строки
+            assert [cell.value for cell in appended[0]] == headers  # Проверяем ячейки заголовков
+            assert appended[1:] == [['01.09.2024', '2'], ['02.09.2024', '3']]  # Проверяем порядок записи
+    
+    def test_generate_attendance_excel_streams_with_progress(self, tmp_path, report_generator):
+        """Тест записи большого Excel-отчета с сообщениями о прогрессе"""
+        # Arrange - подготавливаем генератор из 2500 строк и приемник сигнала прогресса
+        rows = ([f"Студент {i}", "Присутствовал"] for i in range(2500))
+        progress = []
+        report_generator.progress_updated.connect(progress.append)
+        filename = str(tmp_path / "report.xlsx")
+        
+        # Возвращаем настоящий os.path.join, подмененный фикстурой, для записи и чтения файла
+        with patch('services.report_generator.os.path.join', side_effect=join):
+            # Act - вызываем тестируемый метод с шагом прогресса 1000 строк
+            result = report_generator.generate_attendance_excel(rows, filename, ['Студент', 'Статус'], progress_step=1000)
+            ws = openpyxl.load_workbook(filename).active  # Открываем сохраненный файл
+        
+        # Assert - файл записан полностью, заголовок оформлен, прогресс отправлен порциями
+        assert result is True  # Проверяем успешное выполнение
+        assert progress == [1000, 2000, 2500]  # Проверяем сообщения о прогрессе
+        assert ws.max_row == 2501  # Проверяем количество строк вместе с заголовком
+        assert ws['A1'].value == 'Студент' and ws['A1'].font.bold  # Проверяем оформление заголовка
+        assert ws.column_dimensions['A'].width >= len("Студент 99")  # Проверяем ширину колонки
+    
     def test_generate_attendance_excel_empty_data(self, report_generator):
         """Тест генерации Excel-отчета с пустыми данными"""
         # Act - вызываем тестируемый метод с пустым списком данных
@@ -133,11 +205,143 @@ class TestReportGenerator:
         """Тест обработки исключений при генерации Excel-отчета"""
         # Arrange - подготавливаем тестовое окружение
         # Патчим openpyxl.Workbook, чтобы он вызывал исключение
-        with patch('services.report_generator.openpyxl.Workbook') as mock_workbook:
+        with patch('openpyxl.Workbook') as mock_workbook:
             mock_workbook.side_effect = Exception("Test exception")  # Настраиваем мок на вызов исключения
             
             # Act - вызываем тестируемый метод
             result = report_generator.generate_attendance_excel(sample_data, "test_report.xlsx")
             
             # Assert - проверяем результаты
-            assert result is False  # Проверяем, что метод вернул False (неуспешное выполнение)
\ No newline at end of file
+            assert result is False  # Проверяем, что метод вернул False (неуспешное выполнение)
+
+    def test_generate_attendance_csv(self, tmp_path, report_generator):
+        """Тест генерации CSV-отчета в UTF-8 с BOM порциями строк"""
+        # Arrange - подготавливаем генератор строк и приемник сигнала прогресса
+        rows = ([f"Студент {i}", "Болеет"] for i in range(5))
+        progress = []
+        report_generator.progress_updated.connect(progress.append)
+        filename = str(tmp_path / "report.csv")
+        
+        # Возвращаем настоящий os.path.join, подмененный фикстурой
+        with patch('services.report_generator.os.path.join', side_effect=join):
+            # Act - вызываем тестируемый метод с порциями по 2 строки
+            result = report_generator.generate_attendance_csv(rows, filename, ['Студент', 'Статус'], batch_size=2)
+        
+        # Assert - файл начинается с BOM и содержит заголовок и все строки
+        content = open(filename, 'rb').read()  # Читаем файл в байтах
+        lines = content.decode('utf-8-sig').splitlines()  # Декодируем без BOM
+        assert result is True  # Проверяем успешное выполнение
+        assert content.startswith(b'\xef\xbb\xbf')  # Проверяем наличие BOM
+        assert lines[0] == 'Студент,Статус'  # Проверяем строку заголовков
+        assert len(lines) == 6  # Проверяем количество строк
+        assert progress == [2, 4, 5]  # Проверяем сообщения о прогрессе
+    
+    def test_generate_attendance_csv_empty_data(self, report_generator):
+        """Тест генерации CSV-отчета с пустыми данными"""
+        # Act - вызываем тестируемый метод с пустым итератором
+        result = report_generator.generate_attendance_csv(iter([]), "test_report.csv", ['Студент'])
+        
+        # Assert - проверяем результаты
+        assert result is False  # Проверяем, что метод вернул False (неуспешное выполнение)
+    
+    def test_generate_attendance_parquet(self, tmp_path, report_generator):
+        """Тест генерации Parquet-отчета пакетами строк"""
+        # Arrange - пропускаем тест без pyarrow и подготавливаем данные
+        pq = pytest.importorskip("pyarrow.parquet")
+        rows = ([f"Студент {i}", "Присутствовал"] for i in range(7))
+        filename = str(tmp_path / "report.parquet")
+        
+        # Возвращаем настоящий os.path.join, подмененный фикстурой
+        with patch('services.report_generator.os.path.join', side_effect=join):
+            # Act - вызываем тестируемый метод с пакетами по 3 строки
+            result = report_generator.generate_attendance_parquet(rows, filename, ['Студент', 'Статус'], batch_size=3)
+            table = pq.read_table(filename)  # Читаем сохраненный файл
+        
+        # Assert - колонки названы заголовками, все строки записаны
+        assert result is True  # Проверяем успешное выполнение
+        assert table.column_names == ['Студент', 'Статус']  # Проверяем названия колонок
+        assert table.num_rows == 7  # Проверяем количество строк
+        assert table.column('Студент')[6].as_py() == "Студент 6"  # Проверяем последнее значение
+    
+    def test_generate_attendance_parquet_without_pyarrow(self, report_generator):
+        """Тест: без pyarrow Parquet-экспорт завершается неуспешно"""
+        # Arrange - имитируем отсутствие пакета pyarrow
+        with patch.dict('sys.modules', {'pyarrow': None, 'pyarrow.parquet': None}):
+            # Act - вызываем тестируемый метод
+            result = report_generator.generate_attendance_parquet(iter([["a"]]), "test_report.parquet", ['Колонка'])
+        
+        # Assert - проверяем результаты
+        assert result is False  # Проверяем, что метод вернул False (неуспешное выполнение)
+    
+    def test_generate_batch_archive(self, tmp_path, report_generator):
+        """Тест пакетного экспорта: по файлу Excel на каждый лист в zip-архиве"""
+        # Arrange - три листа, два из них с одинаковым именем
+        sheets = iter([
+            ("Иванов Иван", [["Иванов Иван", "Присутствовал"]]),
+            ("Петров/Петр", [["Петров Петр", "Болеет"], ["Петров Петр", "Опоздал"]]),
+            ("Иванов Иван", [["Иванов Иван", "Отсутствовал"]]),
+        ])
+        progress = []
+        report_generator.progress_updated.connect(progress.append)
+        filename = str(tmp_path / "sheets.zip")
+
+        # Возвращаем настоящий os.path.join, подмененный фикстурой
+        with patch('services.report_generator.os.path.join', side_effect=join):
+            # Act - формируем архив в пуле из двух процессов
+            result = report_generator.generate_batch_archive(
+                sheets, filename, ['Студент', 'Статус'], 'generate_attendance_excel', '.xlsx', max_workers=2
+            )
+            archive = zipfile.ZipFile(filename)  # Открываем архив
+            ws = openpyxl.load_workbook(BytesIO(archive.read('Петров_Петр.xlsx'))).active  # Открываем книгу из архива
+
+        # Assert - в архиве три книги с уникальными именами и своими строками
+        assert result is True  # Проверяем успешное выполнение
+        assert sorted(archive.namelist()) == ['Иванов Иван (2).xlsx', 'Иванов Иван.xlsx', 'Петров_Петр.xlsx']  # Проверяем имена файлов
+        assert list(ws.values) == [('Студент', 'Статус'), ('Петров Петр', 'Болеет'), ('Петров Петр', 'Опоздал')]  # Проверяем содержимое
+        assert progress == [1, 2, 3]  # Проверяем прогресс по готовым файлам
+
+    def test_generate_batch_archive_spawns_workers(self, tmp_path, report_generator):
+        """Тест: процессы пула запускаются через spawn, а не fork процесса Qt"""
+        # Arrange - подменяем пул процессов
+        with patch('services.report_generator.ProcessPoolExecutor') as mock_pool:
+            # Act - формируем архив без листов
+            report_generator.generate_batch_archive(
+                iter([]), str(tmp_path / "sheets.zip"), ['Студент'], 'generate_attendance_csv', '.csv', max_workers=1
+            )
+
+        # Assert - пул создан с контекстом spawn
+        assert mock_pool.call_args.kwargs['mp_context'].get_start_method() == 'spawn'  # Проверяем способ запуска
+
+    def test_generate_batch_archive_cancel(self, tmp_path, report_generator):
+        """Тест: отмена пакетного экспорта удаляет незавершенный архив"""
+        # Arrange - отменяем экспорт после первого готового файла
+        sheets = ((f"Студент {i}", [[f"Студент {i}", "Присутствовал"]]) for i in range(20))
+        report_generator.progress_updated.connect(lambda done: report_generator.cancel_batch())
+        filename = str(tmp_path / "sheets.zip")
+
+        # Возвращаем настоящий os.path.join, подмененный фикстурой
+        with patch('services.report_generator.os.path.join', side_effect=join):
+            # Act - формируем архив в пуле из одного процесса
+            result = report_generator.generate_batch_archive(
+                sheets, filename, ['Студент', 'Статус'], 'generate_attendance_csv', '.csv', max_workers=1
+            )
+
+            # Assert - экспорт прерван, архив удален
+            assert result is False  # Проверяем, что метод вернул False
+            assert not (tmp_path / "sheets.zip").exists()  # Проверяем удаление архива
+
+    def test_generate_batch_archive_render_error(self, tmp_path, report_generator):
+        """Тест: ошибка генерации листа прерывает пакетный экспорт"""
+        # Arrange - лист без строк генератор файла не создает
+        filename = str(tmp_path / "sheets.zip")
+
+        # Возвращаем настоящий os.path.join, подмененный фикстурой
+        with patch('services.report_generator.os.path.join', side_effect=join):
+            # Act - формируем архив из пустого листа
+            result = report_generator.generate_batch_archive(
+                iter([("Пустой", [])]), filename, ['Студент'], 'generate_attendance_csv', '.csv', max_workers=1
+            )
+
+            # Assert - экспорт завершен неуспешно, архив удален
+            assert result is False  # Проверяем, что метод вернул False
+            assert not (tmp_path / "sheets.zip").exists()  # Проверяем удаление архива
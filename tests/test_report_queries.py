@@ -0,0 +1,278 @@
+import os  # Импортируем модуль os для чтения переменных окружения
+import random  # Импортируем генератор случайных чисел для тестовых данных
+import time  # Импортируем модуль time для замера времени запросов
+import pytest  # Импортируем фреймворк для тестирования pytest
+from collections import Counter  # Импортируем счетчик для эталонного расчета
+from datetime import datetime, date, timedelta  # Импортируем классы для работы с датой и временем
+from sqlalchemy import insert, event  # Импортируем конструктор INSERT и систему событий SQLAlchemy
+from types import GeneratorType  # Импортируем тип генератора для проверки ленивого чтения
+from sqlalchemy import create_engine  # Импортируем функцию создания движка SQLAlchemy
+from sqlalchemy.orm import sessionmaker  # Импортируем фабрику сессий
+from models import Base, Student, Group, Subject, Lesson, Attendance, Teacher, User  # Импортируем модели
+from services.report_queries import ReportQueries  # Импортируем тестируемый класс
+from services.attendance_rollup import AttendanceRollup  # Импортируем сборку сводки посещаемости
+
+
+@pytest.fixture
+def db(db):
+    """Фикстура с сессией SQLite: группа из 5 студентов и 2 занятия"""
+    db.add(User(id=1, login="teacher", password="x", role="teacher", email="t@example.com"))
+    db.add(Teacher(id=1, first_name="Иван", last_name="Петров", user_id=1))
+    db.add(Group(id=1, name="101"))
+    db.add(Subject(id=1, name="Математика"))
+    for i in range(5):
+        db.add(Student(id=i + 1, full_name=f"Студент {i + 1}", group_id=1))
+    for day in (2, 3):
+        db.add(Lesson(id=day, subject_id=1, teacher_id=1, group_id=1,
+                           date_time=datetime(2024, 9, day, 9, 0)))
+    for student_id in range(1, 6):
+        db.add(Attendance(student_id=student_id, lesson_id=2, status="present"))
+        db.add(Attendance(student_id=student_id, lesson_id=3, status="absent"))
+    db.commit()
+    return db
+
+
+class TestReportQueries:
+    def test_stream_rows_matches_fetch_rows(self, db):
+        """Тест: потоковый экспорт дает те же строки, что и отчет в таблице"""
+        # Arrange - параметры отчета о посещаемости студентов
+        args = (ReportQueries.student_attendance, ReportQueries.student_attendance_row,
+                date(2024, 9, 1), date(2024, 9, 30))
+
+        # Act - получаем строки обоими способами, читая поток маленькими порциями
+        stream = ReportQueries.stream_rows(db, *args, batch_size=3)
+        streamed = list(stream)
+        fetched = ReportQueries.fetch_rows(db, *args)
+
+        # Assert - строки совпадают, а поток читается лениво
+        assert isinstance(stream, GeneratorType)  # Проверяем, что строки отдаются генератором
+        assert len(streamed) == 10  # Проверяем количество строк
+        assert sorted(streamed) == sorted(fetched)  # Проверяем совпадение содержимого
+
+    def test_stream_rows_formats_values(self, db):
+        """Тест форматирования строк отчета для экспорта"""
+        # Act - получаем строки отчета по студенту за первый день
+        rows = list(ReportQueries.stream_rows(
+            db, ReportQueries.student_attendance, ReportQueries.student_attendance_row,
+            date(2024, 9, 2), date(2024, 9, 2), student_id=1
+        ))
+
+        # Assert - значения подготовлены к записи в файл
+        assert rows == [["Студент 1", "Математика", "02.09.2024 09:00", "Присутствовал", "Петров Иван"]]
+
+    def test_stream_rows_empty_range(self, db):
+        """Тест: для периода без занятий поток пуст"""
+        # Act - запрашиваем отчет за период без занятий
+        rows = list(ReportQueries.stream_rows(
+            db, ReportQueries.teacher_lessons, ReportQueries.teacher_lessons_row,
+            date(2024, 10, 1), date(2024, 10, 31)
+        ))
+
+        # Assert - строк нет
+        assert rows == []  # Проверяем пустой результат
+
+
+def generate_dataset(session, groups, students_per_group, lessons_per_group, seed=1):
+    """Заполняет базу случайными группами, занятиями и отметками посещаемости.
+
+    Группа 1 остается без студентов, у группы 2 нет ни одной отметки.
+    """
+    rng = random.Random(seed)
+    session.add(User(id=1, login="teacher", password="x", role="teacher", email="t@example.com"))
+    session.add(Teacher(id=1, first_name="Иван", last_name="Петров", user_id=1))
+    session.commit()
+    session.execute(insert(Group), [{'id': g, 'name': f"Г{g}"} for g in range(1, groups + 1)])
+    session.execute(insert(Subject), [{'id': s, 'name': f"Предмет {s}"} for s in range(1, 6)])
+
+    students, lessons, marks = [], [], []
+    start = datetime(2024, 9, 2, 9, 0)
+    for g in range(1, groups + 1):
+        group_students = [] if g == 1 else [len(students) + i + 1 for i in range(students_per_group)]
+        students += [{'id': sid, 'full_name': f"Студент {sid}", 'group_id': g} for sid in group_students]
+        for n in range(lessons_per_group):
+            lesson_id = len(lessons) + 1
+            lessons.append({'id': lesson_id, 'subject_id': rng.randint(1, 5), 'teacher_id': 1, 'group_id': g,
+                            'date_time': start + timedelta(days=n % 60, hours=n // 60)})
+            if g == 2:
+                continue
+            for sid in group_students:
+                status = rng.choice(['present', 'present', 'late', 'absent', 'sick', None])
+                if status:
+                    marks.append({'student_id': sid, 'lesson_id': lesson_id, 'status': status})
+    session.execute(insert(Student), students)
+    session.execute(insert(Lesson), lessons)
+    for i in range(0, len(marks), 50000):
+        session.execute(insert(Attendance), marks[i:i + 50000])
+    session.commit()
+    return students, lessons, marks
+
+
+def reference_group_report(students, lessons, marks, start, end):
+    """Эталонный расчет отчета по группам на Python по исходным строкам"""
+    group_size = Counter(s['group_id'] for s in students)
+    period = {l['id']: l for l in lessons if start <= l['date_time'].date() <= end}
+    lesson_count = Counter((l['group_id'], l['subject_id']) for l in period.values())
+    present = Counter(
+        (period[m['lesson_id']]['group_id'], period[m['lesson_id']]['subject_id'])
+        for m in marks if m['lesson_id'] in period and m['status'] == 'present'
+    )
+    report = {}
+    for key, count in lesson_count.items():
+        expected = group_size[key[0]] * count
+        report[key] = (count, group_size[key[0]], round(100.0 * present[key] / expected, 2) if expected else 0)
+    return report
+
+
+@pytest.fixture
+def generated_db(engine):
+    """Фикстура со сгенерированным набором: 8 групп по 12 студентов и 40 занятий на группу"""
+    session = sessionmaker(bind=engine)()
+    data = generate_dataset(session, groups=8, students_per_group=12, lessons_per_group=40)
+    AttendanceRollup.rebuild(session)
+    session.commit()
+    yield session, data
+    session.close()
+
+
+class TestGroupAttendanceReport:
+    def test_matches_reference(self, generated_db):
+        """Тест: отчет по группам совпадает с эталонным расчетом по исходным строкам"""
+        # Arrange - выбираем период, захватывающий часть занятий
+        db, (students, lessons, marks) = generated_db
+        start, end = date(2024, 9, 10), date(2024, 10, 15)
+
+        # Act - строим отчет по сводке
+        rows = ReportQueries.group_attendance(db, start, end).add_columns(Group.id, Subject.id).all()
+
+        # Assert - совпадают набор групп и предметов, число занятий, число студентов и процент
+        actual = {(g, s): (count, students, round(float(percent), 2)) for _, _, count, students, percent, g, s in rows}
+        assert actual == reference_group_report(students, lessons, marks, start, end)
+
+    def test_keeps_groups_without_attendance(self, generated_db):
+        """Тест: группы без студентов или без отметок остаются в отчете с 0%"""
+        # Act - строим отчет за весь период
+        db, _ = generated_db
+        rows = ReportQueries.fetch_rows(db, ReportQueries.group_attendance, ReportQueries.group_attendance_row,
+                                        date(2024, 9, 1), date(2024, 12, 31))
+
+        # Assert - группы Г1 (без студентов) и Г2 (без отметок) присутствуют
+        percents = {row[4] for row in rows if row[0] in ("Г1", "Г2")}
+        assert {row[0] for row in rows} >= {"Г1", "Г2"}  # Проверяем наличие групп
+        assert percents <= {"0%", "0.0%"}  # Проверяем нулевую посещаемость
+
+    def test_report_reads_rollup_only(self, generated_db):
+        """Тест: отчет по группам не обращается к таблице отметок"""
+        # Act - компилируем запрос отчета
+        db, _ = generated_db
+        sql = str(ReportQueries.group_attendance(db, date(2024, 9, 1), date(2024, 9, 30)).statement)
+
+        # Assert - запрос читает только сводку и справочники
+        assert "attendance_daily" in sql  # Проверяем чтение сводки
+        assert "FROM attendance " not in sql and "JOIN attendance " not in sql  # Проверяем отсутствие сырых отметок
+
+
+@pytest.mark.skipif(not os.environ.get("RUN_BENCHMARKS"), reason="Замер производительности: RUN_BENCHMARKS=1")
+def test_benchmark_group_report(tmp_path):
+    """Замер отчета по группам на наборе из более чем 1 млн отметок"""
+    # Arrange - 100 групп по 25 студентов и 560 занятий на группу (~1,1 млн отметок)
+    engine = create_engine(f"sqlite:///{tmp_path / 'bench.db'}")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    _, _, marks = generate_dataset(db, groups=100, students_per_group=25, lessons_per_group=560)
+    start, end = date(2024, 9, 1), date(2024, 12, 31)
+
+    # Act - пересобираем сводку одним проходом и строим отчет по ней
+    began = time.perf_counter()
+    AttendanceRollup.rebuild(db)
+    db.commit()
+    rebuild_time = time.perf_counter() - began
+
+    began = time.perf_counter()
+    rows = ReportQueries.group_attendance(db, start, end).all()
+    report_time = time.perf_counter() - began
+
+    # Assert - отчет по сводке строится за доли секунды
+    print(f"\nотметок: {len(marks)}, пересборка сводки: {rebuild_time:.2f} с, отчет: {report_time * 1000:.1f} мс")
+    assert len(marks) > 1_000_000  # Проверяем объем набора
+    assert len(rows) > 0  # Проверяем наличие строк отчета
+    assert report_time < 1.0  # Проверяем время построения отчета
+    db.close()
+    engine.dispose()
+
+
+class TestStudentAttendancePages:
+    def test_pages_cover_all_rows_in_order(self, generated_db):
+        """Тест: страницы по ключу покрывают весь отчет без пропусков и повторов"""
+        # Arrange - параметры отчета по всем студентам за месяц
+        db, _ = generated_db
+        filters = dict(start_date=date(2024, 9, 1), end_date=date(2024, 9, 30))
+        full = ReportQueries.fetch_rows(db, ReportQueries.student_attendance, ReportQueries.student_attendance_row,
+                                        filters['start_date'], filters['end_date'])
+
+        # Act - читаем отчет страницами по 97 строк
+        pages, after = [], None
+        while True:
+            rows, after = ReportQueries.student_attendance_page(db, after, 97, **filters)
+            pages.append(rows)
+            if len(rows) < 97:
+                break
+        paged = [row for page in pages for row in page]
+
+        # Assert - те же строки, упорядоченные по дате
+        assert len(pages) > 2  # Проверяем, что отчет разбит на несколько страниц
+        assert sorted(paged) == sorted(full)  # Проверяем совпадение набора строк
+        dates = [datetime.strptime(row[2], "%d.%m.%Y %H:%M") for row in paged]
+        assert dates == sorted(dates)  # Проверяем порядок строк
+
+    def test_page_query_is_limited(self, generated_db):
+        """Тест: следующая страница выбирается сравнением с ключом и LIMIT"""
+        # Arrange - перехватываем выполненные запросы
+        db, _ = generated_db
+        statements = []
+        event.listen(db.get_bind(), "before_cursor_execute",
+                     lambda conn, cursor, statement, *args: statements.append(statement))
+        _, after = ReportQueries.student_attendance_page(db, None, 50, date(2024, 9, 1), date(2024, 9, 30))
+
+        # Act - запрашиваем вторую страницу
+        rows, _ = ReportQueries.student_attendance_page(db, after, 50, date(2024, 9, 1), date(2024, 9, 30))
+
+        # Assert - запрос продолжает чтение после ключа последней строки
+        assert len(rows) == 50  # Проверяем размер страницы
+        assert "(lessons.date_time, students.id, lessons.id) > (?, ?, ?)" in statements[-1]  # Проверяем условие по ключу
+        assert "LIMIT" in statements[-1]  # Проверяем ограничение размера страницы
+
+
+class TestAttendanceSheets:
+    def test_student_sheets_match_report(self, generated_db):
+        """Тест: листы по студентам совпадают с отчетом, отфильтрованным по каждому студенту"""
+        # Arrange - период и эталонный отчет по одному студенту
+        db, _ = generated_db
+        start, end = date(2024, 9, 1), date(2024, 9, 30)
+        expected = ReportQueries.fetch_rows(db, ReportQueries.student_attendance, ReportQueries.student_attendance_row,
+                                            start, end, student_id=13)
+
+        # Act - получаем листы по всем студентам, читая курсор маленькими порциями
+        sheets = list(ReportQueries.attendance_sheets(db, start, end, batch_size=50))
+
+        # Assert - по листу на студента с отметками, строки листа совпадают с отчетом
+        names = [name for name, _ in sheets]
+        assert len(names) == len(set(names)) == ReportQueries.attendance_sheet_count(db, start, end)  # Проверяем число листов
+        assert sorted(dict(sheets)["Студент 13"]) == sorted(expected)  # Проверяем строки листа
+        assert all(row[0] == name for name, rows in sheets for row in rows)  # Проверяем принадлежность строк
+
+    def test_group_sheets_single_query(self, generated_db):
+        """Тест: листы по выбранным группам читаются одним запросом"""
+        # Arrange - перехватываем выполненные запросы
+        db, (students, _, _) = generated_db
+        statements = []
+        event.listen(db.get_bind(), "before_cursor_execute",
+                     lambda conn, cursor, statement, *args: statements.append(statement))
+
+        # Act - получаем листы по группам 3 и 4
+        sheets = list(ReportQueries.attendance_sheets(db, date(2024, 9, 1), date(2024, 12, 31), 'group', ids=[3, 4]))
+
+        # Assert - два листа со всеми студентами группы и один запрос
+        assert [name for name, _ in sheets] == ["Группа Г3", "Группа Г4"]  # Проверяем имена листов
+        group_students = {s['full_name'] for s in students if s['group_id'] == 3}
+        assert {row[0] for row in sheets[0][1]} == group_students  # Проверяем студентов в листе группы
+        assert len(statements) == 1  # Проверяем количество запросов
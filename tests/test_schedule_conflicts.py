@@ -0,0 +1,187 @@
+import pytest  # Импортируем фреймворк для тестирования pytest
+from datetime import datetime, timedelta  # Импортируем классы для работы с датой и временем
+from types import SimpleNamespace  # Импортируем простое пространство имен для ошибки драйвера
+from sqlalchemy import create_mock_engine, event  # Импортируем макет движка и систему событий SQLAlchemy
+from sqlalchemy.exc import IntegrityError  # Импортируем ошибку нарушения ограничений
+from models import Base, Group, Subject, Lesson, Teacher, User  # Импортируем модели
+from services.schedule_conflicts import ScheduleConflicts  # Импортируем тестируемый класс
+
+MONDAY = datetime(2024, 9, 2, 9, 0)
+
+
+def lesson(date_time, teacher_id=1, group_id=1, location=None, lesson_id=None):
+    """Занятие в виде словаря для индекса"""
+    return {'id': lesson_id, 'date_time': date_time, 'teacher_id': teacher_id,
+            'group_id': group_id, 'location': location}
+
+
+@pytest.fixture
+def db(db):
+    """Фикстура с SQLite: два преподавателя, две группы и занятия по понедельникам в 9:00"""
+    db.add_all([User(id=i, login=f"t{i}", password="x", role="teacher", email=f"t{i}@example.com")
+                     for i in (1, 2)])
+    db.add_all([Teacher(id=i, first_name="Иван", last_name=f"Петров {i}", user_id=i) for i in (1, 2)])
+    db.add_all([Group(id=1, name="101"), Group(id=2, name="102")])
+    db.add(Subject(id=1, name="Математика"))
+    db.add_all([Lesson(id=week + 1, subject_id=1, teacher_id=1, group_id=1, location="201",
+                            date_time=MONDAY + timedelta(weeks=week)) for week in range(16)])
+    db.commit()
+    return db
+
+
+class TestConflicts:
+    @pytest.mark.parametrize("candidate, resource", [
+        (lesson(MONDAY + timedelta(minutes=30), teacher_id=1, group_id=2), 'teacher_id'),
+        (lesson(MONDAY - timedelta(minutes=60), teacher_id=2, group_id=1), 'group_id'),
+        (lesson(MONDAY, teacher_id=2, group_id=2, location="201"), 'location'),
+    ])
+    def test_overlap_by_resource(self, candidate, resource):
+        """Тест: пересечение обнаруживается по преподавателю, группе и аудитории"""
+        # Arrange - индекс с одним занятием
+        index = ScheduleConflicts([lesson(MONDAY, location="201", lesson_id=7)])
+
+        # Act
+        conflicts = index.conflicts(candidate)
+
+        # Assert
+        assert [(c['resource'], c['other_id']) for c in conflicts] == [(resource, 7)]  # Проверяем ресурс конфликта
+
+    def test_adjacent_lessons_allowed(self):
+        """Тест: занятие сразу после окончания предыдущего не конфликтует"""
+        # Arrange - индекс с занятием 9:00-10:30
+        index = ScheduleConflicts([lesson(MONDAY, lesson_id=1)])
+
+        # Act - занятия, начинающиеся ровно в 10:30 и заканчивающиеся ровно в 9:00
+        after = index.conflicts(lesson(MONDAY + index.duration))
+        before = index.conflicts(lesson(MONDAY - index.duration))
+
+        # Assert
+        assert after == [] and before == []  # Проверяем отсутствие конфликтов
+
+    def test_same_lesson_ignored(self):
+        """Тест: отредактированное занятие не конфликтует само с собой"""
+        # Arrange
+        index = ScheduleConflicts([lesson(MONDAY, lesson_id=1)])
+
+        # Act - то же занятие перенесено на 15 минут
+        conflicts = index.conflicts(lesson(MONDAY + timedelta(minutes=15), lesson_id=1))
+
+        # Assert
+        assert conflicts == []  # Проверяем отсутствие конфликта
+
+    def test_batch_checks_index_and_itself(self):
+        """Тест: пакет проверяется и по индексу, и на пересечения внутри себя"""
+        # Arrange - занятие преподавателя 2 в индексе и пакет из трех занятий
+        index = ScheduleConflicts([lesson(MONDAY, teacher_id=2, group_id=2, lesson_id=5)])
+        batch = [
+            lesson(MONDAY + timedelta(hours=3)),
+            lesson(MONDAY + timedelta(hours=3, minutes=45), group_id=3),  # Тот же преподаватель
+            lesson(MONDAY + timedelta(minutes=30), teacher_id=2, group_id=4),  # Пересекается с индексом
+        ]
+
+        # Act
+        conflicts = index.check_batch(batch)
+
+        # Assert - конфликтуют второе (с первым) и третье (с занятием #5) занятия
+        assert sorted(conflicts) == [1, 2]  # Проверяем номера занятий
+        assert conflicts[1][0]['resource'] == 'teacher_id'  # Проверяем конфликт внутри пакета
+        assert conflicts[2][0]['other_id'] == 5  # Проверяем конфликт с индексом
+        assert "Преподаватель 2" in ScheduleConflicts.describe(conflicts[2][0])  # Проверяем описание
+
+
+class TestDatabaseChecks:
+    def test_load_reads_window(self, db):
+        """Тест: индекс загружается одним запросом только за нужный период"""
+        # Arrange - перехватываем выполненные запросы
+        statements = []
+        event.listen(db.get_bind(), "before_cursor_execute",
+                     lambda conn, cursor, statement, *args: statements.append(statement))
+
+        # Act - загружаем третью и четвертую недели
+        index = ScheduleConflicts.load(db, MONDAY + timedelta(weeks=2), MONDAY + timedelta(weeks=4))
+
+        # Assert - два занятия, один запрос
+        assert len(statements) == 1  # Проверяем один запрос
+        assert index.conflicts(lesson(MONDAY + timedelta(weeks=3)))[0]['other_id'] == 4  # Проверяем занятие недели
+        assert index.conflicts(lesson(MONDAY + timedelta(weeks=5))) == []  # Проверяем отсутствие других недель
+
+    def test_check_saved(self, db):
+        """Тест: записанное занятие проверяется по остальным занятиям в БД"""
+        # Arrange - переносим занятие второй недели на время первого другой группе
+        moved = db.get(Lesson, 2)
+        moved.date_time, moved.group_id = MONDAY + timedelta(minutes=45), 2
+        db.flush()
+
+        # Act
+        conflicts = ScheduleConflicts.check_saved(db, 2)
+
+        # Assert - пересечение по преподавателю и аудитории с занятием #1
+        assert {(c['resource'], c['other_id']) for c in conflicts} == {('teacher_id', 1), ('location', 1)}
+
+    def test_check_pending_form_values(self, db):
+        """Тест: значения формы проверяются до записи, редактируемое занятие исключается"""
+        # Arrange - новое занятие другой группы через 45 минут после первого (строки формы)
+        form = {'date_time': "2024-09-02 09:45", 'teacher_id': "1", 'group_id': "2",
+                'subject_id': "1", 'location': ""}
+
+        # Act - проверяем новое занятие и перенос первого занятия на то же время
+        new_conflicts = ScheduleConflicts.check_lesson(db, ScheduleConflicts.pending_lesson(form))
+        edit_conflicts = ScheduleConflicts.check_lesson(db, ScheduleConflicts.pending_lesson(form, lesson_id=1))
+
+        # Assert - новое пересекается по преподавателю, перенос самого занятия - нет; в БД ничего не записано
+        assert [(c['resource'], c['other_id']) for c in new_conflicts] == [('teacher_id', 1)]  # Новое занятие
+        assert edit_conflicts == []  # Проверяем исключение редактируемого занятия
+        assert db.query(Lesson).count() == 16  # Проверяем отсутствие записи
+
+    def test_pending_lesson_without_date(self):
+        """Тест: занятие без даты не проверяется, неверная дата дает ValueError"""
+        # Act
+        pending = ScheduleConflicts.pending_lesson({'date_time': "", 'teacher_id': "None", 'group_id': "1"})
+
+        # Assert
+        assert pending['date_time'] is None and pending['teacher_id'] is None  # Проверяем пустые значения
+        assert ScheduleConflicts.resource_keys(pending) == []  # Проверяем отсутствие проверки
+        with pytest.raises(ValueError):
+            ScheduleConflicts.pending_lesson({'date_time': "02.09.2024 9:00"})  # Проверяем неверный формат
+
+    @pytest.mark.parametrize("pgcode, expected", [('23P01', True), ('23505', False)])
+    def test_is_exclusion_violation(self, pgcode, expected):
+        """Тест: нарушение ограничения EXCLUDE отличается от других ошибок целостности по SQLSTATE"""
+        # Arrange - ошибка драйвера с кодом SQLSTATE
+        error = IntegrityError("INSERT INTO lessons ...", {}, SimpleNamespace(pgcode=pgcode))
+
+        # Assert
+        assert ScheduleConflicts.is_exclusion_violation(error) is expected  # Проверяем распознавание
+        assert not ScheduleConflicts.is_exclusion_violation(ValueError("bad date"))  # Проверяем другие ошибки
+
+
+class TestExclusionConstraints:
+    def test_postgresql_ddl(self):
+        """Тест: в PostgreSQL для занятий создаются исключающие ограничения"""
+        # Arrange - движок, который только собирает DDL
+        statements = []
+        engine = create_mock_engine("postgresql://", lambda sql, *args, **kwargs: statements.append(
+            str(sql.compile(dialect=engine.dialect))))
+
+        # Act
+        Base.metadata.create_all(engine, checkfirst=False)
+
+        # Assert - расширение btree_gist и три ограничения с пересечением интервалов
+        exclusions = [s for s in statements if "EXCLUDE USING gist" in s]
+        assert "CREATE EXTENSION IF NOT EXISTS btree_gist" in statements  # Проверяем расширение
+        assert len(exclusions) == 3  # Проверяем ограничения
+        assert all("tsrange(date_time, date_time + interval '90 minutes') WITH &&" in s
+                   for s in exclusions)  # Проверяем интервал занятия
+
+    def test_other_dialects_skip_ddl(self):
+        """Тест: в других СУБД ограничения не создаются"""
+        # Arrange - движок SQLite, который только собирает DDL
+        statements = []
+        engine = create_mock_engine("sqlite://", lambda sql, *args, **kwargs: statements.append(
+            str(sql.compile(dialect=engine.dialect))))
+
+        # Act
+        Base.metadata.create_all(engine, checkfirst=False)
+
+        # Assert
+        assert not any("EXCLUDE" in s or "EXTENSION" in s for s in statements)  # Проверяем отсутствие DDL
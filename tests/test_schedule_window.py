@@ -0,0 +1,71 @@
+import pytest  # Импортируем фреймворк для тестирования pytest
+from datetime import datetime, date, timedelta  # Импортируем классы для работы с датой и временем
+from sqlalchemy import event, insert  # Импортируем события и конструктор INSERT
+from models import Group, Subject, Lesson, Teacher, User  # Импортируем модели
+from utils import week_range, month_range  # Импортируем интервалы недели и месяца
+from views.schedule_window import ScheduleWindow  # Импортируем тестируемое окно
+
+
+@pytest.fixture
+def db(db):
+    """Фикстура с SQLite: две группы и занятия каждый день за два года"""
+    db.add(User(id=1, login="teacher", password="x", role="teacher", email="t@example.com"))
+    db.add(Teacher(id=1, first_name="Иван", last_name="Петров", user_id=1))
+    db.add_all([Group(id=1, name="101"), Group(id=2, name="102")])
+    db.add_all([Subject(id=1, name="Математика"), Subject(id=2, name="Физика")])
+    db.commit()
+    start = datetime(2023, 9, 1, 9, 0)
+    db.execute(insert(Lesson), [
+        {'subject_id': 1 + day % 2, 'teacher_id': 1, 'group_id': group_id,
+         'date_time': start + timedelta(days=day, hours=group_id)}
+        for day in range(730) for group_id in (2, 1)
+    ])
+    db.commit()
+    return db
+
+
+class TestDateWindows:
+    def test_week_range_starts_monday(self):
+        """Тест: неделя начинается с понедельника и длится 7 дней"""
+        # Act - неделя, содержащая четверг 12.09.2024
+        start, end = week_range(date(2024, 9, 12))
+
+        # Assert
+        assert start == datetime(2024, 9, 9)  # Проверяем понедельник
+        assert end == datetime(2024, 9, 16)  # Проверяем конец недели
+
+
+class TestQueryLessons:
+    def test_limited_to_window(self, db):
+        """Тест: в расписание попадают только занятия выбранной недели"""
+        # Act - запрашиваем неделю
+        rows = ScheduleWindow.query_lessons(db, *week_range(date(2024, 9, 12)))
+
+        # Assert - 7 дней по занятию у каждой из двух групп
+        assert len(rows) == 14  # Проверяем количество занятий
+        assert {row[0][3:] for row in rows} == {"09.2024 10:00", "09.2024 11:00"}  # Проверяем даты
+
+    def test_ordered_by_group_and_time(self, db):
+        """Тест: занятия упорядочены по группе, затем по времени"""
+        # Act - запрашиваем месяц
+        rows = ScheduleWindow.query_lessons(db, *month_range(date(2024, 2, 10)))
+
+        # Assert - сначала все занятия группы 101 по порядку дней, затем группы 102
+        assert [row[3] for row in rows] == ["101"] * 29 + ["102"] * 29  # Проверяем порядок групп
+        days = [int(row[0][:2]) for row in rows[:29]]
+        assert days == list(range(1, 30))  # Проверяем порядок дней
+
+    def test_single_query_with_filters(self, db):
+        """Тест: расписание с фильтрами читается одним запросом без догрузки связей"""
+        # Arrange - перехватываем выполненные запросы
+        statements = []
+        event.listen(db.get_bind(), "before_cursor_execute",
+                     lambda conn, cursor, statement, *args: statements.append(statement))
+
+        # Act - запрашиваем месяц для группы и предмета
+        rows = ScheduleWindow.query_lessons(db, *month_range(date(2024, 3, 1)), group_id=1, subject_id=2)
+
+        # Assert - один запрос с окном по дате, строки только выбранной группы и предмета
+        assert len(statements) == 1  # Проверяем отсутствие N+1
+        assert "lessons.date_time >=" in statements[0]  # Проверяем ограничение окна
+        assert rows and {(row[1], row[3]) for row in rows} == {("Физика", "101")}  # Проверяем фильтры
@@ -0,0 +1,83 @@
+import pytest  # Импортируем фреймворк для тестирования pytest
+from types import SimpleNamespace  # Импортируем простое пространство имен для ошибки драйвера
+from unittest.mock import MagicMock  # Импортируем мок сессии PostgreSQL
+from sqlalchemy import inspect, text  # Импортируем инспектор схемы и текстовые запросы
+from sqlalchemy.exc import IntegrityError  # Импортируем ошибку нарушения ограничений
+from services.schema_upgrade import SchemaUpgrade  # Импортируем тестируемый класс
+
+
+@pytest.fixture
+def engine(engine):
+    """Фикстура с SQLite, где таблицы созданы до появления индексов в моделях"""
+    with engine.begin() as conn:
+        for name in ('ix_lessons_group_id_date_time', 'ix_lessons_teacher_id_date_time', 'ix_attendance_lesson_id'):
+            conn.execute(text(f"DROP INDEX {name}"))
+    return engine
+
+
+def index_names(engine, table):
+    return {index['name'] for index in inspect(engine).get_indexes(table)}
+
+
+class TestEnsureIndexes:
+    def test_missing_indexes_created(self, engine, db):
+        """Тест: индексы моделей добавляются в существующие таблицы"""
+        # Act - выполняем шаг запуска
+        SchemaUpgrade.ensure_indexes(db)
+        db.commit()
+
+        # Assert
+        assert {'ix_lessons_group_id_date_time', 'ix_lessons_teacher_id_date_time'} <= index_names(engine, 'lessons')  # Индексы занятий
+        assert 'ix_attendance_lesson_id' in index_names(engine, 'attendance')  # Индекс отметок
+
+    def test_repeated_run(self, engine, db):
+        """Тест: повторный запуск не падает на уже созданных индексах"""
+        # Act - два запуска подряд
+        SchemaUpgrade.ensure_indexes(db)
+        SchemaUpgrade.ensure_indexes(db)
+        db.commit()
+
+        # Assert
+        assert 'ix_attendance_lesson_id' in index_names(engine, 'attendance')  # Проверяем индекс
+
+
+def postgresql_session(existing, overlapping):
+    """Мок сессии PostgreSQL: existing - уже созданные ограничения, overlapping - ограничения,
+    которые не добавляются из-за пересечений в данных; выполненный SQL собирается в statements"""
+    db = MagicMock()
+    db.get_bind.return_value.dialect.name = 'postgresql'
+    db.statements = []
+
+    def execute(statement):
+        sql = str(statement)
+        db.statements.append(sql)
+        if any(name in sql for name in overlapping):
+            raise IntegrityError(sql, {}, SimpleNamespace(pgcode='23P01'))
+        return MagicMock(scalars=MagicMock(return_value=list(existing)))
+    db.execute.side_effect = execute
+    return db
+
+
+class TestEnsureLessonConstraints:
+    def test_sqlite_skipped(self, db):
+        """Тест: в других СУБД ограничения не добавляются"""
+        # Act
+        added = SchemaUpgrade.ensure_lesson_constraints(db)
+
+        # Assert
+        assert added == []  # Проверяем отсутствие изменений
+
+    def test_missing_constraints_added(self):
+        """Тест: добавляются только отсутствующие ограничения, пересечения в данных не мешают запуску"""
+        # Arrange - ограничение преподавателя уже есть, для аудиторий в данных есть пересечения
+        db = postgresql_session(existing=['ex_lessons_teacher_id_period'],
+                                overlapping=['ex_lessons_location_period'])
+
+        # Act
+        added = SchemaUpgrade.ensure_lesson_constraints(db)
+
+        # Assert - расширение создано, добавлено ограничение группы, каждое - в своей точке сохранения
+        assert db.statements[0] == "CREATE EXTENSION IF NOT EXISTS btree_gist"  # Проверяем расширение
+        assert added == ['ex_lessons_group_id_period']  # Проверяем добавленные ограничения
+        assert not any("ADD CONSTRAINT ex_lessons_teacher_id_period" in sql for sql in db.statements)  # Существующее
+        assert db.begin_nested.call_count == 2  # Проверяем точки сохранения
@@ -0,0 +1,58 @@
+import os  # Импортируем модуль os для чтения переменных окружения
+import subprocess  # Импортируем subprocess для запуска интерпретатора с -X importtime
+import sys  # Импортируем sys для пути к текущему интерпретатору
+from pathlib import Path  # Импортируем Path для пути к корню проекта
+import pytest  # Импортируем фреймворк для тестирования pytest
+from config import Config  # Импортируем настройки, чтобы передать их в дочерний процесс
+
+ROOT = Path(__file__).resolve().parent.parent
+# Библиотеки, которые должны загружаться при первом графике или экспорте, а не до окна входа
+HEAVY_MODULES = ('matplotlib', 'reportlab', 'openpyxl', 'pyarrow', 'numpy')
+# Допустимое время импорта модулей до окна входа (мс); на медленных машинах задается через окружение
+LOGIN_IMPORT_BUDGET_MS = float(os.environ.get('LOGIN_IMPORT_BUDGET_MS', 1000))
+IMPORT_RUNS = 3
+
+
+def import_times():
+    """Импортирует app в отдельном процессе и возвращает {модуль: суммарное время, мкс}.
+
+    app импортирует все, что нужно до показа окна входа; код запуска
+    защищен проверкой __main__ и не выполняется.
+    """
+    code = f"from config import Config; Config.DB_PORT = {Config.DB_PORT!r}; import app"
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+@pytest.fixture(scope='module')
+def startup_runs():
+    """Фикстура с результатами нескольких запусков -X importtime"""
+    return [import_times() for _ in range(IMPORT_RUNS)]
+
+
+class TestStartupImports:
+    def test_heavy_libraries_not_imported(self, startup_runs):
+        """Тест: matplotlib, reportlab, openpyxl, pyarrow и numpy не загружаются до окна входа"""
+        # Act - собираем пакеты верхнего уровня, загруженные при импорте app
+        packages = {name.split('.')[0] for name in startup_runs[0]}
+
+        # Assert
+        assert not packages & set(HEAVY_MODULES)  # Проверяем отсутствие тяжелых библиотек
+
+    def test_login_import_time_within_budget(self, startup_runs):
+        """Тест: время импорта до окна входа не превышает бюджет"""
+        # Act - берем лучший из запусков, чтобы не зависеть от случайных задержек
+        best_ms = min(run['app'] for run in startup_runs) / 1000
+
+        # Assert
+        assert best_ms < LOGIN_IMPORT_BUDGET_MS, f"Импорт до окна входа занял {best_ms:.0f} мс"  # Проверяем бюджет
@@ -0,0 +1,224 @@
+import pytest  # Импортируем фреймворк для тестирования pytest
+from collections import defaultdict  # Импортируем словарь со значениями по умолчанию для эталона
+from datetime import date  # Импортируем класс даты
+from unittest.mock import patch, MagicMock  # Импортируем инструменты для создания моков
+from sqlalchemy import event  # Импортируем систему событий SQLAlchemy
+from sqlalchemy.dialects import postgresql  # Импортируем диалект PostgreSQL для компиляции запроса
+from models import AttendanceDaily, Group, Subject  # Импортируем модели
+from services.attendance_rollup import AttendanceRollup  # Импортируем сборку сводки посещаемости
+from services.report_cache import ReportCache  # Импортируем кэш результатов
+from services.trend_analytics import TrendAnalytics  # Импортируем расчет динамики посещаемости
+from widgets.stats import StatsWidget, TREND_INDEX  # Импортируем тестируемый виджет и номер вкладки динамики
+from test_report_queries import generate_dataset  # Импортируем генератор тестовых данных
+
+SEPTEMBER, OCTOBER = date(2024, 9, 1), date(2024, 10, 1)
+
+
+@pytest.fixture
+def db(db):
+    """Фикстура с SQLite: 5 групп по 10 студентов и 40 занятий на группу"""
+    generate_dataset(db, groups=5, students_per_group=10, lessons_per_group=40)
+    AttendanceRollup.rebuild(db)
+    db.commit()
+    return db
+
+
+def reference_stats(db, month):
+    """Эталон: агрегаты графиков, посчитанные на Python по строкам сводки"""
+    groups = {g.id: g.name for g in db.query(Group)}
+    subjects = {s.id: s.name for s in db.query(Subject)}
+    by_group, by_subject = defaultdict(lambda: [0, 0, 0]), defaultdict(lambda: [0, 0, 0, 0])
+    for row in db.query(AttendanceDaily).filter(AttendanceDaily.day >= month, AttendanceDaily.day < OCTOBER):
+        marked = row.present_count + row.late_count + row.absent_count + row.sick_count
+        by_group[row.group_id][0] += row.present_count + row.late_count
+        by_group[row.group_id][1] += marked
+        by_subject[row.subject_id][0] += row.present_count
+        by_subject[row.subject_id][1] += marked
+        by_subject[row.subject_id][2] += row.lesson_count
+    return (
+        {f"Группа {groups[g]}": 100.0 * a / m for g, (a, m, _) in by_group.items() if m},
+        {subjects[s]: 100.0 * p / m for s, (p, m, _, _) in by_subject.items() if m},
+        {subjects[s]: n for s, (_, _, n, _) in by_subject.items()},
+    )
+
+
+class TestQueryStats:
+    def test_matches_reference(self, db):
+        """Тест: агрегаты всех трех графиков совпадают с эталоном"""
+        # Act - получаем данные графиков за сентябрь
+        stats = StatsWidget.query_stats(db, [SEPTEMBER])[SEPTEMBER]
+
+        # Assert - совпадают ряды по группам, по предметам и число занятий
+        expected = reference_stats(db, SEPTEMBER)
+        for series, reference in zip(stats, expected):
+            assert dict(series) == pytest.approx(reference)  # Проверяем ряд графика
+
+    def test_one_query_per_month(self, db):
+        """Тест: одинаковые месяцы вкладок читаются одним запросом"""
+        # Arrange - перехватываем выполненные запросы
+        statements = []
+        event.listen(db.get_bind(), "before_cursor_execute",
+                     lambda conn, cursor, statement, *args: statements.append(statement))
+
+        # Act - запрашиваем три графика за один месяц, затем за два разных
+        StatsWidget.query_stats(db, [SEPTEMBER, SEPTEMBER, SEPTEMBER])
+        same_month = len(statements)
+        StatsWidget.query_stats(db, [SEPTEMBER, OCTOBER, SEPTEMBER])
+
+        # Assert - один запрос на каждый различный месяц
+        assert same_month == 1  # Проверяем один запрос для совпадающих месяцев
+        assert len(statements) - same_month == 2  # Проверяем запросы для двух месяцев
+
+    def test_postgresql_uses_grouping_sets(self, db):
+        """Тест: в PostgreSQL ряды групп и предметов считаются через GROUPING SETS"""
+        # Arrange - имитируем подключение к PostgreSQL
+        bind = MagicMock()
+        bind.dialect.name = 'postgresql'
+        with patch.object(db, 'get_bind', return_value=bind):
+            # Act - компилируем запрос для диалекта PostgreSQL
+            sql = str(StatsWidget.month_stats_query(db, SEPTEMBER).statement.compile(dialect=postgresql.dialect()))
+
+        # Assert - одна группировка по двум наборам
+        assert "GROUP BY GROUPING SETS" in sql  # Проверяем группировку
+        assert "UNION" not in sql  # Проверяем отсутствие объединения запросов
+
+
+@pytest.fixture
+def widget(qapp):
+    """Фикстура с виджетом статистики без обращения к БД"""
+    executor = MagicMock()
+    with patch('widgets.stats.get_query_executor', return_value=executor), \
+            patch('widgets.stats.get_report_cache', return_value=ReportCache()):
+        widget = StatsWidget()
+    executor.reset_mock()
+    return widget
+
+
+def month_combo(widget, index):
+    """Выпадающий список месяца на вкладке графика"""
+    selector = (widget.month_selector1, widget.month_selector2, widget.month_selector3)[index]
+    return selector.itemAt(1).widget()
+
+
+class TestChartRefresh:
+    def test_month_change_refreshes_own_chart(self, widget):
+        """Тест: смена месяца запрашивает данные только для своего графика"""
+        # Act - выбираем другой месяц на второй вкладке
+        month_combo(widget, 1).setCurrentIndex(1)
+
+        # Assert - запрос только для второго графика и выбранного месяца
+        widget.executor.submit.assert_called_once()  # Проверяем один запрос
+        key, _, months = widget.executor.submit.call_args.args
+        assert key == 'stats_1'  # Проверяем ключ запроса
+        assert months == [widget.selected_month(1)]  # Проверяем запрошенный месяц
+
+    def test_cached_month_not_queried(self, widget):
+        """Тест: графики с данными в кэше рисуются без запроса"""
+        # Arrange - кладем в кэш данные текущего месяца
+        month = widget.selected_month(0)
+        stats = ([("Группа 101", 50.0)], [("Математика", 40.0)], [("Математика", 3)])
+        widget.cache.put(widget.cache.make_key('stats', month), stats)
+
+        with patch.object(widget, 'draw_chart') as draw_chart:
+            # Act - обновляем все графики
+            widget.plot_data()
+
+        # Assert - три графика нарисованы из кэша, запрошена только динамика
+        keys = [call.args[0] for call in widget.executor.submit.call_args_list]
+        assert keys == ['trend']  # Проверяем отсутствие запросов данных за месяц
+        assert [call.args[0] for call in draw_chart.call_args_list] == [0, 1, 2]  # Проверяем графики
+
+    def test_stale_result_not_drawn(self, widget):
+        """Тест: результат для месяца, который уже сменили, не рисуется"""
+        # Arrange - запрашиваем данные первого графика и меняем месяц до ответа
+        widget.refresh_charts([0])
+        month = widget.selected_month(0)
+        on_result = widget.executor.submit.call_args.kwargs['on_result']
+        month_combo(widget, 0).blockSignals(True)
+        month_combo(widget, 0).setCurrentIndex(2)
+
+        with patch.object(widget, 'draw_chart') as draw_chart:
+            # Act - приходит ответ на устаревший запрос
+            on_result({month: ([], [], [])})
+
+        # Assert - график не перерисован, данные сохранены в кэше
+        draw_chart.assert_not_called()  # Проверяем отсутствие отрисовки
+        assert widget.cache.get(widget.cache.make_key('stats', month))[0]  # Проверяем кэш
+
+
+class TestChartUpdate:
+    def test_update_reuses_axes_and_bars(self, widget):
+        """Тест: повторное обновление меняет столбцы, а не пересоздает оси"""
+        # Arrange - первый график с тремя столбцами
+        chart = widget.charts[0]
+        chart.update("Сентябрь", ["А", "Б", "В"], [10, 20, 30])
+        ax, first_bar = chart.ax, chart.bars[0]
+
+        # Act - обновляем график данными с двумя столбцами
+        chart.update("Октябрь", ["А", "Б"], [40, 50])
+
+        # Assert - те же оси и столбцы, лишний столбец удален
+        assert chart.ax is ax and chart.bars[0] is first_bar  # Проверяем повторное использование объектов
+        assert len(ax.patches) == 2  # Проверяем удаление лишнего столбца
+        assert [bar.get_height() for bar in chart.bars] == [40, 50]  # Проверяем высоты столбцов
+        assert [label.get_text() for label in chart.value_labels] == ['40', '50']  # Проверяем подписи значений
+
+    def test_layout_recomputed_only_for_new_categories(self, widget):
+        """Тест: разметка пересчитывается только при смене подписей категорий"""
+        # Arrange - график нарисован с категориями
+        chart = widget.charts[0]
+        chart.update("Сентябрь", ["А", "Б"], [10, 20])
+        chart.redraw()
+
+        # Act - новые значения для тех же категорий
+        chart.update("Октябрь", ["А", "Б"], [30, 40])
+
+        # Assert - разметка не требует пересчета
+        assert not chart.layout_dirty  # Проверяем отсутствие пересчета разметки
+
+    def test_hidden_chart_redrawn_on_activation(self, widget):
+        """Тест: график на скрытой вкладке перерисовывается при ее открытии"""
+        # Arrange - виджет показан, открыта первая вкладка
+        widget.show()
+        stats = ([], [("Математика", 40.0)], [])
+        with patch.object(widget.charts[1], 'redraw', wraps=widget.charts[1].redraw) as redraw:
+            # Act - данные приходят для второй вкладки, затем она открывается
+            widget.draw_chart(1, SEPTEMBER, stats)
+            hidden_redraws = redraw.call_count
+            widget.tabs.setCurrentIndex(1)
+
+        # Assert - перерисовка только после открытия вкладки
+        assert hidden_redraws == 0  # Проверяем отсутствие отрисовки скрытой вкладки
+        redraw.assert_called_once()  # Проверяем отрисовку при открытии
+        widget.close()
+
+
+class TestTrendTab:
+    def test_period_change_requests_trend(self, widget):
+        """Тест: смена периода запрашивает динамику одним фоновым запросом"""
+        # Act - выбираем ряды по предметам
+        widget.trend_series.setCurrentIndex(1)
+
+        # Assert - запрос динамики за выбранный период
+        widget.executor.submit.assert_called_once()  # Проверяем один запрос
+        key, query_fn, start, end, by, *_ = widget.executor.submit.call_args.args
+        assert (key, query_fn, by) == ('trend', TrendAnalytics.trend, 'subject')  # Проверяем запрос
+        assert start == TrendAnalytics.academic_year_start(end)  # Проверяем период по умолчанию
+
+    def test_trend_drawn_from_result(self, widget, db):
+        """Тест: результат расчета отображается на графике динамики"""
+        # Arrange - открываем вкладку динамики и считаем ряды по сводке
+        widget.show()
+        widget.tabs.setCurrentIndex(TREND_INDEX)
+        params = (SEPTEMBER, date(2024, 11, 30), 'group')
+        trend = TrendAnalytics.trend(db, *params)
+
+        # Act - рисуем результат
+        widget.draw_trend(params, trend)
+
+        # Assert - линии получили данные, число столбцов равно числу недель
+        chart = widget.charts[TREND_INDEX]
+        assert len(chart.rolling_line.get_xdata()) == len(trend['days'])  # Проверяем линию
+        assert len(chart.delta_bars) == len(trend['weeks'])  # Проверяем столбцы недель
+        assert not chart.dirty  # Проверяем, что видимый график перерисован
+        widget.close()
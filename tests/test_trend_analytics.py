@@ -0,0 +1,175 @@
+import time  # Импортируем модуль time для замера времени расчета
+import numpy as np  # Импортируем NumPy для эталонных расчетов
+import pytest  # Импортируем фреймворк для тестирования pytest
+from collections import defaultdict  # Импортируем словарь со значениями по умолчанию для эталона
+from datetime import date, timedelta  # Импортируем классы даты
+from sqlalchemy import event, insert  # Импортируем события и конструктор INSERT
+from sqlalchemy.orm import sessionmaker  # Импортируем фабрику сессий
+from models import AttendanceDaily, Group, Subject  # Импортируем модели
+from services.attendance_rollup import AttendanceRollup  # Импортируем сборку сводки посещаемости
+from services.trend_analytics import TrendAnalytics  # Импортируем тестируемый класс
+from test_report_queries import generate_dataset  # Импортируем генератор тестовых данных
+
+START, END = date(2024, 9, 1), date(2024, 11, 30)
+
+
+@pytest.fixture
+def db(db):
+    """Фикстура с SQLite: 5 групп по 10 студентов и 40 занятий на группу"""
+    generate_dataset(db, groups=5, students_per_group=10, lessons_per_group=40)
+    AttendanceRollup.rebuild(db)
+    db.commit()
+    return db
+
+
+def reference_daily(db, by):
+    """Эталон: дневные суммы {(подпись, день): (пришедшие, отмеченные)} по строкам сводки"""
+    names = {g.id: f"Группа {g.name}" for g in db.query(Group)} if by == 'group' \
+        else {s.id: s.name for s in db.query(Subject)}
+    counts = defaultdict(lambda: [0, 0])
+    for row in db.query(AttendanceDaily).filter(AttendanceDaily.day >= START, AttendanceDaily.day <= END):
+        key = row.group_id if by == 'group' else row.subject_id
+        counts[(names[key], row.day)][0] += row.present_count + row.late_count
+        counts[(names[key], row.day)][1] += (row.present_count + row.late_count +
+                                             row.absent_count + row.sick_count)
+    return counts
+
+
+class TestFetchDaily:
+    @pytest.mark.parametrize("by", ['group', 'subject'])
+    def test_matches_reference(self, db, by):
+        """Тест: матрицы дневных сумм совпадают с эталоном по строкам сводки"""
+        # Act - читаем дневные суммы за период
+        days, labels, attended, marked = TrendAnalytics.fetch_daily(db, START, END, by)
+
+        # Assert - ненулевые ячейки матриц совпадают с эталоном
+        actual = {
+            (labels[i], days[d].item()): [int(attended[i, d]), int(marked[i, d])]
+            for i, d in zip(*np.nonzero(marked | attended))
+        }
+        assert len(days) == (END - START).days + 1  # Проверяем день на каждый день периода
+        assert actual == {k: v for k, v in reference_daily(db, by).items() if any(v)}  # Проверяем суммы
+
+    def test_single_query(self, db):
+        """Тест: период любой длины читается одним запросом"""
+        # Arrange - перехватываем выполненные запросы
+        statements = []
+        event.listen(db.get_bind(), "before_cursor_execute",
+                     lambda conn, cursor, statement, *args: statements.append(statement))
+
+        # Act - читаем учебный год
+        TrendAnalytics.fetch_daily(db, date(2024, 9, 1), date(2025, 6, 30))
+
+        # Assert
+        assert len(statements) == 1  # Проверяем один запрос
+
+    def test_empty_period(self, db):
+        """Тест: период без занятий дает пустые матрицы нужной ширины"""
+        # Act - читаем период до начала занятий
+        days, labels, attended, marked = TrendAnalytics.fetch_daily(db, date(2024, 1, 1), date(2024, 1, 31))
+
+        # Assert
+        assert labels == []  # Проверяем отсутствие рядов
+        assert attended.shape == marked.shape == (0, 31)  # Проверяем размер матриц
+
+
+class TestTrendMath:
+    def test_rolling_rate(self):
+        """Тест: скользящая посещаемость суммирует окно, пустые дни не дают процента"""
+        # Arrange - один ряд: два дня с отметками и пустые дни
+        attended = np.array([[1, 0, 0, 4, 0]])
+        marked = np.array([[2, 0, 0, 4, 0]])
+
+        # Act - окно в 2 дня
+        rates = TrendAnalytics.rolling_rate(attended, marked, window=2)
+
+        # Assert - [1/2, 1/2, нет отметок, 4/4, 4/4]
+        np.testing.assert_allclose(rates, [[50.0, 50.0, np.nan, 100.0, 100.0]])
+
+    def test_weekly_rates_aligned_to_monday(self):
+        """Тест: недели начинаются с понедельника, неделя к неделе - разность процентов"""
+        # Arrange - период со среды 4.09.2024 по вторник 17.09.2024
+        days = np.arange(np.datetime64('2024-09-04'), np.datetime64('2024-09-18'))
+        attended = np.array([1] * 5 + [3] * 7 + [2] * 2)
+        marked = np.array([2] * 5 + [4] * 7 + [4] * 2)
+
+        # Act - считаем недельные проценты и изменения
+        weeks, weekly = TrendAnalytics.weekly_rates(days, attended, marked)
+        delta = TrendAnalytics.week_over_week(weekly)
+
+        # Assert - три недели: неполная со среды, полная и неполная до вторника
+        assert weeks.tolist() == [date(2024, 9, 2), date(2024, 9, 9), date(2024, 9, 16)]  # Проверяем понедельники
+        np.testing.assert_allclose(weekly, [50.0, 75.0, 50.0])  # Проверяем проценты
+        np.testing.assert_allclose(delta[1:], np.diff(weekly))  # Проверяем изменения
+        assert np.isnan(delta[0])  # Проверяем отсутствие изменения для первой недели
+
+    def test_percentiles_skip_days_without_marks(self):
+        """Тест: процентили считаются по рядам с отметками, пустые дни дают NaN"""
+        # Arrange - три ряда, во второй день отметки только у одного
+        rates = np.array([[10.0, np.nan, np.nan], [50.0, 80.0, np.nan], [90.0, np.nan, np.nan]])
+
+        # Act
+        low, median, high = TrendAnalytics.percentiles(rates)
+
+        # Assert
+        np.testing.assert_allclose(median, [50.0, 80.0, np.nan])  # Проверяем медиану
+        assert low[0] == 30.0 and high[0] == 70.0  # Проверяем крайние процентили
+
+    def test_downsample_averages_buckets(self):
+        """Тест: прореживание усредняет соседние дни и не превышает число точек"""
+        # Arrange - 10 дней с пропуском
+        days = np.arange(np.datetime64('2024-09-01'), np.datetime64('2024-09-11'))
+        values = np.array([[1.0, 3.0, np.nan, 5.0, 7.0, 9.0, 2.0, 4.0, 6.0, 8.0]])
+
+        # Act - не более 4 точек
+        plot_days, plot_values = TrendAnalytics.downsample(days, values, max_points=4)
+
+        # Assert - корзины по 3 дня: средние без NaN, последняя корзина неполная
+        assert plot_days.tolist() == [date(2024, 9, 1), date(2024, 9, 4), date(2024, 9, 7), date(2024, 9, 10)]
+        np.testing.assert_allclose(plot_values, [[2.0, 7.0, 4.0, 8.0]])  # Проверяем средние
+
+
+def yearly_rollup(db, groups, start, days):
+    """Заполняет сводку днями учебного года для заданного числа групп (по занятию в будний день)"""
+    db.execute(insert(Group), [{'id': g, 'name': f"Г{g}"} for g in range(1, groups + 1)])
+    db.execute(insert(Subject), [{'id': 1, 'name': "Предмет"}])
+    rng = np.random.default_rng(1)
+    rows = []
+    for offset in range(days):
+        day = start + timedelta(days=offset)
+        if day.weekday() >= 5:
+            continue
+        present = rng.integers(10, 25, groups).tolist()
+        rows += [{'day': day, 'group_id': g + 1, 'subject_id': 1, 'lesson_count': 1, 'expected_count': 25,
+                  'present_count': present[g], 'late_count': 0, 'absent_count': 25 - present[g], 'sick_count': 0}
+                 for g in range(groups)]
+    db.execute(insert(AttendanceDaily), rows)
+    db.commit()
+
+
+class TestTrend:
+    def test_year_for_200_groups_under_second(self, engine):
+        """Тест: динамика за учебный год по 200 группам считается быстрее секунды"""
+        # Arrange - сводка за 304 дня (сентябрь - июнь) для 200 групп в пустой БД
+        db = sessionmaker(bind=engine)()
+        start, end = date(2024, 9, 1), date(2025, 6, 30)
+        yearly_rollup(db, groups=200, start=start, days=(end - start).days + 1)
+
+        # Act - читаем и считаем все ряды вкладки
+        began = time.perf_counter()
+        trend = TrendAnalytics.trend(db, start, end, max_points=150)
+        elapsed = time.perf_counter() - began
+
+        # Assert - все группы учтены, ряды прорежены, время в пределах бюджета
+        assert trend['series'] == 200  # Проверяем число рядов
+        assert len(trend['days']) <= 150  # Проверяем прореживание
+        assert trend['percentiles'].shape == (3, len(trend['days']))  # Проверяем процентили
+        assert len(trend['week_delta']) == len(trend['weeks'])  # Проверяем изменения по неделям
+        assert elapsed < 1.0, f"Расчет занял {elapsed:.2f} с"  # Проверяем время расчета
+        db.close()
+
+    def test_academic_year_start(self):
+        """Тест: учебный год начинается 1 сентября текущего или прошлого года"""
+        # Assert
+        assert TrendAnalytics.academic_year_start(date(2024, 10, 5)) == date(2024, 9, 1)  # Проверяем осень
+        assert TrendAnalytics.academic_year_start(date(2025, 3, 1)) == date(2024, 9, 1)  # Проверяем весну
@@ -2,7 +2,8 @@
 from .logger import get_logger
 from .notifications import show_info, show_warning, show_error
 from .decorators import handle_exceptions, admin_required
-from .export_helpers import export_report
+from .export_helpers import export_report, export_batch_report
+from .date_ranges import day_range, week_range, month_range
 
 __all__ = [
     'get_logger',
@@ -11,5 +12,9 @@ __all__ = [
     'show_error',
     'handle_exceptions',
     'admin_required',
-    'export_report'
+    'export_report',
+    'export_batch_report',
+    'day_range',
+    'week_range',
+    'month_range'
 ]
\ No newline at end of file
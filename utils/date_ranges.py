@@ -0,0 +1,24 @@
+from datetime import date, datetime, time, timedelta
+
+
+def day_range(start: date, end: date = None) -> tuple[datetime, datetime]:
+    """Полуоткрытый интервал [start 00:00, (end + 1 день) 00:00).
+
+    Фильтр вида date_time >= начало AND date_time < конец может использовать
+    индекс по date_time, в отличие от func.date(date_time) == день.
+    """
+    end = end or start
+    return datetime.combine(start, time.min), datetime.combine(end + timedelta(days=1), time.min)
+
+
+def month_range(day: date) -> tuple[datetime, datetime]:
+    """Полуоткрытый интервал календарного месяца, содержащего day"""
+    first = date(day.year, day.month, 1)
+    next_month = (first + timedelta(days=32)).replace(day=1)
+    return datetime.combine(first, time.min), datetime.combine(next_month, time.min)
+
+
+def week_range(day: date) -> tuple[datetime, datetime]:
+    """Полуоткрытый интервал календарной недели (с понедельника), содержащей day"""
+    monday = day - timedelta(days=day.weekday())
+    return datetime.combine(monday, time.min), datetime.combine(monday + timedelta(days=7), time.min)
@@ -1,57 +1,63 @@
-from PyQt5.QtWidgets import QFileDialog
+from itertools import chain
+from PyQt5.QtCore import Qt
+from PyQt5.QtWidgets import QFileDialog, QProgressDialog
 from utils import show_error, show_info, get_logger
 
 logger = get_logger()
 
-def export_report(parent, table, columns, report_generator, pdf_radio):
+# Формат экспорта -> (фильтр диалога сохранения, расширение файла, метод ReportGenerator)
+EXPORT_FORMATS = {
+    "pdf": ("PDF Files (*.pdf)", ".pdf", "generate_attendance_pdf"),
+    "xlsx": ("Excel Files (*.xlsx)", ".xlsx", "generate_attendance_excel"),
+    "csv": ("CSV Files (*.csv)", ".csv", "generate_attendance_csv"),
+    "parquet": ("Parquet Files (*.parquet)", ".parquet", "generate_attendance_parquet"),
+}
+
+def export_report(parent, columns, report_generator, file_format, open_rows):
     """
     Универсальная функция для экспорта отчетов
     
     Args:
         parent: Родительский виджет для диалога сохранения
-        table: Таблица с данными для экспорта
         columns: Словарь с названиями колонок и их ключами для экспорта
         report_generator: Экземпляр класса ReportGenerator
-        pdf_radio: Радиокнопка для выбора PDF формата
+        file_format: Формат файла - ключ EXPORT_FORMATS ("pdf", "xlsx", "csv", "parquet")
+        open_rows: Функция без аргументов, возвращающая контекстный менеджер
+            с итератором строк отчета (списков значений в порядке колонок);
+            вызывается после выбора файла, строки читаются по мере записи
         
     Returns:
         bool: Успешность экспорта
     """
     try:
-        # Подготовка данных для экспорта
-        data = []
-        for row in range(table.rowCount()):
-            row_data = {}
-            for col_idx, (key, header) in enumerate(columns.items()):
-                row_data[key] = table.item(row, col_idx).text()
-                # Добавляем русское название колонки как метаданные
-                row_data[f'_header_{key}'] = header
-            data.append(row_data)
-        
-        if not data:
-            show_error("Ошибка", "Нет данных для экспорта")
-            return False
-        
-        # Выбор формата и экспорт
-        file_format = "pdf" if pdf_radio.isChecked() else "xlsx"
+        # Выбор формата; выбранный формат идет первым в списке фильтров.
+        # Файл выбирается до открытия сессии, чтобы транзакция и курсор
+        # не оставались открытыми, пока открыт диалог
+        file_filter, extension, method_name = EXPORT_FORMATS[file_format]
+        other_filters = [other[0] for key, other in EXPORT_FORMATS.items() if key != file_format]
         filename, _ = QFileDialog.getSaveFileName(
             parent, "Сохранить отчет", "", 
-            f"PDF Files (*.pdf);;Excel Files (*.xlsx)" if file_format == "pdf" else "Excel Files (*.xlsx);;PDF Files (*.pdf)"
+            ";;".join([file_filter] + other_filters)
         )
         
         if not filename:
             return False
             
-        if file_format == "pdf" and not filename.endswith(".pdf"):
-            filename += ".pdf"
-        elif file_format == "xlsx" and not filename.endswith(".xlsx"):
-            filename += ".xlsx"
+        if not filename.endswith(extension):
+            filename += extension
         
-        # Экспорт в выбранный формат
-        if file_format == "pdf":
-            success = report_generator.generate_attendance_pdf(data, filename)
-        else:
-            success = report_generator.generate_attendance_excel(data, filename)
+        headers = list(columns.values())
+        with open_rows() as rows:
+            # Проверяем наличие данных по первой строке, не читая остальные
+            rows = iter(rows)
+            first_row = next(rows, None)
+
+            if first_row is None:
+                show_error("Ошибка", "Нет данных для экспорта")
+                return False
+
+            # Экспорт в выбранный формат
+            success = getattr(report_generator, method_name)(chain([first_row], rows), filename, headers)
             
         if success:
             show_info("Успех", "Отчет успешно экспортирован")
@@ -62,4 +68,65 @@ def export_report(parent, table, columns, report_generator, pdf_radio):
     except Exception as e:
         logger.error(f"Ошибка экспорта отчета: {str(e)}")
         show_error("Ошибка", "Не удалось экспортировать отчет")
-        return False
\ No newline at end of file
+        return False
+
+
+def export_batch_report(parent, columns, report_generator, file_format, open_sheets):
+    """
+    Пакетный экспорт: отдельный файл на каждый лист в одном zip-архиве
+
+    Args:
+        parent: Родительский виджет для диалогов
+        columns: Словарь с названиями колонок и их ключами для экспорта
+        report_generator: Экземпляр класса ReportGenerator
+        file_format: Формат файлов в архиве - ключ EXPORT_FORMATS
+        open_sheets: Функция без аргументов, возвращающая контекстный менеджер
+            с парой (итератор пар (имя листа, строки), количество листов);
+            вызывается после выбора файла
+
+    Returns:
+        bool: Успешность экспорта
+    """
+    try:
+        _, extension, method_name = EXPORT_FORMATS[file_format]
+        filename, _ = QFileDialog.getSaveFileName(
+            parent, "Сохранить архив отчетов", "", "ZIP Archives (*.zip)"
+        )
+
+        if not filename:
+            return False
+
+        if not filename.endswith(".zip"):
+            filename += ".zip"
+
+        with open_sheets() as (sheets, total):
+            if not total:
+                show_error("Ошибка", "Нет данных для экспорта")
+                return False
+
+            # Прогресс по готовым файлам; "Отмена" прерывает экспорт после текущих листов
+            progress = QProgressDialog("Формирование отчетов...", "Отмена", 0, total, parent)
+            progress.setWindowModality(Qt.WindowModal)
+            progress.setMinimumDuration(0)
+            progress.canceled.connect(report_generator.cancel_batch)
+            report_generator.progress_updated.connect(progress.setValue)
+            try:
+                success = report_generator.generate_batch_archive(
+                    sheets, filename, list(columns.values()), method_name, extension
+                )
+                cancelled = progress.wasCanceled()
+            finally:
+                report_generator.progress_updated.disconnect(progress.setValue)
+                progress.canceled.disconnect(report_generator.cancel_batch)
+                progress.close()
+
+        if success:
+            show_info("Успех", "Отчеты успешно экспортированы")
+        elif not cancelled:
+            show_error("Ошибка", "Не удалось экспортировать отчеты")
+
+        return success
+    except Exception as e:
+        logger.error(f"Ошибка пакетного экспорта: {str(e)}")
+        show_error("Ошибка", "Не удалось экспортировать отчеты")
+        return False
@@ -1,13 +1,20 @@
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QTabWidget,
                              QTableWidget, QTableWidgetItem, QPushButton,
                              QDialog, QFormLayout, QLineEdit, QMessageBox,
-                             QHeaderView, QComboBox, QLabel, QCheckBox)
-from PyQt5.QtCore import Qt
+                             QHeaderView, QComboBox, QLabel, QCheckBox,
+                             QDateEdit, QTimeEdit, QGridLayout)
+from PyQt5.QtCore import Qt, QDate, QTime
+from functools import partial
 
 from database import get_session
 from models import User, Student, Teacher, Group, Subject, Lesson, TeacherSubject
 from utils import show_error, show_info, handle_exceptions
 from utils import get_logger
+from services.attendance_rollup import AttendanceRollup
+from services.report_cache import get_report_cache
+from services.lesson_generator import LessonGenerator
+from services.schedule_conflicts import ScheduleConflicts, lesson_duration
+from widgets.lazy_tabs import LazyTabWidget
 from datetime import datetime
 
 logger = get_logger()
@@ -175,6 +182,184 @@ class EditDialog(QDialog):
         return data
 
 
+class RecurringLessonsDialog(QDialog):
+    """Параметры генерации занятий по недельному шаблону с предпросмотром"""
+
+    WEEKDAYS = ['Понедельник', 'Вторник', 'Среда', 'Четверг', 'Пятница', 'Суббота']
+    PREVIEW_COLUMNS = ["Дата", "День недели", "Время", "Конфликт"]
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Создание занятий по расписанию")
+        self.rows = []
+        self.init_ui()
+
+    def init_ui(self):
+        layout = QVBoxLayout()
+        form = QFormLayout()
+
+        self.group_combo = QComboBox()
+        self.teacher_combo = QComboBox()
+        self.subject_combo = QComboBox()
+        self.load_choices()
+
+        self.start_date = QDateEdit()
+        self.start_date.setCalendarPopup(True)
+        self.start_date.setDate(QDate.currentDate())
+        self.end_date = QDateEdit()
+        self.end_date.setCalendarPopup(True)
+        self.end_date.setDate(QDate.currentDate().addMonths(4))
+
+        self.location_edit = QLineEdit()
+        self.holidays_edit = QLineEdit()
+        self.holidays_edit.setPlaceholderText("04.11.2024, 30.12.2024-08.01.2025")
+
+        form.addRow("Группа:", self.group_combo)
+        form.addRow("Преподаватель:", self.teacher_combo)
+        form.addRow("Предмет:", self.subject_combo)
+        form.addRow("С:", self.start_date)
+        form.addRow("По:", self.end_date)
+        form.addRow("Локация:", self.location_edit)
+        form.addRow("Праздники:", self.holidays_edit)
+        layout.addLayout(form)
+
+        # Недельный шаблон: день недели и время занятия
+        pattern_layout = QGridLayout()
+        self.weekday_checks = []
+        self.weekday_times = []
+        for weekday, name in enumerate(self.WEEKDAYS):
+            checkbox = QCheckBox(name)
+            time_edit = QTimeEdit(QTime(9, 0))
+            time_edit.setDisplayFormat("HH:mm")
+            pattern_layout.addWidget(checkbox, weekday, 0)
+            pattern_layout.addWidget(time_edit, weekday, 1)
+            self.weekday_checks.append(checkbox)
+            self.weekday_times.append(time_edit)
+        layout.addLayout(pattern_layout)
+
+        # Предпросмотр без записи в БД
+        self.preview_label = QLabel()
+        self.preview_table = QTableWidget()
+        self.preview_table.setColumnCount(len(self.PREVIEW_COLUMNS))
+        self.preview_table.setHorizontalHeaderLabels(self.PREVIEW_COLUMNS)
+        self.preview_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        layout.addWidget(self.preview_label)
+        layout.addWidget(self.preview_table)
+
+        buttons_layout = QHBoxLayout()
+        preview_button = QPushButton("Предпросмотр")
+        self.create_button = QPushButton("Создать")
+        self.create_button.setEnabled(False)
+        cancel_button = QPushButton("Отмена")
+        preview_button.clicked.connect(self.preview)
+        self.create_button.clicked.connect(self.accept)
+        cancel_button.clicked.connect(self.reject)
+        buttons_layout.addWidget(preview_button)
+        buttons_layout.addWidget(self.create_button)
+        buttons_layout.addWidget(cancel_button)
+        layout.addLayout(buttons_layout)
+
+        # Любое изменение параметров требует нового предпросмотра
+        for combo in (self.group_combo, self.teacher_combo, self.subject_combo):
+            combo.currentIndexChanged.connect(self.reset_preview)
+        for widget in (self.start_date, self.end_date):
+            widget.dateChanged.connect(self.reset_preview)
+        for widget in (self.location_edit, self.holidays_edit):
+            widget.textChanged.connect(self.reset_preview)
+        for checkbox, time_edit in zip(self.weekday_checks, self.weekday_times):
+            checkbox.toggled.connect(self.reset_preview)
+            time_edit.timeChanged.connect(self.reset_preview)
+
+        self.setLayout(layout)
+
+    def load_choices(self):
+        try:
+            with get_session() as db:
+                for group in db.query(Group).order_by(Group.name):
+                    self.group_combo.addItem(group.name, group.id)
+                for teacher in db.query(Teacher).order_by(Teacher.last_name, Teacher.first_name):
+                    self.teacher_combo.addItem(f"{teacher.last_name} {teacher.first_name}", teacher.id)
+                for subject in db.query(Subject).order_by(Subject.name):
+                    self.subject_combo.addItem(subject.name, subject.id)
+        except Exception as e:
+            logger.error(f"Ошибка загрузки справочников: {str(e)}")
+            show_error("Ошибка", "Не удалось загрузить группы, преподавателей и предметы")
+
+    def pattern(self):
+        """Недельный шаблон: [(день недели, время)] отмеченных дней"""
+        return [
+            (weekday, time_edit.time().toPyTime())
+            for weekday, (checkbox, time_edit) in enumerate(zip(self.weekday_checks, self.weekday_times))
+            if checkbox.isChecked()
+        ]
+
+    def build_rows(self):
+        """Строки занятий по текущим параметрам; ValueError при неверных параметрах"""
+        start, end = self.start_date.date().toPyDate(), self.end_date.date().toPyDate()
+        if end < start:
+            raise ValueError("Дата окончания раньше даты начала")
+        pattern = self.pattern()
+        if not pattern:
+            raise ValueError("Не выбран ни один день недели")
+        if None in (self.group_combo.currentData(), self.teacher_combo.currentData(),
+                    self.subject_combo.currentData()):
+            raise ValueError("Не выбраны группа, преподаватель или предмет")
+        return LessonGenerator.build_rows(
+            start, end, pattern,
+            group_id=self.group_combo.currentData(),
+            teacher_id=self.teacher_combo.currentData(),
+            subject_id=self.subject_combo.currentData(),
+            location=self.location_edit.text().strip() or None,
+            holidays=LessonGenerator.parse_holidays(self.holidays_edit.text())
+        )
+
+    def preview(self):
+        try:
+            rows = self.build_rows()
+        except ValueError as e:
+            self.reset_preview()
+            show_error("Ошибка", f"Неверные параметры: {str(e)}")
+            return
+        try:
+            conflicts = self.find_conflicts(rows)
+        except Exception as e:
+            self.reset_preview()
+            logger.error(f"Ошибка проверки пересечений занятий: {str(e)}")
+            show_error("Ошибка", "Не удалось проверить пересечения занятий")
+            return
+
+        self.preview_table.setRowCount(len(rows))
+        for row, values in enumerate(rows):
+            date_time = values['date_time']
+            conflict = "; ".join(ScheduleConflicts.describe(c) for c in conflicts.get(row, ()))
+            for col, value in enumerate((date_time.strftime("%d.%m.%Y"), self.WEEKDAYS[date_time.weekday()],
+                                         date_time.strftime("%H:%M"), conflict)):
+                self.preview_table.setItem(row, col, QTableWidgetItem(value))
+        if conflicts:
+            # Занятия с пересечениями не создаются: нужно изменить шаблон или период
+            self.rows = []
+            self.preview_label.setText(f"Будет создано занятий: {len(rows)}, пересечений: {len(conflicts)}")
+        else:
+            self.rows = rows
+            self.preview_label.setText(f"Будет создано занятий: {len(rows)}")
+        self.create_button.setEnabled(bool(self.rows))
+
+    @staticmethod
+    def find_conflicts(rows):
+        """Пересечения новых занятий с расписанием в БД и между собой: {номер строки: [конфликты]}"""
+        if not rows:
+            return {}
+        with get_session() as db:
+            index = ScheduleConflicts.load(db, rows[0]['date_time'], rows[-1]['date_time'] + lesson_duration())
+        return index.check_batch(rows)
+
+    def reset_preview(self, *args):
+        self.rows = []
+        self.preview_label.clear()
+        self.preview_table.setRowCount(0)
+        self.create_button.setEnabled(False)
+
+
 class ModelTab(QWidget):
     def __init__(self, model_class, headers):
         super().__init__()
@@ -199,6 +384,12 @@ class ModelTab(QWidget):
         buttons_layout.addWidget(self.add_button)
         buttons_layout.addWidget(self.edit_button)
         buttons_layout.addWidget(self.delete_button)
+
+        # Занятия семестра создаются по недельному шаблону одной транзакцией
+        if self.model_class == Lesson:
+            self.generate_button = QPushButton('Создать по расписанию')
+            self.generate_button.clicked.connect(self.generate_lessons)
+            buttons_layout.addWidget(self.generate_button)
         
         # Table
         self.table = QTableWidget()
@@ -262,6 +453,7 @@ class ModelTab(QWidget):
     def add_item(self):
         dialog = EditDialog(self.model_class, parent=self)
         if dialog.exec_() == QDialog.Accepted:
+            lesson = None
             try:
                 with get_session() as db:
                     data = dialog.get_data()
@@ -271,6 +463,12 @@ class ModelTab(QWidget):
                     if self.model_class == User and 'password' in data:
                         from werkzeug.security import generate_password_hash
                         data['password'] = generate_password_hash(data['password'])
+
+                    # Пересечения проверяются до flush: при flush сработали бы ограничения БД
+                    if self.model_class == Lesson:
+                        lesson = ScheduleConflicts.pending_lesson(data)
+                        if self.report_conflicts(db, lesson):
+                            return
                     
                     new_item = self.model_class(**data)
                     db.add(new_item)
@@ -285,13 +483,58 @@ class ModelTab(QWidget):
                             )
                             db.add(teacher_subject)
 
+                    # Новое занятие или студент меняют ожидаемое число отметок в сводке
+                    AttendanceRollup.refresh(db, AttendanceRollup.scope_of(db, self.model_class, new_item.id))
                     db.commit()
+                    get_report_cache().invalidate()
                     show_info("Success", "Item added successfully")
                     self.load_data()
             except Exception as e:
+                if lesson is not None and self.report_exclusion_violation(e, lesson):
+                    return
                 logger.error(f"Error adding item: {str(e)}")
                 show_error("Error", "Failed to add item")
     
+    @staticmethod
+    def report_conflicts(db, lesson) -> bool:
+        """Проверяет пересечения занятия (еще не записанного в БД) у преподавателя,
+        группы и аудитории; при конфликте сообщает о нем"""
+        conflicts = ScheduleConflicts.check_lesson(db, lesson)
+        if conflicts:
+            show_error("Ошибка", "Занятие пересекается с расписанием:\n" +
+                       "\n".join(ScheduleConflicts.describe(conflict) for conflict in conflicts))
+        return bool(conflicts)
+
+    @staticmethod
+    def report_exclusion_violation(error, lesson) -> bool:
+        """Сообщает о пересечении, найденном ограничением БД при записи (пересекающееся
+        занятие записано параллельно после проверки); False для других ошибок"""
+        if not ScheduleConflicts.is_exclusion_violation(error):
+            return False
+        logger.warning(f"Пересечение занятий отклонено БД: {str(error)}")
+        try:
+            with get_session() as db:
+                if ModelTab.report_conflicts(db, lesson):
+                    return True
+        except Exception as e:
+            logger.error(f"Ошибка проверки пересечений занятий: {str(e)}")
+        show_error("Ошибка", "Занятие пересекается с расписанием")
+        return True
+
+    def generate_lessons(self):
+        dialog = RecurringLessonsDialog(parent=self)
+        if dialog.exec_() == QDialog.Accepted and dialog.rows:
+            try:
+                with get_session() as db:
+                    count = LessonGenerator.create(db, dialog.rows)
+                    db.commit()
+                get_report_cache().invalidate()
+                show_info("Успех", f"Создано занятий: {count}")
+                self.load_data()
+            except Exception as e:
+                logger.error(f"Ошибка создания занятий по расписанию: {str(e)}")
+                show_error("Ошибка", "Не удалось создать занятия")
+
     def edit_item(self):
         selected_items = self.table.selectedItems()
         if not selected_items:
@@ -299,6 +542,7 @@ class ModelTab(QWidget):
             return
         
         item_id = self.table.item(selected_items[0].row(), 0).data(Qt.UserRole)
+        lesson = None
         try:
             with get_session() as db:
                 item = db.query(self.model_class).get(item_id)
@@ -319,6 +563,15 @@ class ModelTab(QWidget):
                         # If password field is empty during edit, remove it to keep the existing password
                         del data['password']
 
+                    # Пересечения проверяются до flush: при flush сработали бы ограничения БД
+                    if self.model_class == Lesson:
+                        current = {field: getattr(item, field) for field in ('date_time', 'teacher_id',
+                                                                            'group_id', 'location')}
+                        lesson = ScheduleConflicts.pending_lesson({**current, **data}, item.id)
+                        if self.report_conflicts(db, lesson):
+                            return
+
+                    rollup_scope = AttendanceRollup.scope_of(db, self.model_class, item.id)
                     for key, value in data.items():
                         setattr(item, key, value)
 
@@ -334,10 +587,17 @@ class ModelTab(QWidget):
                             )
                             db.add(teacher_subject)
 
+                    # Пересчитываем сводку и для прежних, и для новых группы и дня
+                    db.flush()
+                    rollup_scope |= AttendanceRollup.scope_of(db, self.model_class, item.id)
+                    AttendanceRollup.refresh(db, rollup_scope)
                     db.commit()
+                    get_report_cache().invalidate()
                     show_info("Success", "Item updated successfully")
                     self.load_data()
         except Exception as e:
+            if lesson is not None and self.report_exclusion_violation(e, lesson):
+                return
             logger.error(f"Error editing item: {str(e)}")
             show_error("Error", "Failed to edit item")
     
@@ -359,8 +619,12 @@ class ModelTab(QWidget):
                 with get_session() as db:
                     item = db.query(self.model_class).get(item_id)
                     if item:
+                        rollup_scope = AttendanceRollup.scope_of(db, self.model_class, item.id)
                         db.delete(item)
+                        db.flush()
+                        AttendanceRollup.refresh(db, rollup_scope)
                         db.commit()
+                        get_report_cache().invalidate()
                         show_info("Success", "Item deleted successfully")
                         self.load_data()
                     else:
@@ -384,32 +648,26 @@ class AdminWindow(QWidget):
         refresh_button.clicked.connect(self.refresh_all_tabs)
         layout.addWidget(refresh_button)
         
-        # Create tabs
-        tabs = QTabWidget()
+        # Create tabs; each table is loaded when its tab is first opened
+        tabs = LazyTabWidget()
         
         # Users tab
-        users_tab = ModelTab(User, ['Логин', 'Роль', 'Email'])
-        tabs.addTab(users_tab, "Пользователи")
+        tabs.add_lazy_tab(partial(ModelTab, User, ['Логин', 'Роль', 'Email']), "Пользователи")
         
         # Students tab
-        students_tab = ModelTab(Student, ['Полное имя', 'ID Группы'])
-        tabs.addTab(students_tab, "Студенты")
+        tabs.add_lazy_tab(partial(ModelTab, Student, ['Полное имя', 'ID Группы']), "Студенты")
         
         # Teachers tab
-        teachers_tab = ModelTab(Teacher, ['Имя', 'Фамилия', 'Отчество', 'ID Пользваотеля', 'Телефон'])
-        tabs.addTab(teachers_tab, "Учителя")
+        tabs.add_lazy_tab(partial(ModelTab, Teacher, ['Имя', 'Фамилия', 'Отчество', 'ID Пользваотеля', 'Телефон']), "Учителя")
         
         # Groups tab
-        groups_tab = ModelTab(Group, ['ID', 'Название', 'Описание'])
-        tabs.addTab(groups_tab, "Группы")
+        tabs.add_lazy_tab(partial(ModelTab, Group, ['ID', 'Название', 'Описание']), "Группы")
 
         # Subjects tab
-        subjects_tab = ModelTab(Subject, ['Название', 'Описание'])
-        tabs.addTab(subjects_tab, "Предметы")
+        tabs.add_lazy_tab(partial(ModelTab, Subject, ['Название', 'Описание']), "Предметы")
 
         # Lessons tab
-        lessons_tab = ModelTab(Lesson, ['ID Предмета', 'Дата', 'ID Учителя', 'ID Группы', 'Локация'])
-        tabs.addTab(lessons_tab, "Занятия")
+        tabs.add_lazy_tab(partial(ModelTab, Lesson, ['ID Предмета', 'Дата', 'ID Учителя', 'ID Группы', 'Локация']), "Занятия")
         
         layout.addWidget(tabs)
         self.setLayout(layout)
@@ -418,9 +676,8 @@ class AdminWindow(QWidget):
         self.tabs = tabs
     
     def refresh_all_tabs(self):
-        # Refresh data in all tabs
-        for i in range(self.tabs.count()):
-            tab = self.tabs.widget(i)
+        # Refresh data in opened tabs; the rest load fresh data on first open
+        for tab in self.tabs.built_contents():
             if isinstance(tab, ModelTab):
                 tab.load_data()
 
@@ -1,10 +1,13 @@
-from PyQt5.QtWidgets import QWidget, QVBoxLayout, QTableWidget, QHeaderView, QCheckBox, QPushButton, QTableWidgetItem, \
-    QHBoxLayout, QLabel, QComboBox, QDateEdit
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QTableView, QHeaderView, QPushButton, \
+    QHBoxLayout, QLabel, QComboBox, QDateEdit, QAbstractItemView
 from PyQt5.QtCore import Qt, QDate
 from database import get_session
 from models import Student, Attendance, Lesson, Teacher, Subject, Group
+from services.attendance_service import AttendanceService
+from services.query_executor import get_query_executor, set_busy
+from services.report_cache import get_report_cache
 from utils import show_info, show_error, get_logger, handle_exceptions
-from sqlalchemy.sql import func
+from widgets.attendance_table import AttendanceTableModel, StatusDelegate, STATUS_COLUMN
 
 logger = get_logger()
 
@@ -16,6 +19,7 @@ class AttendanceWindow(QWidget):
         self.user_id = user_id
         self.current_lesson_id = None
         self.is_editing = False
+        self.executor = get_query_executor()
         self.init_ui()
 
     @handle_exceptions
@@ -50,10 +54,18 @@ class AttendanceWindow(QWidget):
             self.btn_save.clicked.connect(lambda checked: self.save_attendance())
             self.btn_save.setVisible(False)
             self.btn_save.setEnabled(False)
-
-        self.table = QTableWidget()
-        self.table.setColumnCount(5)  # Changed from 4 to 5 columns
-        self.table.setHorizontalHeaderLabels(["Студент", "Группа", "Предмет", "Дата", "Присутствие"])
+            self.btn_undo = QPushButton("Отменить изменения")
+            self.btn_undo.clicked.connect(lambda checked: self.undo_changes())
+            self.btn_undo.setVisible(False)
+            self.btn_undo.setEnabled(False)
+
+        self.model = AttendanceTableModel(self)
+        self.model.changes_updated.connect(self.update_edit_buttons)
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.setItemDelegateForColumn(STATUS_COLUMN, StatusDelegate(self.table))
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.verticalHeader().setDefaultSectionSize(28)  # Fixed row height, no per-row measuring
         self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Interactive)  # Allow manual column resizing
         
         # Set specific column widths
@@ -67,6 +79,7 @@ class AttendanceWindow(QWidget):
         if self.role in ['teacher', 'admin']:
             layout.addWidget(self.btn_edit)
             layout.addWidget(self.btn_save)
+            layout.addWidget(self.btn_undo)
         layout.addWidget(self.table)
         self.setLayout(layout)
 
@@ -104,146 +117,77 @@ class AttendanceWindow(QWidget):
             logger.error(f"Ошибка загрузки фильтров: {str(e)}")
             show_error("Ошибка", "Не удалось загрузить фильтры")
 
+    @staticmethod
+    def query_roster(db, selected_date, subject_id=None, group_id=None, teacher_id=None):
+        """Список студентов и занятий за день (выполняется в фоновом потоке)"""
+        return AttendanceService.day_roster_query(
+            db, selected_date, subject_id=subject_id, group_id=group_id, teacher_id=teacher_id
+        ).all()
+
     @handle_exceptions
     def load_data(self, index=None):
-        try:
-            with (get_session() as db):
-                # Базовый запрос для всех студентов и уроков
-                query = db.query(
-                    Student.id, Student.full_name, Student.group_id, Group.name.label('group_name'),
-                    Subject.name.label('subject_name'),
-                    Lesson.date_time, Attendance.status
-                ).join(Group, Group.id == Student.group_id)\
-                 .join(Lesson, Lesson.group_id == Student.group_id)\
-                 .join(Subject, Subject.id == Lesson.subject_id)\
-                 .outerjoin(Attendance, (Attendance.student_id == Student.id) & (Attendance.lesson_id == Lesson.id))
-
-                # Фильтр по дате
-                selected_date = self.date_filter.date().toPyDate()
-                query = query.filter(func.date(Lesson.date_time) == selected_date)
-
-                # Фильтр по предмету
-                selected_subject = self.subject_filter.currentData()
-                if selected_subject:
-                    query = query.filter(Lesson.subject_id == selected_subject)  # Changed to use subject_id
-
-                # Фильтр по группе
-                selected_group = self.group_filter.currentData()
-                if selected_group:
-                    query = query.filter(Student.group_id == selected_group)
-
-                # Фильтр по учителю только для студента
-                if self.role == 'student':
-                    selected_teacher = self.teacher_filter.currentData()
-                    if selected_teacher:
-                        query = query.filter(Lesson.teacher_id == selected_teacher)
-
-                results = query.all()
-                logger.info(f"Найдено записей: {len(results)}")
-
-                self.table.setRowCount(len(results))
-                for row, (student_id, full_name, group_id, group_name, subject_name, date_time, status) in enumerate(results):
-                    self.table.setItem(row, 0, QTableWidgetItem(full_name))
-                    self.table.setItem(row, 1, QTableWidgetItem(f"Группа {group_name}"))
-                    self.table.setItem(row, 2, QTableWidgetItem(subject_name))
-                    self.table.setItem(row, 3, QTableWidgetItem(date_time.strftime("%d.%m.%Y %H:%M")))
-
-                    if self.role == 'student':
-                        status_text = "Присутствовал" if status == 'present' else "Отсутствовал" if status == 'absent' else "Опоздал" if status == 'late' else "Болеет" if status == 'sick' else "Не отмечено"
-                        status_item = QTableWidgetItem(status_text)
-                        status_item.setFlags(status_item.flags() & ~Qt.ItemIsEditable)
-                        self.table.setItem(row, 4, status_item)  # Changed from column 3 to 4
-                    else:
-                        cell_widget = QWidget()
-                        layout = QHBoxLayout(cell_widget)
-                        layout.setContentsMargins(2, 2, 2, 2)  # Reduced margins
-                        layout.setAlignment(Qt.AlignCenter)
-
-                        combo = QComboBox()
-                        combo.addItems(["", "Присутствовал", "Отсутствовал", "Опоздал", "Болеет"])
-                        if status == 'present':
-                            combo.setCurrentIndex(1)
-                        elif status == 'absent':
-                            combo.setCurrentIndex(2)
-                        elif status == 'late':
-                            combo.setCurrentIndex(3)
-                        elif status == 'sick':
-                            combo.setCurrentIndex(4)
-                        else:
-                            combo.setCurrentIndex(0)
-                        combo.setEnabled(self.is_editing)
-                        combo.setFixedWidth(120)  # Set fixed width for combo box
-
-                        layout.addWidget(combo)
-                        cell_widget.setLayout(layout)
-                        self.table.setCellWidget(row, 4, cell_widget)  # Changed from column 3 to 4
-                        combo.currentIndexChanged.connect(lambda index, r=row: self.on_attendance_changed(r))
-
-                        # Поиск урока для сохранения
-                        lesson = db.query(Lesson).filter(
-                            func.date(Lesson.date_time) == selected_date,
-                            Lesson.group_id == group_id,
-                            Lesson.subject_id == (selected_subject if selected_subject else Lesson.subject_id)
-                        ).first()
-                        self.table.item(row, 0).setData(Qt.UserRole, (student_id, lesson.id if lesson else None))
-
-        except Exception as e:
-            logger.error(f"Ошибка загрузки данных: {str(e)}")
-            show_error("Ошибка", "Не удалось загрузить данные")
+        set_busy(self.table, True)
+        self.executor.submit(
+            'attendance', self.query_roster,
+            self.date_filter.date().toPyDate(),
+            subject_id=self.subject_filter.currentData(),
+            group_id=self.group_filter.currentData(),
+            teacher_id=self.teacher_filter.currentData() if self.role == 'student' else None,
+            on_result=self.fill_table,
+            on_error=self.on_load_error
+        )
+
+    def fill_table(self, rows):
+        set_busy(self.table, False)
+        logger.info(f"Найдено записей: {len(rows)}")
+        self.model.set_rows(rows)
+
+    def on_load_error(self, message):
+        set_busy(self.table, False)
+        logger.error(f"Ошибка загрузки данных: {message}")
+        show_error("Ошибка", "Не удалось загрузить данные")
 
     def toggle_editing(self):
+        if self.is_editing:
+            # Несохраненные изменения отбрасываются при выходе из режима редактирования
+            self.model.undo_changes()
         self.is_editing = not self.is_editing
+        self.model.set_editable(self.is_editing)
+        self.table.setEditTriggers(
+            QAbstractItemView.CurrentChanged | QAbstractItemView.SelectedClicked
+            if self.is_editing else QAbstractItemView.NoEditTriggers
+        )
         self.btn_save.setVisible(self.is_editing)
-        self.btn_save.setEnabled(False)
+        self.btn_undo.setVisible(self.is_editing)
         self.btn_edit.setText("Завершить редактирование" if self.is_editing else "Изменить присутствие")
-        self.load_data()
+        self.update_edit_buttons()
+
+    def update_edit_buttons(self, count=None):
+        if self.role in ['teacher', 'admin']:
+            has_changes = bool(self.model.changes)
+            self.btn_save.setEnabled(has_changes)
+            self.btn_undo.setEnabled(has_changes)
 
-    def on_attendance_changed(self, row):
-        if self.is_editing and self.role in ['teacher', 'admin']:
-            self.btn_save.setEnabled(True)
+    def undo_changes(self):
+        """Возвращает исходные отметки в измененных строках без перезагрузки"""
+        self.model.undo_changes()
 
     @handle_exceptions
     def save_attendance(self):
-        if self.role == 'student' or not self.is_editing:
+        if self.role == 'student' or not self.is_editing or not self.model.changes:
             return
 
         try:
             with get_session() as db:
-                for row in range(self.table.rowCount()):
-                    student_data = self.table.item(row, 0).data(Qt.UserRole)
-                    if not student_data:
-                        continue
-                    student_id, lesson_id = student_data
-                    if not lesson_id:
-                        logger.warning(f"Lesson ID не найден для строки {row}")
-                        continue
-
-                    combo = self.table.cellWidget(row, 4).findChild(QComboBox)
-                    state = combo.currentIndex()
-
-                    attendance = db.query(Attendance).filter(
-                        Attendance.student_id == student_id,
-                        Attendance.lesson_id == lesson_id
-                    ).first()
-
-                    if state == 0:  # Empty selection
-                        if attendance:
-                            db.delete(attendance)
-                    else:
-                        status_map = {1: 'present', 2: 'absent', 3: 'late', 4: 'sick'}
-                        status = status_map[state]
-                        
-                        if attendance:
-                            attendance.status = status
-                        else:
-                            db.add(Attendance(student_id=student_id, lesson_id=lesson_id, status=status))
-
+                changes = self.model.pending_changes()
+                AttendanceService.save_changes(db, changes)
                 db.commit()
-                show_info("Успех", "Посещаемость сохранена")
-                self.is_editing = False
-                self.btn_save.setVisible(False)
-                self.btn_edit.setText("Изменить присутствие")
-                self.load_data()
+                get_report_cache().invalidate()
+                logger.info(f"Сохранено изменений: {len(changes)}")
+
+            self.model.commit_changes()
+            show_info("Успех", "Посещаемость сохранена")
+            self.toggle_editing()
 
         except Exception as e:
             logger.error(f"Ошибка сохранения: {str(e)}")
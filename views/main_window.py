@@ -1,6 +1,8 @@
-from PyQt5.QtWidgets import QMainWindow, QTabWidget, QStatusBar
-# from widgets.calendar import CalendarWidget
+from functools import partial
+from PyQt5.QtWidgets import QMainWindow, QStatusBar
+from widgets.calendar import CalendarWidget
 from widgets.stats import StatsWidget
+from widgets.lazy_tabs import LazyTabWidget
 from .schedule_window import ScheduleWindow
 from .attendance_window import AttendanceWindow
 from .admin_window import AdminWindow
@@ -23,24 +25,25 @@ class MainWindow(QMainWindow):
 
     @handle_exceptions
     def init_ui(self):
-        # Создание вкладок
-        self.tabs = QTabWidget()
+        # Создание вкладок: содержимое строится при первом открытии вкладки,
+        # сразу создается только текущая вкладка расписания
+        self.tabs = LazyTabWidget()
 
         # Основные вкладки
-        self.tabs.addTab(ScheduleWindow(role=self.role), "Расписание")
-        self.tabs.addTab(AttendanceWindow(role=self.role, user_id=self.current_user_id), "Посещаемость")
+        self.tabs.add_lazy_tab(partial(ScheduleWindow, role=self.role), "Расписание")
+        self.tabs.add_lazy_tab(partial(AttendanceWindow, role=self.role, user_id=self.current_user_id), "Посещаемость")
 
         # Виджеты для администратора
         if self.role == 'admin':
-            self.tabs.addTab(AdminWindow(), "Управление")
-            # self.tabs.addTab(CalendarWidget(), "Календарь")
-            self.tabs.addTab(StatsWidget(), "Статистика")
-            self.tabs.addTab(ReportsWindow(role=self.role, user_id=self.current_user_id), "Отчеты")
+            self.tabs.add_lazy_tab(AdminWindow, "Управление")
+            self.tabs.add_lazy_tab(CalendarWidget, "Календарь")
+            self.tabs.add_lazy_tab(StatsWidget, "Статистика")
+            self.tabs.add_lazy_tab(partial(ReportsWindow, role=self.role, user_id=self.current_user_id), "Отчеты")
         
         # Добавляем вкладку статистики и отчетов для учителей
         elif self.role == 'teacher':
-            self.tabs.addTab(StatsWidget(), "Статистика")
-            self.tabs.addTab(ReportsWindow(role=self.role, user_id=self.current_user_id), "Отчеты")
+            self.tabs.add_lazy_tab(StatsWidget, "Статистика")
+            self.tabs.add_lazy_tab(partial(ReportsWindow, role=self.role, user_id=self.current_user_id), "Отчеты")
 
         self.setCentralWidget(self.tabs)
 
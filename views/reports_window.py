@@ -1,24 +1,40 @@
+from contextlib import contextmanager
+from functools import partial
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QTabWidget, 
-                             QTableWidget, QTableWidgetItem, QPushButton,
+                             QTableWidget, QTableWidgetItem, QTableView, QPushButton,
                              QComboBox, QLabel, QDateEdit, QFileDialog,
                              QHeaderView, QMessageBox, QGroupBox, QRadioButton)
 from PyQt5.QtCore import Qt, QDate
 from database import get_session
 from models import Student, Attendance, Lesson, Teacher, Subject, Group
-from utils import show_error, show_info, handle_exceptions, get_logger, export_report
+from utils import show_error, show_info, handle_exceptions, get_logger, export_report, export_batch_report
 from services.report_generator import ReportGenerator
-from sqlalchemy.sql import func, case
-from datetime import datetime, timedelta
+from services.report_queries import ReportQueries
+from services.query_executor import get_query_executor, set_busy
+from services.report_cache import get_report_cache
+from widgets.paged_table import KeysetTableModel
+from widgets.lazy_tabs import LazyTabWidget
 
 logger = get_logger()
 
 
 class ReportsWindow(QWidget):
+    # Колонки отчета о посещаемости студента (и листов пакетного экспорта)
+    STUDENT_ATTENDANCE_COLUMNS = {
+        'student': 'Студент',
+        'subject': 'Предмет',
+        'date': 'Дата',
+        'status': 'Статус',
+        'teacher': 'Преподаватель'
+    }
+
     def __init__(self, role='student', user_id=None):
         super().__init__()
         self.role = role
         self.user_id = user_id
         self.report_generator = ReportGenerator()
+        self.executor = get_query_executor()
+        self.cache = get_report_cache()
         self.init_ui()
 
     @handle_exceptions
@@ -26,21 +42,14 @@ class ReportsWindow(QWidget):
         layout = QVBoxLayout()
         
         # Create tab widget for different report types
-        self.tabs = QTabWidget()
-        
-        # Create tabs for each report type
-        self.student_attendance_tab = self.create_student_attendance_tab()
-        self.group_attendance_tab = self.create_group_attendance_tab()
-        self.teacher_lessons_tab = self.create_teacher_lessons_tab()
-        self.group_size_tab = self.create_group_size_tab()
-        self.date_attendance_tab = self.create_date_attendance_tab()
-        
-        # Add tabs to the tab widget
-        self.tabs.addTab(self.student_attendance_tab, "Посещаемость студента")
-        self.tabs.addTab(self.group_attendance_tab, "Посещаемость по группам")
-        self.tabs.addTab(self.teacher_lessons_tab, "Уроки преподавателя")
-        self.tabs.addTab(self.group_size_tab, "Количество студентов в группах")
-        self.tabs.addTab(self.date_attendance_tab, "Посещаемость по датам")
+        self.tabs = LazyTabWidget()
+        
+        # Вкладки отчетов создаются при первом открытии вместе с загрузкой фильтров
+        self.tabs.add_lazy_tab(self.create_student_attendance_tab, "Посещаемость студента")
+        self.tabs.add_lazy_tab(self.create_group_attendance_tab, "Посещаемость по группам")
+        self.tabs.add_lazy_tab(self.create_teacher_lessons_tab, "Уроки преподавателя")
+        self.tabs.add_lazy_tab(self.create_group_size_tab, "Количество студентов в группах")
+        self.tabs.add_lazy_tab(self.create_date_attendance_tab, "Посещаемость по датам")
         
         layout.addWidget(self.tabs)
         self.setLayout(layout)
@@ -80,9 +89,15 @@ class ReportsWindow(QWidget):
         filter_layout.addWidget(self.student_end_date)
         
         # Table
-        self.student_attendance_table = QTableWidget()
-        self.student_attendance_table.setColumnCount(5)
-        self.student_attendance_table.setHorizontalHeaderLabels(["Студент", "Предмет", "Дата", "Статус", "Преподаватель"])
+        # Строки отчета подгружаются страницами по мере прокрутки
+        self.student_attendance_model = KeysetTableModel(
+            ["Студент", "Предмет", "Дата", "Статус", "Преподаватель"], 'student_attendance', self.executor
+        )
+        self.student_attendance_model.page_loaded.connect(
+            lambda count: set_busy(self.student_attendance_table, False))
+        self.student_attendance_model.load_failed.connect(self.on_student_report_failed)
+        self.student_attendance_table = QTableView()
+        self.student_attendance_table.setModel(self.student_attendance_model)
         self.student_attendance_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
         
         # Export options
@@ -93,21 +108,30 @@ class ReportsWindow(QWidget):
         format_layout = QHBoxLayout()
         self.student_pdf_radio = QRadioButton("PDF")
         self.student_excel_radio = QRadioButton("Excel")
+        self.student_csv_radio = QRadioButton("CSV")
+        self.student_parquet_radio = self.create_parquet_radio()
         self.student_pdf_radio.setChecked(True)
         format_layout.addWidget(self.student_pdf_radio)
         format_layout.addWidget(self.student_excel_radio)
+        format_layout.addWidget(self.student_csv_radio)
+        format_layout.addWidget(self.student_parquet_radio)
         format_group.setLayout(format_layout)
         
         # Export button
         self.student_export_btn = QPushButton("Экспорт отчета")
         self.student_export_btn.clicked.connect(self.export_student_attendance_report)
         
+        # Batch export button: отдельный файл на каждого студента в zip-архиве
+        self.student_batch_export_btn = QPushButton("Экспорт по студентам (ZIP)")
+        self.student_batch_export_btn.clicked.connect(self.export_student_attendance_batch)
+        
         # Generate report button
         self.student_generate_btn = QPushButton("Сформировать отчет")
         self.student_generate_btn.clicked.connect(self.generate_student_attendance_report)
         
         export_layout.addWidget(format_group)
         export_layout.addWidget(self.student_export_btn)
+        export_layout.addWidget(self.student_batch_export_btn)
         export_layout.addWidget(self.student_generate_btn)
         
         layout.addLayout(filter_layout)
@@ -160,8 +184,9 @@ class ReportsWindow(QWidget):
         
         # Table
         self.group_attendance_table = QTableWidget()
-        self.group_attendance_table.setColumnCount(4)
-        self.group_attendance_table.setHorizontalHeaderLabels(["Группа", "Предмет", "Всего занятий", "Средняя посещаемость (%)"])
+        self.group_attendance_table.setColumnCount(5)
+        self.group_attendance_table.setHorizontalHeaderLabels(["Группа", "Предмет", "Всего занятий", "Количество студентов",
+                                                               "Средняя посещаемость (%)"])
         self.group_attendance_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
         
         # Export options
@@ -172,21 +197,30 @@ class ReportsWindow(QWidget):
         format_layout = QHBoxLayout()
         self.group_pdf_radio = QRadioButton("PDF")
         self.group_excel_radio = QRadioButton("Excel")
+        self.group_csv_radio = QRadioButton("CSV")
+        self.group_parquet_radio = self.create_parquet_radio()
         self.group_pdf_radio.setChecked(True)
         format_layout.addWidget(self.group_pdf_radio)
         format_layout.addWidget(self.group_excel_radio)
+        format_layout.addWidget(self.group_csv_radio)
+        format_layout.addWidget(self.group_parquet_radio)
         format_group.setLayout(format_layout)
         
         # Export button
         self.group_export_btn = QPushButton("Экспорт отчета")
         self.group_export_btn.clicked.connect(self.export_group_attendance_report)
         
+        # Batch export button: отдельный файл на каждую группу в zip-архиве
+        self.group_batch_export_btn = QPushButton("Экспорт по группам (ZIP)")
+        self.group_batch_export_btn.clicked.connect(self.export_group_attendance_batch)
+        
         # Generate report button
         self.group_generate_btn = QPushButton("Сформировать отчет")
         self.group_generate_btn.clicked.connect(self.generate_group_attendance_report)
         
         export_layout.addWidget(format_group)
         export_layout.addWidget(self.group_export_btn)
+        export_layout.addWidget(self.group_batch_export_btn)
         export_layout.addWidget(self.group_generate_btn)
         
         layout.addLayout(filter_layout)
@@ -243,9 +277,13 @@ class ReportsWindow(QWidget):
         format_layout = QHBoxLayout()
         self.teacher_pdf_radio = QRadioButton("PDF")
         self.teacher_excel_radio = QRadioButton("Excel")
+        self.teacher_csv_radio = QRadioButton("CSV")
+        self.teacher_parquet_radio = self.create_parquet_radio()
         self.teacher_pdf_radio.setChecked(True)
         format_layout.addWidget(self.teacher_pdf_radio)
         format_layout.addWidget(self.teacher_excel_radio)
+        format_layout.addWidget(self.teacher_csv_radio)
+        format_layout.addWidget(self.teacher_parquet_radio)
         format_group.setLayout(format_layout)
         
         # Export button
@@ -290,9 +328,13 @@ class ReportsWindow(QWidget):
         format_layout = QHBoxLayout()
         self.group_size_pdf_radio = QRadioButton("PDF")
         self.group_size_excel_radio = QRadioButton("Excel")
+        self.group_size_csv_radio = QRadioButton("CSV")
+        self.group_size_parquet_radio = self.create_parquet_radio()
         self.group_size_pdf_radio.setChecked(True)
         format_layout.addWidget(self.group_size_pdf_radio)
         format_layout.addWidget(self.group_size_excel_radio)
+        format_layout.addWidget(self.group_size_csv_radio)
+        format_layout.addWidget(self.group_size_parquet_radio)
         format_group.setLayout(format_layout)
         
         # Export button
@@ -353,9 +395,13 @@ class ReportsWindow(QWidget):
         format_layout = QHBoxLayout()
         self.date_pdf_radio = QRadioButton("PDF")
         self.date_excel_radio = QRadioButton("Excel")
+        self.date_csv_radio = QRadioButton("CSV")
+        self.date_parquet_radio = self.create_parquet_radio()
         self.date_pdf_radio.setChecked(True)
         format_layout.addWidget(self.date_pdf_radio)
         format_layout.addWidget(self.date_excel_radio)
+        format_layout.addWidget(self.date_csv_radio)
+        format_layout.addWidget(self.date_parquet_radio)
         format_group.setLayout(format_layout)
         
         # Export button
@@ -458,94 +504,131 @@ class ReportsWindow(QWidget):
             logger.error(f"Ошибка загрузки преподавателей: {str(e)}")
             show_error("Ошибка", "Не удалось загрузить список преподавателей")
     
+    def run_report(self, key, table, query_fn, row_formatter, *args, **kwargs):
+        """Выполняет запрос отчета в фоне и заполняет таблицу по готовности.
+
+        Результат с теми же фильтрами берется из кэша, пока данные не менялись.
+        """
+        cache_key = self.cache.make_key(key, *args, **kwargs)
+        found, rows = self.cache.get(cache_key)
+        if found:
+            self.executor.cancel(key)
+            set_busy(table, False)
+            self.fill_table(table, rows)
+            return
+
+        set_busy(table, True)
+
+        def on_result(rows):
+            self.cache.put(cache_key, rows)
+            set_busy(table, False)
+            self.fill_table(table, rows)
+
+        def on_error(message):
+            set_busy(table, False)
+            show_error("Ошибка", "Не удалось сформировать отчет")
+
+        self.executor.submit(
+            key, ReportQueries.fetch_rows, query_fn, row_formatter, *args,
+            on_result=on_result, on_error=on_error, **kwargs
+        )
+
+    @staticmethod
+    def fill_table(table, rows):
+        table.setRowCount(len(rows))
+        for row, values in enumerate(rows):
+            for col, value in enumerate(values):
+                table.setItem(row, col, QTableWidgetItem(value))
+
+    def create_parquet_radio(self):
+        radio = QRadioButton("Parquet")
+        if not self.report_generator.parquet_available():
+            radio.setEnabled(False)
+            radio.setToolTip("Для экспорта в Parquet установите пакет pyarrow")
+        return radio
+
+    def export_format(self, prefix):
+        """Возвращает формат экспорта, выбранный на вкладке отчета"""
+        for file_format, radio_name in (('xlsx', 'excel'), ('csv', 'csv'), ('parquet', 'parquet')):
+            if getattr(self, f'{prefix}_{radio_name}_radio').isChecked():
+                return file_format
+        return 'pdf'
+
+    def export_query_report(self, columns, file_format, query_fn, row_formatter, *args, **kwargs):
+        """Экспортирует отчет, читая строки напрямую из курсора БД"""
+        @contextmanager
+        def open_rows():
+            # Сессия открывается только после выбора файла
+            with get_session() as db:
+                yield ReportQueries.stream_rows(db, query_fn, row_formatter, *args, **kwargs)
+
+        return export_report(self, columns, self.report_generator, file_format, open_rows)
+    
+    def export_attendance_sheets(self, file_format, by, item_id, start_date, end_date, subject_id=None):
+        """Экспортирует листы посещаемости по каждому студенту или группе в zip-архив"""
+        ids = [item_id] if item_id else None
+
+        @contextmanager
+        def open_sheets():
+            with get_session() as db:
+                total = ReportQueries.attendance_sheet_count(db, start_date, end_date, by, ids, subject_id)
+                yield ReportQueries.attendance_sheets(db, start_date, end_date, by, ids, subject_id), total
+
+        return export_batch_report(self, self.STUDENT_ATTENDANCE_COLUMNS, self.report_generator,
+                                   file_format, open_sheets)
+    
     @handle_exceptions
     def generate_student_attendance_report(self, checked=None):
         """Генерирует отчет о посещаемости студента"""
         # The 'checked' parameter is for signal compatibility
-        try:
-            student_id = self.student_filter.currentData()
-            subject_id = self.student_subject_filter.currentData()
-            start_date = self.student_start_date.date().toPyDate()
-            end_date = self.student_end_date.date().toPyDate()
-            
-            with get_session() as db:
-                query = db.query(
-                    Student.full_name,
-                    Subject.name.label('subject_name'),
-                    Lesson.date_time,
-                    Attendance.status,
-                    Teacher.last_name,
-                    Teacher.first_name,
-                    Teacher.patronymic
-                ).join(Attendance, Student.id == Attendance.student_id)\
-                 .join(Lesson, Lesson.id == Attendance.lesson_id)\
-                 .join(Subject, Subject.id == Lesson.subject_id)\
-                 .join(Teacher, Teacher.id == Lesson.teacher_id)\
-                 .filter(Lesson.date_time.between(start_date, end_date + timedelta(days=1)))
-                
-                if student_id:
-                    query = query.filter(Student.id == student_id)
-                if subject_id:
-                    query = query.filter(Subject.id == subject_id)
-                
-                results = query.all()
-                
-                self.student_attendance_table.setRowCount(len(results))
-                for row, (student_name, subject_name, date_time, status, last_name, first_name, patronymic) in enumerate(results):
-                    teacher_name = f"{last_name} {first_name} {patronymic or ''}".strip()
-                    status_text = "Присутствовал" if status == 'present' else "Отсутствовал" if status == 'absent' else "Опоздал" if status == 'late' else "Болеет" if status == 'sick' else "Не отмечено"
-                    
-                    self.student_attendance_table.setItem(row, 0, QTableWidgetItem(student_name))
-                    self.student_attendance_table.setItem(row, 1, QTableWidgetItem(subject_name))
-                    self.student_attendance_table.setItem(row, 2, QTableWidgetItem(date_time.strftime("%d.%m.%Y %H:%M")))
-                    self.student_attendance_table.setItem(row, 3, QTableWidgetItem(status_text))
-                    self.student_attendance_table.setItem(row, 4, QTableWidgetItem(teacher_name))
-        except Exception as e:
-            logger.error(f"Ошибка генерации отчета о посещаемости студента: {str(e)}")
-            show_error("Ошибка", "Не удалось сформировать отчет")
+        set_busy(self.student_attendance_table, True)
+        self.student_attendance_model.reset(partial(
+            ReportQueries.student_attendance_page,
+            start_date=self.student_start_date.date().toPyDate(),
+            end_date=self.student_end_date.date().toPyDate(),
+            student_id=self.student_filter.currentData(),
+            subject_id=self.student_subject_filter.currentData()
+        ))
+
+    def on_student_report_failed(self, message):
+        set_busy(self.student_attendance_table, False)
+        show_error("Ошибка", "Не удалось сформировать отчет")
     
     @handle_exceptions
     def export_student_attendance_report(self, checked=None):
         """Экспортирует отчет о посещаемости студента"""
         # The 'checked' parameter is for signal compatibility
-        columns = {
-            'student': 'Студент',
-            'subject': 'Предмет',
-            'date': 'Дата',
-            'status': 'Статус',
-            'teacher': 'Преподаватель'
-        }
-        export_report(self, self.student_attendance_table, columns, self.report_generator, self.student_pdf_radio)
+        self.export_query_report(
+            self.STUDENT_ATTENDANCE_COLUMNS, self.export_format('student'),
+            ReportQueries.student_attendance, ReportQueries.student_attendance_row,
+            self.student_start_date.date().toPyDate(),
+            self.student_end_date.date().toPyDate(),
+            student_id=self.student_filter.currentData(),
+            subject_id=self.student_subject_filter.currentData()
+        )
+    
+    @handle_exceptions
+    def export_student_attendance_batch(self, checked=None):
+        """Экспортирует отдельный отчет о посещаемости каждого студента"""
+        # The 'checked' parameter is for signal compatibility
+        self.export_attendance_sheets(
+            self.export_format('student'), 'student',
+            self.student_filter.currentData(),
+            self.student_start_date.date().toPyDate(),
+            self.student_end_date.date().toPyDate(),
+            subject_id=self.student_subject_filter.currentData()
+        )
     
     @handle_exceptions
     def generate_date_attendance_report(self, checked=None):
         """Генерирует отчет о посещаемости по датам"""
         # The 'checked' parameter is for signal compatibility
-        try:
-            start_date = self.date_start_date.date().toPyDate()
-            end_date = self.date_end_date.date().toPyDate()
-            
-            with get_session() as db:
-                # Подзапрос для подсчета занятий по датам
-                query = db.query(
-                    func.date(Lesson.date_time).label('lesson_date'),
-                    func.count(Lesson.id).label('lesson_count'),
-                    func.avg(case((Attendance.status == 'present', 100.0), else_=0)).label('attendance_percent')
-                ).outerjoin(Attendance, Attendance.lesson_id == Lesson.id)\
-                 .filter(Lesson.date_time.between(start_date, end_date + timedelta(days=1)))\
-                 .group_by(func.date(Lesson.date_time))\
-                 .order_by(func.date(Lesson.date_time))
-                
-                results = query.all()
-                
-                self.date_attendance_table.setRowCount(len(results))
-                for row, (lesson_date, lesson_count, attendance_percent) in enumerate(results):
-                    self.date_attendance_table.setItem(row, 0, QTableWidgetItem(lesson_date.strftime("%d.%m.%Y")))
-                    self.date_attendance_table.setItem(row, 1, QTableWidgetItem(str(lesson_count)))
-                    self.date_attendance_table.setItem(row, 2, QTableWidgetItem(f"{attendance_percent:.2f}%"))
-        except Exception as e:
-            logger.error(f"Ошибка генерации отчета о посещаемости по датам: {str(e)}")
-            show_error("Ошибка", "Не удалось сформировать отчет")
+        self.run_report(
+            'date_attendance', self.date_attendance_table,
+            ReportQueries.date_attendance, ReportQueries.date_attendance_row,
+            self.date_start_date.date().toPyDate(),
+            self.date_end_date.date().toPyDate()
+        )
     
     @handle_exceptions
     def export_date_attendance_report(self, checked=None):
@@ -556,79 +639,25 @@ class ReportsWindow(QWidget):
             'lesson_count': 'Количество занятий',
             'attendance': 'Посещаемость (%)'
         }
-        export_report(self, self.date_attendance_table, columns, self.report_generator, self.date_pdf_radio)
+        self.export_query_report(
+            columns, self.export_format('date'),
+            ReportQueries.date_attendance, ReportQueries.date_attendance_row,
+            self.date_start_date.date().toPyDate(),
+            self.date_end_date.date().toPyDate()
+        )
     
     @handle_exceptions
     def generate_group_attendance_report(self, checked=None):
         """Генерирует отчет о посещаемости по группам"""
         # The 'checked' parameter is for signal compatibility
-        try:
-            group_id = self.group_filter.currentData()
-            subject_id = self.group_subject_filter.currentData()
-            start_date = self.group_start_date.date().toPyDate()
-            end_date = self.group_end_date.date().toPyDate()
-            
-            with get_session() as db:
-                # Подзапрос для подсчета общего количества занятий
-                lessons_subquery = db.query(
-                    Group.id.label('group_id'),
-                    Subject.id.label('subject_id'),
-                    func.count(Lesson.id).label('lesson_count')
-                ).join(Lesson, Lesson.group_id == Group.id)\
-                 .join(Subject, Subject.id == Lesson.subject_id)\
-                 .filter(Lesson.date_time.between(start_date, end_date + timedelta(days=1)))
-                
-                if group_id:
-                    lessons_subquery = lessons_subquery.filter(Group.id == group_id)
-                if subject_id:
-                    lessons_subquery = lessons_subquery.filter(Subject.id == subject_id)
-                    
-                lessons_subquery = lessons_subquery.group_by(Group.id, Subject.id).subquery()
-                
-                # Подзапрос для подсчета посещаемости
-                attendance_subquery = db.query(
-                    Group.id.label('group_id'),
-                    Subject.id.label('subject_id'),
-                    func.count(Attendance.student_id).label('attendance_count'),
-                    func.count(Student.id).label('student_count')
-                ).join(Student, Student.group_id == Group.id)\
-                 .join(Lesson, Lesson.group_id == Group.id)\
-                 .join(Subject, Subject.id == Lesson.subject_id)\
-                 .outerjoin(Attendance, (Attendance.student_id == Student.id) & 
-                                        (Attendance.lesson_id == Lesson.id) & 
-                                        (Attendance.status == 'present'))\
-                 .filter(Lesson.date_time.between(start_date, end_date + timedelta(days=1)))
-                
-                if group_id:
-                    attendance_subquery = attendance_subquery.filter(Group.id == group_id)
-                if subject_id:
-                    attendance_subquery = attendance_subquery.filter(Subject.id == subject_id)
-                    
-                attendance_subquery = attendance_subquery.group_by(Group.id, Subject.id).subquery()
-                
-                # Объединение результатов
-                results = db.query(
-                    Group.name.label('group_name'),
-                    Subject.name.label('subject_name'),
-                    lessons_subquery.c.lesson_count,
-                    func.round(func.coalesce(attendance_subquery.c.attendance_count, 0) * 100.0 / 
-                              (func.coalesce(attendance_subquery.c.student_count, 0) * lessons_subquery.c.lesson_count), 2).label('attendance_percent')
-                ).join(lessons_subquery, Group.id == lessons_subquery.c.group_id)\
-                 .join(Subject, Subject.id == lessons_subquery.c.subject_id)\
-                 .join(attendance_subquery, (Group.id == attendance_subquery.c.group_id) & 
-                                           (Subject.id == attendance_subquery.c.subject_id))
-                
-                results = results.all()
-                
-                self.group_attendance_table.setRowCount(len(results))
-                for row, (group_name, subject_name, lesson_count, attendance_percent) in enumerate(results):
-                    self.group_attendance_table.setItem(row, 0, QTableWidgetItem(group_name))
-                    self.group_attendance_table.setItem(row, 1, QTableWidgetItem(subject_name))
-                    self.group_attendance_table.setItem(row, 2, QTableWidgetItem(str(lesson_count)))
-                    self.group_attendance_table.setItem(row, 3, QTableWidgetItem(f"{attendance_percent}%"))
-        except Exception as e:
-            logger.error(f"Ошибка генерации отчета о посещаемости по группам: {str(e)}")
-            show_error("Ошибка", "Не удалось сформировать отчет")
+        self.run_report(
+            'group_attendance', self.group_attendance_table,
+            ReportQueries.group_attendance, ReportQueries.group_attendance_row,
+            self.group_start_date.date().toPyDate(),
+            self.group_end_date.date().toPyDate(),
+            group_id=self.group_filter.currentData(),
+            subject_id=self.group_subject_filter.currentData()
+        )
     
     @handle_exceptions
     def export_group_attendance_report(self, checked=None):
@@ -638,91 +667,41 @@ class ReportsWindow(QWidget):
             'group': 'Группа',
             'subject': 'Предмет',
             'lessons': 'Всего занятий',
+            'student_count': 'Количество студентов',
             'attendance': 'Средняя посещаемость (%)'
         }
-        export_report(self, self.group_attendance_table, columns, self.report_generator, self.group_pdf_radio)
+        self.export_query_report(
+            columns, self.export_format('group'),
+            ReportQueries.group_attendance, ReportQueries.group_attendance_row,
+            self.group_start_date.date().toPyDate(),
+            self.group_end_date.date().toPyDate(),
+            group_id=self.group_filter.currentData(),
+            subject_id=self.group_subject_filter.currentData()
+        )
     
     @handle_exceptions
-    def generate_date_attendance_report(self, checked=None):
-        """Генерирует отчет о посещаемости по датам"""
+    def export_group_attendance_batch(self, checked=None):
+        """Экспортирует отдельный отчет о посещаемости студентов каждой группы"""
         # The 'checked' parameter is for signal compatibility
-        try:
-            start_date = self.date_start_date.date().toPyDate()
-            end_date = self.date_end_date.date().toPyDate()
-            
-            with get_session() as db:
-                # Подзапрос для подсчета занятий по датам
-                query = db.query(
-                    func.date(Lesson.date_time).label('lesson_date'),
-                    func.count(Lesson.id).label('lesson_count'),
-                    func.avg(case((Attendance.status == 'present', 100.0), else_=0)).label('attendance_percent')
-                ).outerjoin(Attendance, Attendance.lesson_id == Lesson.id)\
-                 .filter(Lesson.date_time.between(start_date, end_date + timedelta(days=1)))\
-                 .group_by(func.date(Lesson.date_time))\
-                 .order_by(func.date(Lesson.date_time))
-                
-                results = query.all()
-                
-                self.date_attendance_table.setRowCount(len(results))
-                for row, (lesson_date, lesson_count, attendance_percent) in enumerate(results):
-                    self.date_attendance_table.setItem(row, 0, QTableWidgetItem(lesson_date.strftime("%d.%m.%Y")))
-                    self.date_attendance_table.setItem(row, 1, QTableWidgetItem(str(lesson_count)))
-                    self.date_attendance_table.setItem(row, 2, QTableWidgetItem(f"{attendance_percent:.2f}%"))
-        except Exception as e:
-            logger.error(f"Ошибка генерации отчета о посещаемости по датам: {str(e)}")
-            show_error("Ошибка", "Не удалось сформировать отчет")
-    
-    @handle_exceptions
-    def export_date_attendance_report(self, checked=None):
-        """Экспортирует отчет о посещаемости по датам"""
-        # The 'checked' parameter is for signal compatibility
-        columns = {
-            'date': 'Дата',
-            'lesson_count': 'Количество занятий',
-            'attendance': 'Посещаемость (%)'
-        }
-        export_report(self, self.date_attendance_table, columns, self.report_generator, self.date_pdf_radio)
+        self.export_attendance_sheets(
+            self.export_format('group'), 'group',
+            self.group_filter.currentData(),
+            self.group_start_date.date().toPyDate(),
+            self.group_end_date.date().toPyDate(),
+            subject_id=self.group_subject_filter.currentData()
+        )
     
     @handle_exceptions
     def generate_teacher_lessons_report(self, checked=None):
         """Генерирует отчет о уроках, проведенных учителем"""
         # The 'checked' parameter is for signal compatibility
-        try:
-            teacher_id = self.teacher_filter.currentData()
-            start_date = self.teacher_start_date.date().toPyDate()
-            end_date = self.teacher_end_date.date().toPyDate()
-            
-            with get_session() as db:
-                query = db.query(
-                    Teacher.last_name,
-                    Teacher.first_name,
-                    Teacher.patronymic,
-                    Subject.name.label('subject_name'),
-                    Group.name.label('group_name'),
-                    Lesson.date_time,
-                    Lesson.location
-                ).join(Lesson, Lesson.teacher_id == Teacher.id)\
-                 .join(Subject, Subject.id == Lesson.subject_id)\
-                 .join(Group, Group.id == Lesson.group_id)\
-                 .filter(Lesson.date_time.between(start_date, end_date + timedelta(days=1)))
-                
-                if teacher_id:
-                    query = query.filter(Teacher.id == teacher_id)
-                
-                results = query.all()
-                
-                self.teacher_lessons_table.setRowCount(len(results))
-                for row, (last_name, first_name, patronymic, subject_name, group_name, date_time, location) in enumerate(results):
-                    teacher_name = f"{last_name} {first_name} {patronymic or ''}".strip()
-                    
-                    self.teacher_lessons_table.setItem(row, 0, QTableWidgetItem(teacher_name))
-                    self.teacher_lessons_table.setItem(row, 1, QTableWidgetItem(subject_name))
-                    self.teacher_lessons_table.setItem(row, 2, QTableWidgetItem(group_name))
-                    self.teacher_lessons_table.setItem(row, 3, QTableWidgetItem(date_time.strftime("%d.%m.%Y %H:%M")))
-                    self.teacher_lessons_table.setItem(row, 4, QTableWidgetItem(location or ""))
-        except Exception as e:
-            logger.error(f"Ошибка генерации отчета о уроках преподавателя: {str(e)}")
-            show_error("Ошибка", "Не удалось сформировать отчет")
+        self.run_report(
+            'teacher_lessons', self.teacher_lessons_table,
+            ReportQueries.teacher_lessons, ReportQueries.teacher_lessons_row,
+            self.teacher_start_date.date().toPyDate(),
+            self.teacher_end_date.date().toPyDate(),
+            teacher_id=self.teacher_filter.currentData()
+        )
     
     @handle_exceptions
     def export_teacher_lessons_report(self, checked=None):
@@ -735,72 +714,22 @@ class ReportsWindow(QWidget):
             'date': 'Дата',
             'location': 'Место проведения'
         }
-        export_report(self, self.teacher_lessons_table, columns, self.report_generator, self.teacher_pdf_radio)
-    
-    @handle_exceptions
-    def generate_date_attendance_report(self, checked=None):
-        """Генерирует отчет о посещаемости по датам"""
-        # The 'checked' parameter is for signal compatibility
-        try:
-            start_date = self.date_start_date.date().toPyDate()
-            end_date = self.date_end_date.date().toPyDate()
-            
-            with get_session() as db:
-                # Подзапрос для подсчета занятий по датам
-                query = db.query(
-                    func.date(Lesson.date_time).label('lesson_date'),
-                    func.count(Lesson.id).label('lesson_count'),
-                    func.avg(case((Attendance.status == 'present', 100.0), else_=0)).label('attendance_percent')
-                ).outerjoin(Attendance, Attendance.lesson_id == Lesson.id)\
-                 .filter(Lesson.date_time.between(start_date, end_date + timedelta(days=1)))\
-                 .group_by(func.date(Lesson.date_time))\
-                 .order_by(func.date(Lesson.date_time))
-                
-                results = query.all()
-                
-                self.date_attendance_table.setRowCount(len(results))
-                for row, (lesson_date, lesson_count, attendance_percent) in enumerate(results):
-                    self.date_attendance_table.setItem(row, 0, QTableWidgetItem(lesson_date.strftime("%d.%m.%Y")))
-                    self.date_attendance_table.setItem(row, 1, QTableWidgetItem(str(lesson_count)))
-                    self.date_attendance_table.setItem(row, 2, QTableWidgetItem(f"{attendance_percent:.2f}%"))
-        except Exception as e:
-            logger.error(f"Ошибка генерации отчета о посещаемости по датам: {str(e)}")
-            show_error("Ошибка", "Не удалось сформировать отчет")
-    
-    @handle_exceptions
-    def export_date_attendance_report(self, checked=None):
-        """Экспортирует отчет о посещаемости по датам"""
-        # The 'checked' parameter is for signal compatibility
-        columns = {
-            'date': 'Дата',
-            'lesson_count': 'Количество занятий',
-            'attendance': 'Посещаемость (%)'
-        }
-        export_report(self, self.date_attendance_table, columns, self.report_generator, self.date_pdf_radio)
+        self.export_query_report(
+            columns, self.export_format('teacher'),
+            ReportQueries.teacher_lessons, ReportQueries.teacher_lessons_row,
+            self.teacher_start_date.date().toPyDate(),
+            self.teacher_end_date.date().toPyDate(),
+            teacher_id=self.teacher_filter.currentData()
+        )
     
     @handle_exceptions
     def generate_group_size_report(self, checked=None):
         """Генерирует отчет о количестве студентов в каждой группе"""
         # The 'checked' parameter is for signal compatibility
-        try:
-            with get_session() as db:
-                query = db.query(
-                    Group.name,
-                    func.count(Student.id).label('student_count'),
-                    Group.description
-                ).outerjoin(Student, Student.group_id == Group.id)\
-                 .group_by(Group.id)
-                
-                results = query.all()
-                
-                self.group_size_table.setRowCount(len(results))
-                for row, (group_name, student_count, description) in enumerate(results):
-                    self.group_size_table.setItem(row, 0, QTableWidgetItem(group_name))
-                    self.group_size_table.setItem(row, 1, QTableWidgetItem(str(student_count)))
-                    self.group_size_table.setItem(row, 2, QTableWidgetItem(description or ""))
-        except Exception as e:
-            logger.error(f"Ошибка генерации отчета о количестве студентов в группах: {str(e)}")
-            show_error("Ошибка", "Не удалось сформировать отчет")
+        self.run_report(
+            'group_size', self.group_size_table,
+            ReportQueries.group_size, ReportQueries.group_size_row
+        )
     
     @handle_exceptions
     def export_group_size_report(self, checked=None):
@@ -811,160 +740,7 @@ class ReportsWindow(QWidget):
             'student_count': 'Количество студентов',
             'description': 'Описание'
         }
-        export_report(self, self.group_size_table, columns, self.report_generator, self.group_size_pdf_radio)
-    
-    @handle_exceptions
-    def generate_date_attendance_report(self, checked=None):
-        """Генерирует отчет о посещаемости по датам"""
-        # The 'checked' parameter is for signal compatibility
-        try:
-            start_date = self.date_start_date.date().toPyDate()
-            end_date = self.date_end_date.date().toPyDate()
-            
-            with get_session() as db:
-                # Подзапрос для подсчета занятий по датам
-                query = db.query(
-                    func.date(Lesson.date_time).label('lesson_date'),
-                    func.count(Lesson.id).label('lesson_count'),
-                    func.avg(case((Attendance.status == 'present', 100.0), else_=0)).label('attendance_percent')
-                ).outerjoin(Attendance, Attendance.lesson_id == Lesson.id)\
-                 .filter(Lesson.date_time.between(start_date, end_date + timedelta(days=1)))\
-                 .group_by(func.date(Lesson.date_time))\
-                 .order_by(func.date(Lesson.date_time))
-                
-                results = query.all()
-                
-                self.date_attendance_table.setRowCount(len(results))
-                for row, (lesson_date, lesson_count, attendance_percent) in enumerate(results):
-                    self.date_attendance_table.setItem(row, 0, QTableWidgetItem(lesson_date.strftime("%d.%m.%Y")))
-                    self.date_attendance_table.setItem(row, 1, QTableWidgetItem(str(lesson_count)))
-                    self.date_attendance_table.setItem(row, 2, QTableWidgetItem(f"{attendance_percent:.2f}%"))
-        except Exception as e:
-            logger.error(f"Ошибка генерации отчета о посещаемости по датам: {str(e)}")
-            show_error("Ошибка", "Не удалось сформировать отчет")
-    
-    @handle_exceptions
-    def export_date_attendance_report(self, checked=None):
-        """Экспортирует отчет о посещаемости по датам"""
-        # The 'checked' parameter is for signal compatibility
-        columns = {
-            'date': 'Дата',
-            'lesson_count': 'Количество занятий',
-            'attendance': 'Посещаемость (%)'
-        }
-        export_report(self, self.date_attendance_table, columns, self.report_generator, self.date_pdf_radio)
-    
-    @handle_exceptions
-    def generate_teacher_lessons_report(self, checked=None):
-        """Генерирует отчет о уроках, проведенных учителем"""
-        # The 'checked' parameter is for signal compatibility
-        try:
-            teacher_id = self.teacher_filter.currentData()
-            start_date = self.teacher_start_date.date().toPyDate()
-            end_date = self.teacher_end_date.date().toPyDate()
-            
-            with get_session() as db:
-                query = db.query(
-                    Teacher.last_name,
-                    Teacher.first_name,
-                    Teacher.patronymic,
-                    Subject.name.label('subject_name'),
-                    Group.name.label('group_name'),
-                    Lesson.date_time,
-                    Lesson.location
-                ).join(Lesson, Lesson.teacher_id == Teacher.id)\
-                 .join(Subject, Subject.id == Lesson.subject_id)\
-                 .join(Group, Group.id == Lesson.group_id)\
-                 .filter(Lesson.date_time.between(start_date, end_date + timedelta(days=1)))
-                
-                if teacher_id:
-                    query = query.filter(Teacher.id == teacher_id)
-                
-                results = query.all()
-                
-                self.teacher_lessons_table.setRowCount(len(results))
-                for row, (last_name, first_name, patronymic, subject_name, group_name, date_time, location) in enumerate(results):
-                    teacher_name = f"{last_name} {first_name} {patronymic or ''}".strip()
-                    
-                    self.teacher_lessons_table.setItem(row, 0, QTableWidgetItem(teacher_name))
-                    self.teacher_lessons_table.setItem(row, 1, QTableWidgetItem(subject_name))
-                    self.teacher_lessons_table.setItem(row, 2, QTableWidgetItem(group_name))
-                    self.teacher_lessons_table.setItem(row, 3, QTableWidgetItem(date_time.strftime("%d.%m.%Y %H:%M")))
-                    self.teacher_lessons_table.setItem(row, 4, QTableWidgetItem(location or ""))
-        except Exception as e:
-            logger.error(f"Ошибка генерации отчета о уроках преподавателя: {str(e)}")
-            show_error("Ошибка", "Не удалось сформировать отчет")
-    
-    @handle_exceptions
-    def export_teacher_lessons_report(self, checked=None):
-        """Экспортирует отчет о уроках, проведенных учителем"""
-        # The 'checked' parameter is for signal compatibility
-        columns = {
-            'teacher': 'Преподаватель',
-            'subject': 'Предмет',
-            'group': 'Группа',
-            'date': 'Дата',
-            'location': 'Место проведения'
-        }
-        export_report(self, self.teacher_lessons_table, columns, self.report_generator, self.teacher_pdf_radio)
-    
-    @handle_exceptions
-    def generate_date_attendance_report(self, checked=None):
-        """Генерирует отчет о посещаемости по датам"""
-        # The 'checked' parameter is for signal compatibility
-        try:
-            start_date = self.date_start_date.date().toPyDate()
-            end_date = self.date_end_date.date().toPyDate()
-            
-            with get_session() as db:
-                # Подзапрос для подсчета занятий по датам
-                query = db.query(
-                    func.date(Lesson.date_time).label('lesson_date'),
-                    func.count(Lesson.id).label('lesson_count'),
-                    func.avg(case((Attendance.status == 'present', 100.0), else_=0)).label('attendance_percent')
-                ).outerjoin(Attendance, Attendance.lesson_id == Lesson.id)\
-                 .filter(Lesson.date_time.between(start_date, end_date + timedelta(days=1)))\
-                 .group_by(func.date(Lesson.date_time))\
-                 .order_by(func.date(Lesson.date_time))
-                
-                results = query.all()
-                
-                self.date_attendance_table.setRowCount(len(results))
-                for row, (lesson_date, lesson_count, attendance_percent) in enumerate(results):
-                    self.date_attendance_table.setItem(row, 0, QTableWidgetItem(lesson_date.strftime("%d.%m.%Y")))
-                    self.date_attendance_table.setItem(row, 1, QTableWidgetItem(str(lesson_count)))
-                    self.date_attendance_table.setItem(row, 2, QTableWidgetItem(f"{attendance_percent:.2f}%"))
-        except Exception as e:
-            logger.error(f"Ошибка генерации отчета о посещаемости по датам: {str(e)}")
-            show_error("Ошибка", "Не удалось сформировать отчет")
-    
-    @handle_exceptions
-    def export_date_attendance_report(self, checked=None):
-        """Экспортирует отчет о посещаемости по датам"""
-        # The 'checked' parameter is for signal compatibility
-        columns = {
-            'date': 'Дата',
-            'lesson_count': 'Количество занятий',
-            'attendance': 'Посещаемость (%)'
-        }
-        export_report(self, self.date_attendance_table, columns, self.report_generator, self.date_pdf_radio)
-    
-    # @handle_exceptions
-    # def generate_group_size_report(self):
-    #     """Генерирует отчет о количестве студентов в каждой группе"""
-    #     try:
-    #         with get_session() as db:
-    #             query = db.query(
-    #                 Group.name,
-    #                 func.count(Student.id).label('student_count'),
-    #                 Group.description
-    #             ).outerjoin(Student, Student.group_id == Group.id)\
-    #              .group_by(Group.id)
-                
-    #             results = query.all()
-                
-    #             self.group_size_table.setRowCount(len(results))
-    #             for row, (group_name, student_count, description) in enumerate(results):
-    #                 self.group_size_table.setItem(row, 0, QTableWidgetItem(group_name))
-    #                 self.group_size_table.setItem(row, 1, QTableWidgetItem(str(student_count)))
-    #                 self.group_size_table.setItem(row, 2
\ No newline at end of file
+        self.export_query_report(
+            columns, self.export_format('group_size'),
+            ReportQueries.group_size, ReportQueries.group_size_row
+        )
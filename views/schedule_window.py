@@ -1,15 +1,24 @@
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout,
                              QTableWidget, QHeaderView,
-                             QComboBox, QTableWidgetItem, QHBoxLayout)
+                             QComboBox, QTableWidgetItem, QHBoxLayout,
+                             QDateEdit, QPushButton)
+from PyQt5.QtCore import QDate
 
 from database import get_session
+from services.query_executor import get_query_executor, set_busy
 from models import Lesson, Group, Subject,Teacher,User
 
-from utils import show_error, handle_exceptions
+from utils import show_error, handle_exceptions, week_range, month_range
 from utils import get_logger
 
 logger = get_logger()
 
+# Окна расписания: подпись и функция полуоткрытого интервала, содержащего дату
+SCHEDULE_PERIODS = {
+    'week': ("Неделя", week_range),
+    'month': ("Месяц", month_range),
+}
+
 
 class ScheduleWindow(QWidget):
     def __init__(self, role='student'):
@@ -17,8 +26,13 @@ class ScheduleWindow(QWidget):
         self.table = None
         self.subject_filter = None
         self.group_filter = None
+        self.period_filter = None
+        self.date_filter = None
+        self.prev_button = None
+        self.next_button = None
         self.filter_layout = None
         self.role = role
+        self.executor = get_query_executor()
         self.init_ui()
         self.load_filters()
         self.load_data()
@@ -35,6 +49,22 @@ class ScheduleWindow(QWidget):
         self.subject_filter = QComboBox()
         self.subject_filter.addItem("Все предметы", None)
 
+        # Окно расписания: неделя или месяц, содержащие выбранную дату
+        self.period_filter = QComboBox()
+        for period, (title, _) in SCHEDULE_PERIODS.items():
+            self.period_filter.addItem(title, period)
+
+        self.date_filter = QDateEdit()
+        self.date_filter.setCalendarPopup(True)
+        self.date_filter.setDate(QDate.currentDate())
+
+        self.prev_button = QPushButton("<")
+        self.next_button = QPushButton(">")
+
+        self.filter_layout.addWidget(self.period_filter)
+        self.filter_layout.addWidget(self.prev_button)
+        self.filter_layout.addWidget(self.date_filter)
+        self.filter_layout.addWidget(self.next_button)
         self.filter_layout.addWidget(self.group_filter)
         self.filter_layout.addWidget(self.subject_filter)
 
@@ -51,6 +81,23 @@ class ScheduleWindow(QWidget):
         # Сигналы
         self.group_filter.currentIndexChanged.connect(self.load_data)
         self.subject_filter.currentIndexChanged.connect(self.load_data)
+        self.period_filter.currentIndexChanged.connect(self.load_data)
+        self.date_filter.dateChanged.connect(self.load_data)
+        self.prev_button.clicked.connect(lambda: self.shift_period(-1))
+        self.next_button.clicked.connect(lambda: self.shift_period(1))
+
+    def shift_period(self, step):
+        """Переходит к предыдущей (step=-1) или следующей (step=1) неделе или месяцу"""
+        current = self.date_filter.date()
+        if self.period_filter.currentData() == 'week':
+            self.date_filter.setDate(current.addDays(7 * step))
+        else:
+            self.date_filter.setDate(current.addMonths(step))
+
+    def schedule_window(self):
+        """Полуоткрытый интервал [начало, конец) выбранной недели или месяца"""
+        _, period_range = SCHEDULE_PERIODS[self.period_filter.currentData()]
+        return period_range(self.date_filter.date().toPyDate())
 
     @handle_exceptions
     def load_filters(self):
@@ -69,34 +116,59 @@ class ScheduleWindow(QWidget):
             logger.error(f"Ошибка загрузки фильтров: {str(e)}")
             show_error("Ошибка", "Не удалось загрузить фильтры")
 
+    @staticmethod
+    def query_lessons(db, start, end, group_id=None, subject_id=None):
+        """Занятия расписания за [start, end) в виде строк таблицы (выполняется в фоновом потоке).
+
+        Выборка ограничена окном по date_time, поэтому время открытия не растет
+        с историей занятий; при выбранной группе окно и порядок (group_id,
+        date_time) берутся из индекса ix_lessons_group_id_date_time.
+        """
+        query = db.query(
+            Lesson.date_time,
+            Subject.name,
+            Teacher.last_name,
+            Teacher.first_name,
+            Teacher.patronymic,
+            Group.name
+        ).join(Teacher, Teacher.id == Lesson.teacher_id)\
+         .join(Subject, Subject.id == Lesson.subject_id)\
+         .join(Group, Lesson.group_id == Group.id)\
+         .filter(Lesson.date_time >= start, Lesson.date_time < end)\
+         .order_by(Lesson.group_id, Lesson.date_time)
+
+        # Применение фильтров
+        if group_id is not None:
+            query = query.filter(Lesson.group_id == group_id)
+        if subject_id is not None:
+            query = query.filter(Lesson.subject_id == subject_id)
+
+        return [
+            (date_time.strftime("%d.%m.%Y %H:%M"), subject_name,
+             f"{last_name} {first_name} {patronymic or ''}".strip(), group_name)
+            for date_time, subject_name, last_name, first_name, patronymic, group_name in query
+        ]
+
     @handle_exceptions
     def load_data(self, index=None):
-        try:
-            with get_session() as db:
-                query = db.query(Lesson).join(Teacher).join(Group, Lesson.group_id == Group.id)
-
-                # Применение фильтров
-                selected_group = self.group_filter.currentData()
-                if selected_group is not None:
-                    query = query.filter(Lesson.group_id == selected_group)
-
-                selected_subject = self.subject_filter.currentData()
-                if selected_subject is not None:
-                    query = query.filter(Lesson.subject_id == selected_subject)
-
-                lessons = query.all()
-
-                # Заполнение таблицы
-                self.table.setRowCount(len(lessons))
-                for row, lesson in enumerate(lessons):
-                    teacher = lesson.teacher
-                    teacher_full_name = f"{teacher.last_name} {teacher.first_name} {teacher.patronymic or ''}".strip()
-                    self.table.setItem(row, 0, QTableWidgetItem(lesson.date_time.strftime("%d.%m.%Y %H:%M")))
-                    self.table.setItem(row, 1, QTableWidgetItem(lesson.subject.name))
-                    self.table.setItem(row, 2, QTableWidgetItem(teacher_full_name))
-                    self.table.setItem(row, 3, QTableWidgetItem(lesson.group.name))
-        except Exception as e:
-            logger.error(f"Ошибка загрузки расписания: {str(e)}")
-            show_error("Ошибка", "Не удалось загрузить расписание")
-
-
+        set_busy(self.table, True)
+        self.executor.submit(
+            'schedule', self.query_lessons, *self.schedule_window(),
+            group_id=self.group_filter.currentData(),
+            subject_id=self.subject_filter.currentData(),
+            on_result=self.fill_table,
+            on_error=self.on_load_error
+        )
+
+    def fill_table(self, rows):
+        set_busy(self.table, False)
+        # Заполнение таблицы
+        self.table.setRowCount(len(rows))
+        for row, values in enumerate(rows):
+            for col, value in enumerate(values):
+                self.table.setItem(row, col, QTableWidgetItem(value))
+
+    def on_load_error(self, message):
+        set_busy(self.table, False)
+        logger.error(f"Ошибка загрузки расписания: {message}")
+        show_error("Ошибка", "Не удалось загрузить расписание")
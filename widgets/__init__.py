@@ -1,6 +1,13 @@
-# from .calendar import CalendarWidget
+from .calendar import CalendarWidget
 from .stats import StatsWidget
+from .attendance_table import AttendanceTableModel, StatusDelegate
+from .paged_table import KeysetTableModel
+from .lazy_tabs import LazyTabWidget
 
 __all__ = [
-    # 'CalendarWidget',
-     'StatsWidget']
\ No newline at end of file
+     'CalendarWidget',
+     'StatsWidget',
+     'AttendanceTableModel',
+     'StatusDelegate',
+     'KeysetTableModel',
+     'LazyTabWidget']
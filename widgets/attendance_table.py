@@ -0,0 +1,138 @@
+from PyQt5.QtWidgets import QStyledItemDelegate, QComboBox
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, pyqtSignal
+
+from models.attendance import STATUS_CODES, STATUS_LABELS
+
+# Индексы полей в строке модели
+STUDENT_ID, FULL_NAME, GROUP_NAME, SUBJECT_NAME, LESSON_ID, DATE_TIME, STATUS = range(7)
+STATUS_COLUMN = 4
+
+
+class AttendanceTableModel(QAbstractTableModel):
+    """Модель таблицы посещаемости на простых кортежах.
+
+    Строка: (student_id, full_name, group_name, subject_name, lesson_id, date_time, status).
+    Модель хранит набор измененных отметок (student_id, lesson_id) -> [старый, новый]
+    и обновляет сохраненные строки на месте.
+    """
+    changes_updated = pyqtSignal(int)
+
+    headers = ["Студент", "Группа", "Предмет", "Дата", "Присутствие"]
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.rows = []
+        self.row_by_key = {}
+        self.changes = {}
+        self.editable = False
+
+    def set_rows(self, rows):
+        self.beginResetModel()
+        self.rows = [list(row) for row in rows]
+        self.row_by_key = {(row[STUDENT_ID], row[LESSON_ID]): i for i, row in enumerate(self.rows)}
+        self.changes = {}
+        self.endResetModel()
+        self.changes_updated.emit(0)
+
+    def set_editable(self, editable):
+        self.editable = editable
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.headers)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.headers[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row = self.rows[index.row()]
+        column = index.column()
+
+        if role == Qt.DisplayRole:
+            if column == 0:
+                return row[FULL_NAME]
+            if column == 1:
+                return f"Группа {row[GROUP_NAME]}"
+            if column == 2:
+                return row[SUBJECT_NAME]
+            if column == 3:
+                return row[DATE_TIME].strftime("%d.%m.%Y %H:%M")
+            if column == STATUS_COLUMN:
+                return STATUS_LABELS.get(row[STATUS], STATUS_LABELS[None])
+        elif role == Qt.EditRole and column == STATUS_COLUMN:
+            return row[STATUS]
+        elif role == Qt.UserRole:
+            return row[STUDENT_ID], row[LESSON_ID], row[STATUS]
+        return None
+
+    def flags(self, index):
+        flags = super().flags(index)
+        if self.editable and index.column() == STATUS_COLUMN and self.rows[index.row()][LESSON_ID]:
+            flags |= Qt.ItemIsEditable
+        return flags
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if role != Qt.EditRole or index.column() != STATUS_COLUMN:
+            return False
+        row = self.rows[index.row()]
+        if row[STATUS] == value:
+            return False
+
+        key = (row[STUDENT_ID], row[LESSON_ID])
+        old_status = self.changes[key][0] if key in self.changes else row[STATUS]
+        if value == old_status:
+            self.changes.pop(key, None)
+        else:
+            self.changes[key] = [old_status, value]
+
+        row[STATUS] = value
+        self.dataChanged.emit(index, index, [Qt.DisplayRole, Qt.EditRole])
+        self.changes_updated.emit(len(self.changes))
+        return True
+
+    def pending_changes(self):
+        """Измененные отметки в виде {(student_id, lesson_id): новый статус}"""
+        return {key: new_status for key, (_, new_status) in self.changes.items()}
+
+    def undo_changes(self):
+        """Возвращает исходные отметки в измененных строках без перезагрузки"""
+        for key, (old_status, _) in self.changes.items():
+            row = self.row_by_key[key]
+            self.rows[row][STATUS] = old_status
+            self._emit_status_changed(row)
+        self.changes = {}
+        self.changes_updated.emit(0)
+
+    def commit_changes(self):
+        """Принимает текущие отметки как сохраненные"""
+        self.changes = {}
+        self.changes_updated.emit(0)
+
+    def _emit_status_changed(self, row):
+        index = self.index(row, STATUS_COLUMN)
+        self.dataChanged.emit(index, index, [Qt.DisplayRole, Qt.EditRole])
+
+
+class StatusDelegate(QStyledItemDelegate):
+    """Делегат, создающий выпадающий список только для редактируемой ячейки"""
+
+    def createEditor(self, parent, option, index):
+        combo = QComboBox(parent)
+        combo.addItems(["", *(STATUS_LABELS[code] for code in STATUS_CODES[1:])])
+        combo.activated.connect(lambda _: self.commitData.emit(combo))
+        return combo
+
+    def setEditorData(self, editor, index):
+        editor.setCurrentIndex(STATUS_CODES.index(index.data(Qt.EditRole)))
+
+    def setModelData(self, editor, model, index):
+        model.setData(index, STATUS_CODES[editor.currentIndex()], Qt.EditRole)
+
+    def updateEditorGeometry(self, editor, option, index):
+        editor.setGeometry(option.rect)
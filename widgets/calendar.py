@@ -1,53 +1,172 @@
-# from PyQt5.QtWidgets import QWidget, QVBoxLayout, QCalendarWidget, QTableWidget, QTableWidgetItem, QHeaderView
-# from PyQt5.QtCore import QDate, Qt
-
-# from database import get_session
-# from models import Lesson
-# from models import User
-# from utils import show_error
-
-
-# class CalendarWidget(QWidget):
-#     def __init__(self):
-#         super().__init__()
-#         self.init_ui()
-#         self.load_lessons(QDate.currentDate())
-
-#     def init_ui(self):
-#         self.layout = QVBoxLayout()
-
-#         # Календарь
-#         self.calendar = QCalendarWidget()
-#         self.calendar.setGridVisible(True)
-#         self.calendar.clicked.connect(self.on_date_selected)
-
-#         # Таблица занятий
-#         self.lessons_table = QTableWidget()
-#         self.lessons_table.setColumnCount(3)
-#         self.lessons_table.setHorizontalHeaderLabels(["Время", "Предмет", "Преподаватель"])
-#         self.lessons_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
-
-#         self.layout.addWidget(self.calendar)
-#         self.layout.addWidget(self.lessons_table)
-#         self.setLayout(self.layout)
-
-#     def on_date_selected(self, date: QDate):
-#         self.load_lessons(date)
-
-#     def load_lessons(self, date: QDate):
-#         try:
-#             with get_session() as db:
-#                 selected_date = date.toPyDate()
-
-#                 lessons = db.query(Lesson).filter(
-#                     Lesson.date_time >= selected_date,
-#                     Lesson.date_time < selected_date.replace(day=selected_date.day + 1)
-#                 ).join(User).all()
-
-#                 self.lessons_table.setRowCount(len(lessons))
-#                 for row, lesson in enumerate(lessons):
-#                     self.lessons_table.setItem(row, 0, QTableWidgetItem(lesson.date_time.strftime("%H:%M")))
-#                     self.lessons_table.setItem(row, 1, QTableWidgetItem(lesson.subject))
-#                     self.lessons_table.setItem(row, 2, QTableWidgetItem(lesson.teacher.login))
-#         except Exception as e:
-#             show_error("Ошибка", f"Не удалось загрузить занятия: {str(e)}")
\ No newline at end of file
+from collections import defaultdict
+from datetime import date
+
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QCalendarWidget, QTableWidget, QTableWidgetItem, QHeaderView
+from PyQt5.QtGui import QTextCharFormat, QFont
+from PyQt5.QtCore import QDate
+
+from models import Lesson, Subject, Teacher, Group
+from services.query_executor import get_query_executor, set_busy
+from services.report_cache import get_report_cache
+from utils import show_error, get_logger, month_range
+
+logger = get_logger()
+
+# Соседние месяцы, загружаемые вместе с видимым (до и после)
+PREFETCH_MONTHS = 1
+
+
+def add_months(month: date, count: int) -> date:
+    """Первое число месяца, отстоящего от month на count месяцев"""
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+class CalendarWidget(QWidget):
+    """Календарь занятий.
+
+    Занятия видимого и соседних месяцев загружаются одним фоновым запросом
+    и раскладываются в индекс {день: строки}, который календарь хранит сам
+    по месяцам (общий кэш отчетов не занимается и не влияет на его статистику).
+    Выбор даты и отметка дней с занятиями читают индекс без обращения к БД.
+    Изменение занятий в AdminWindow увеличивает версию кэша отчетов; индекс
+    сбрасывается, и при следующем показе месяцы загружаются заново.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.executor = get_query_executor()
+        self.cache = get_report_cache()  # Только версия данных для сброса индекса
+        self.months = {}  # Первое число месяца -> {день: строки таблицы}
+        self.loaded_version = None  # Версия данных, к которой относится индекс
+        self.init_ui()
+        self.load_months(self.visible_month())
+
+    def init_ui(self):
+        self.layout = QVBoxLayout()
+
+        # Календарь
+        self.calendar = QCalendarWidget()
+        self.calendar.setGridVisible(True)
+        self.calendar.selectionChanged.connect(self.show_selected_day)
+        self.calendar.currentPageChanged.connect(lambda year, month: self.load_months(date(year, month, 1)))
+
+        # Таблица занятий
+        self.lessons_table = QTableWidget()
+        self.lessons_table.setColumnCount(4)
+        self.lessons_table.setHorizontalHeaderLabels(["Время", "Предмет", "Преподаватель", "Группа"])
+        self.lessons_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+
+        self.layout.addWidget(self.calendar)
+        self.layout.addWidget(self.lessons_table)
+        self.setLayout(self.layout)
+
+    @staticmethod
+    def query_months(db, first_month, last_month):
+        """Индексы занятий по месяцам: {первое число месяца: {день: строки таблицы}}.
+
+        Все месяцы с first_month по last_month читаются одним запросом по
+        индексу ix_lessons_date_time (выполняется в фоновом потоке); месяцы
+        без занятий получают пустой индекс.
+        """
+        start, _ = month_range(first_month)
+        _, end = month_range(last_month)
+        query = db.query(
+            Lesson.date_time,
+            Subject.name,
+            Teacher.last_name,
+            Teacher.first_name,
+            Teacher.patronymic,
+            Group.name
+        ).join(Teacher, Teacher.id == Lesson.teacher_id)\
+         .join(Subject, Subject.id == Lesson.subject_id)\
+         .join(Group, Group.id == Lesson.group_id)\
+         .filter(Lesson.date_time >= start, Lesson.date_time < end)\
+         .order_by(Lesson.date_time)
+
+        months = {}
+        month = first_month
+        while month <= last_month:
+            months[month] = defaultdict(list)
+            month = add_months(month, 1)
+        for date_time, subject_name, last_name, first_name, patronymic, group_name in query:
+            day = date_time.date()
+            months[day.replace(day=1)][day].append((
+                date_time.strftime("%H:%M"), subject_name,
+                f"{last_name} {first_name} {patronymic or ''}".strip(), group_name
+            ))
+        return {month: dict(days) for month, days in months.items()}
+
+    def visible_month(self) -> date:
+        return date(self.calendar.yearShown(), self.calendar.monthShown(), 1)
+
+    def month_index(self, month: date):
+        """Индекс занятий месяца или None, если месяц не загружен"""
+        return self.months.get(month)
+
+    def drop_stale(self):
+        """Сбрасывает индекс, если данные изменились после его загрузки"""
+        if self.loaded_version != self.cache.version:
+            self.months = {}
+            self.loaded_version = self.cache.version
+
+    def load_months(self, month: date):
+        """Загружает видимый месяц и соседние, которых нет в индексе, одним запросом"""
+        self.drop_stale()
+        wanted = [add_months(month, offset) for offset in range(-PREFETCH_MONTHS, PREFETCH_MONTHS + 1)]
+        missing = [m for m in wanted if self.month_index(m) is None]
+        if not missing:
+            self.refresh_view()
+            return
+
+        version = self.loaded_version
+
+        def on_result(months):
+            set_busy(self.lessons_table, False)
+            if self.cache.version != version:
+                # Данные изменились во время загрузки: результат мог устареть
+                self.load_months(self.visible_month())
+                return
+            self.months.update(months)
+            self.refresh_view()
+
+        def on_error(message):
+            set_busy(self.lessons_table, False)
+            logger.error(f"Ошибка загрузки календаря: {message}")
+            show_error("Ошибка", "Не удалось загрузить занятия")
+
+        # Все недостающие месяцы окна читаются одним запросом от первого до последнего
+        set_busy(self.lessons_table, True)
+        self.executor.submit(
+            'calendar', self.query_months, missing[0], missing[-1],
+            on_result=on_result,
+            on_error=on_error
+        )
+
+    def refresh_view(self):
+        """Отмечает дни с занятиями видимых месяцев и показывает выбранный день"""
+        self.calendar.setDateTextFormat(QDate(), QTextCharFormat())  # Сбрасываем прежние отметки
+        marked = QTextCharFormat()
+        marked.setFontWeight(QFont.Bold)
+        month = self.visible_month()
+        for offset in range(-PREFETCH_MONTHS, PREFETCH_MONTHS + 1):
+            for day in self.month_index(add_months(month, offset)) or ():
+                self.calendar.setDateTextFormat(QDate(day), marked)
+        self.show_selected_day()
+
+    def show_selected_day(self):
+        """Показывает занятия выбранной даты из индекса месяца"""
+        selected = self.calendar.selectedDate().toPyDate()
+        days = self.month_index(selected.replace(day=1))
+        # Месяц еще загружается: таблица заполнится после загрузки (refresh_view)
+        lessons = days.get(selected, []) if days is not None else []
+        self.lessons_table.setRowCount(len(lessons))
+        for row, values in enumerate(lessons):
+            for col, value in enumerate(values):
+                self.lessons_table.setItem(row, col, QTableWidgetItem(value))
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        # Занятия могли измениться на вкладке управления, пока календарь был скрыт
+        if self.loaded_version != self.cache.version:
+            self.load_months(self.visible_month())
@@ -0,0 +1,46 @@
+from PyQt5.QtWidgets import QTabWidget, QWidget, QVBoxLayout
+
+
+class LazyTabWidget(QTabWidget):
+    """Вкладки, содержимое которых создается при первом открытии.
+
+    Вместо готового виджета вкладка получает фабрику и пустую заготовку.
+    Фабрика вызывается один раз, когда вкладка становится текущей, поэтому
+    загрузка данных неоткрытых вкладок не замедляет появление окна.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._factories = {}  # заготовка -> фабрика содержимого
+        self._contents = {}  # заготовка -> созданное содержимое
+        self.currentChanged.connect(self.build_tab)
+
+    def add_lazy_tab(self, factory, title: str) -> int:
+        """Добавляет вкладку, содержимое которой вернет factory() при первом открытии"""
+        placeholder = QWidget()
+        layout = QVBoxLayout(placeholder)
+        layout.setContentsMargins(0, 0, 0, 0)
+        self._factories[placeholder] = factory
+        index = self.addTab(placeholder, title)
+        if index == self.currentIndex():
+            self.build_tab(index)
+        return index
+
+    def build_tab(self, index: int):
+        """Создает содержимое вкладки, если оно еще не создано"""
+        placeholder = self.widget(index)
+        factory = self._factories.pop(placeholder, None)
+        if factory is None:
+            return
+        content = factory()
+        placeholder.layout().addWidget(content)
+        self._contents[placeholder] = content
+
+    def content(self, index: int):
+        """Содержимое вкладки или None, если вкладку еще не открывали"""
+        return self._contents.get(self.widget(index))
+
+    def built_contents(self):
+        """Уже созданное содержимое вкладок в порядке вкладок"""
+        contents = (self.content(i) for i in range(self.count()))
+        return [content for content in contents if content is not None]
@@ -0,0 +1,86 @@
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, pyqtSignal
+
+from services.query_executor import get_query_executor
+
+# Количество строк, запрашиваемых за одну подгрузку
+PAGE_SIZE = 200
+
+
+class KeysetTableModel(QAbstractTableModel):
+    """Модель таблицы отчета с постраничной подгрузкой при прокрутке.
+
+    Страницы читает page_fn(db, after, limit) -> (строки, ключ последней строки)
+    в фоне через QueryExecutor. Представление вызывает fetchMore, когда
+    пользователь докручивает до конца загруженных строк; страница короче limit
+    означает, что данные закончились.
+    """
+    page_loaded = pyqtSignal(int)  # Всего загружено строк
+    load_failed = pyqtSignal(str)
+
+    def __init__(self, headers, key, executor=None, page_size=PAGE_SIZE, parent=None):
+        super().__init__(parent)
+        self.headers = headers
+        self.key = key
+        self.executor = executor or get_query_executor()
+        self.page_size = page_size
+        self.page_fn = None
+        self.rows = []
+        self.last_key = None
+        self.exhausted = True
+        self.loading = False
+
+    def reset(self, page_fn):
+        """Сбрасывает строки и начинает загрузку с первой страницы"""
+        self.beginResetModel()
+        self.page_fn = page_fn
+        self.rows = []
+        self.last_key = None
+        self.exhausted = False
+        self.loading = False
+        self.endResetModel()
+        self.fetchMore()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.headers)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.headers[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if index.isValid() and role == Qt.DisplayRole:
+            return self.rows[index.row()][index.column()]
+        return None
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self.page_fn is not None and not self.exhausted and not self.loading
+
+    def fetchMore(self, parent=QModelIndex()):
+        if not self.canFetchMore(parent):
+            return
+        self.loading = True
+        # Новый запрос с тем же ключом отменяет страницу от предыдущих фильтров
+        self.executor.submit(
+            self.key, self.page_fn, self.last_key, self.page_size,
+            on_result=self._append_page, on_error=self._on_error
+        )
+
+    def _append_page(self, page):
+        rows, last_key = page
+        self.loading = False
+        if rows:
+            self.beginInsertRows(QModelIndex(), len(self.rows), len(self.rows) + len(rows) - 1)
+            self.rows.extend(rows)
+            self.endInsertRows()
+            self.last_key = last_key
+        self.exhausted = len(rows) < self.page_size
+        self.page_loaded.emit(len(self.rows))
+
+    def _on_error(self, message):
+        self.loading = False
+        self.exhausted = True
+        self.load_failed.emit(message)
@@ -1,11 +1,152 @@
-from PyQt5.QtWidgets import QWidget, QVBoxLayout, QPushButton, QGridLayout, QTabWidget, QComboBox, QHBoxLayout, QLabel
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg
-from matplotlib.figure import Figure
-from database import get_session
-from models import Student, Attendance, Group, Subject, Lesson
-from utils import show_error
-from sqlalchemy.sql import func, case
-from datetime import datetime, timedelta
+from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QPushButton, QGridLayout, QTabWidget, QComboBox, QHBoxLayout,
+                             QLabel, QDateEdit)
+from PyQt5.QtCore import QDate
+from services.query_executor import get_query_executor, set_busy
+from services.report_cache import get_report_cache
+from services.trend_analytics import TrendAnalytics, TREND_PERCENTILES
+from models import AttendanceDaily, Group, Subject
+from utils import show_error, month_range
+from sqlalchemy import tuple_, literal, case
+from sqlalchemy.sql import func
+from datetime import date, datetime, timedelta
+
+# Графики вкладок: (заголовок, подпись оси Y, верхняя граница оси Y или None)
+CHARTS = (
+    ("Средняя посещаемость по группам за {month}", "Посещаемость (%)", 100),
+    ("Средняя посещаемость по предметам за {month}", "Посещаемость (%)", 100),
+    ("Количество занятий по предметам за {month}", "Количество занятий", None),
+)
+
+BAR_WIDTH = 0.8
+# Вкладка динамики посещаемости идет после графиков CHARTS
+TREND_INDEX = len(CHARTS)
+# Наибольшее число точек дневных рядов на графике динамики
+TREND_MAX_POINTS = 200
+# Окно скользящей посещаемости на графике динамики (дни)
+TREND_WINDOW = 7
+
+
+class _BarChart:
+    """Столбчатая диаграмма, которая обновляется без пересоздания осей.
+
+    Оси, столбцы и подписи значений создаются один раз; при обновлении
+    меняются высоты, тексты и пределы осей, а лишние столбцы удаляются
+    или недостающие добавляются. Разметка (tight_layout) пересчитывается,
+    только если изменились подписи категорий.
+    """
+
+    def __init__(self, figure, canvas, ylabel, ylim):
+        self.figure = figure
+        self.canvas = canvas
+        self.ylim = ylim
+        self.ax = figure.add_subplot(111)
+        self.ax.set_ylabel(ylabel)
+        if ylim:
+            self.ax.set_ylim(0, ylim)
+        self.bars = []
+        self.value_labels = []
+        self.categories = None
+        self.dirty = False  # Данные обновлены, но холст еще не перерисован
+        self.layout_dirty = True
+
+    def update(self, title, categories, values):
+        from matplotlib.patches import Rectangle
+
+        # Лишние столбцы удаляем, недостающие добавляем
+        for artist in self.bars[len(values):] + self.value_labels[len(values):]:
+            artist.remove()
+        del self.bars[len(values):], self.value_labels[len(values):]
+        for x in range(len(self.bars), len(values)):
+            self.bars.append(self.ax.add_patch(Rectangle((x - BAR_WIDTH / 2, 0), BAR_WIDTH, 0, color='C0')))
+            self.value_labels.append(self.ax.text(x, 0, '', ha='center', va='bottom'))
+
+        for x, (bar, label, value) in enumerate(zip(self.bars, self.value_labels, values)):
+            bar.set_height(value)
+            label.set_position((x, value))
+            # Format all values as integers for better readability
+            label.set_text(f'{int(value)}')
+
+        self.ax.set_title(title)
+        self.ax.set_xlim(-0.5, max(len(values), 1) - 0.5)
+        if not self.ylim:
+            self.ax.set_ylim(0, max(values, default=0) * 1.1 or 1)
+        if categories != self.categories:
+            self.ax.set_xticks(range(len(categories)))
+            self.ax.set_xticklabels(categories, rotation=45)
+            self.categories = categories
+            self.layout_dirty = True
+        self.dirty = True
+
+    def redraw(self):
+        """Планирует перерисовку холста в ближайшем цикле событий"""
+        if self.layout_dirty:
+            self.figure.tight_layout()
+            self.layout_dirty = False
+        self.canvas.draw_idle()
+        self.dirty = False
+
+
+class _TrendChart:
+    """График динамики: скользящая посещаемость с полосой процентилей
+    и изменение посещаемости неделя к неделе.
+
+    Линии создаются один раз и получают новые данные при обновлении;
+    полоса процентилей и столбцы недель пересоздаются (это по одному объекту).
+    """
+
+    def __init__(self, figure, canvas):
+        from matplotlib.dates import AutoDateLocator, ConciseDateFormatter
+
+        self.figure = figure
+        self.canvas = canvas
+        self.ax, self.delta_ax = figure.subplots(2, 1, sharex=True, gridspec_kw={'height_ratios': (3, 1)})
+        self.ax.set_ylabel("Посещаемость (%)")
+        self.ax.set_ylim(0, 100)
+        self.delta_ax.set_ylabel("К прошлой неделе (п.п.)")
+        self.delta_ax.axhline(0, color='grey', linewidth=0.8)
+        locator = AutoDateLocator()
+        self.delta_ax.xaxis.set_major_locator(locator)
+        self.delta_ax.xaxis.set_major_formatter(ConciseDateFormatter(locator))
+        low, _, high = TREND_PERCENTILES
+        self.rolling_line, = self.ax.plot([], [], color='C0', label="Общая")
+        self.median_line, = self.ax.plot([], [], color='C1', linestyle='--', label="Медиана")
+        self.band_label = f"{low}-{high} процентили"
+        self.band = None
+        self.delta_bars = None
+        self.dirty = False  # Данные обновлены, но холст еще не перерисован
+        self.layout_dirty = True
+
+    def update(self, title, trend):
+        import numpy as np
+
+        days = trend['days']
+        low, median, high = trend['percentiles']
+        self.rolling_line.set_data(days, trend['rolling'])
+        self.median_line.set_data(days, median)
+        if self.band is not None:
+            self.band.remove()
+        self.band = self.ax.fill_between(days, low, high, color='C1', alpha=0.2, linewidth=0,
+                                         label=self.band_label)
+        if self.delta_bars is not None:
+            self.delta_bars.remove()
+        delta = np.nan_to_num(trend['week_delta'])
+        self.delta_bars = self.delta_ax.bar(trend['weeks'], delta, width=6, align='edge',
+                                            color=np.where(delta < 0, 'C3', 'C2'))
+        self.ax.set_title(title)
+        self.ax.legend(loc='lower left')
+        if len(days):
+            self.ax.set_xlim(days[0], max(days[-1], trend['weeks'][-1] + np.timedelta64(7, 'D')))
+        limit = np.nanmax(np.abs(delta), initial=0) * 1.1 or 1
+        self.delta_ax.set_ylim(-limit, limit)
+        self.dirty = True
+
+    def redraw(self):
+        """Планирует перерисовку холста в ближайшем цикле событий"""
+        if self.layout_dirty:
+            self.figure.tight_layout()
+            self.layout_dirty = False
+        self.canvas.draw_idle()
+        self.dirty = False
 
 
 class StatsWidget(QWidget):
@@ -13,10 +154,16 @@ class StatsWidget(QWidget):
     
     def __init__(self):
         super().__init__()
+        self.executor = get_query_executor()
+        self.cache = get_report_cache()
         self.init_ui()
         self.plot_data()
 
     def init_ui(self):
+        # matplotlib загружается при первом открытии статистики, а не при старте приложения
+        from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg
+        from matplotlib.figure import Figure
+
         layout = QVBoxLayout()
         
         # Create tab widget
@@ -33,9 +180,9 @@ class StatsWidget(QWidget):
         self.tab3_layout = QVBoxLayout()
         
         # Create month selectors for each tab
-        self.month_selector1 = self._create_month_selector()
-        self.month_selector2 = self._create_month_selector()
-        self.month_selector3 = self._create_month_selector()
+        self.month_selector1 = self._create_month_selector(0)
+        self.month_selector2 = self._create_month_selector(1)
+        self.month_selector3 = self._create_month_selector(2)
         
         self.tab1_layout.addLayout(self.month_selector1)
         self.tab2_layout.addLayout(self.month_selector2)
@@ -55,6 +202,11 @@ class StatsWidget(QWidget):
         self.tab1_layout.addWidget(self.canvas1)
         self.tab2_layout.addWidget(self.canvas2)
         self.tab3_layout.addWidget(self.canvas3)
+        self.canvases = [self.canvas1, self.canvas2, self.canvas3]
+        self.charts = [
+            _BarChart(figure, canvas, ylabel, ylim)
+            for figure, canvas, (_, ylabel, ylim) in zip((self.figure1, self.figure2, self.figure3), self.canvases, CHARTS)
+        ]
         
         # Set layouts to tabs
         self.tab1.setLayout(self.tab1_layout)
@@ -65,6 +217,8 @@ class StatsWidget(QWidget):
         self.tabs.addTab(self.tab1, "Посещаемость по группам")
         self.tabs.addTab(self.tab2, "Посещаемость по предметам")
         self.tabs.addTab(self.tab3, "Количество занятий за месяц")
+        self.init_trend_tab(Figure, FigureCanvasQTAgg)
+        self.tabs.currentChanged.connect(self.redraw_current_chart)
         
         # Кнопка обновления
         self.btn_refresh = QPushButton("Обновить данные")
@@ -76,130 +230,237 @@ class StatsWidget(QWidget):
         
         self.setLayout(layout)
 
-    def _create_month_selector(self):
+    def init_trend_tab(self, figure_class, canvas_class):
+        """Вкладка динамики посещаемости за произвольный период (по умолчанию - учебный год)"""
+        self.tab4 = QWidget()
+        self.tab4_layout = QVBoxLayout()
+
+        filter_layout = QHBoxLayout()
+        self.trend_start_date = QDateEdit()
+        self.trend_start_date.setCalendarPopup(True)
+        self.trend_start_date.setDate(QDate(TrendAnalytics.academic_year_start(date.today())))
+        self.trend_end_date = QDateEdit()
+        self.trend_end_date.setCalendarPopup(True)
+        self.trend_end_date.setDate(QDate.currentDate())
+        self.trend_series = QComboBox()
+        self.trend_series.addItem("По группам", 'group')
+        self.trend_series.addItem("По предметам", 'subject')
+        for signal in (self.trend_start_date.dateChanged, self.trend_end_date.dateChanged,
+                       self.trend_series.currentIndexChanged):
+            signal.connect(lambda _: self.refresh_trend())
+
+        filter_layout.addWidget(QLabel("С:"))
+        filter_layout.addWidget(self.trend_start_date)
+        filter_layout.addWidget(QLabel("По:"))
+        filter_layout.addWidget(self.trend_end_date)
+        filter_layout.addWidget(self.trend_series)
+        filter_layout.addStretch()
+        self.tab4_layout.addLayout(filter_layout)
+
+        self.figure4 = figure_class(figsize=(10, 6))
+        self.canvas4 = canvas_class(self.figure4)
+        self.tab4_layout.addWidget(self.canvas4)
+        self.canvases.append(self.canvas4)
+        self.charts.append(_TrendChart(self.figure4, self.canvas4))
+
+        self.tab4.setLayout(self.tab4_layout)
+        self.tabs.addTab(self.tab4, "Динамика посещаемости")
+
+    def trend_params(self):
+        """Выбранные (начало, конец, ряды) вкладки динамики"""
+        return (self.trend_start_date.date().toPyDate(), self.trend_end_date.date().toPyDate(),
+                self.trend_series.currentData())
+
+    def _create_month_selector(self, index):
         layout = QHBoxLayout()
         month_selector = QComboBox()
         current_date = datetime.now()
 
         for i in range(12):
             month_delta = timedelta(days=30.44 * i)  # Average month length
-            date = (current_date - month_delta).replace(day=1)
-            month_name = self.months_ru[date.month - 1]
-            month_selector.addItem(f"{month_name} {date.year}", date)
+            month = (current_date - month_delta).date().replace(day=1)
+            month_name = self.months_ru[month.month - 1]
+            month_selector.addItem(f"{month_name} {month.year}", month)
 
-        month_selector.currentIndexChanged.connect(self.plot_data)
+        # Смена месяца обновляет только график своей вкладки
+        month_selector.currentIndexChanged.connect(lambda _, index=index: self.refresh_charts([index]))
         layout.addWidget(QLabel("Выберите месяц:"))
         layout.addWidget(month_selector)
         layout.addStretch()
         return layout
 
+    def selected_month(self, index):
+        selector = (self.month_selector1, self.month_selector2, self.month_selector3)[index]
+        return selector.itemAt(1).widget().currentData()
+
+    @staticmethod
+    def month_stats_query(db, month):
+        """Агрегаты всех трех графиков за месяц одним запросом (выполняется в фоновом потоке).
+
+        Данные берутся из сводки attendance_daily. Строки по группам и по
+        предметам считаются одной группировкой GROUPING SETS; для других СУБД
+        (SQLite в тестах) те же строки собираются через UNION ALL. Колонка
+        by_subject отличает строки предметов от строк групп.
+        """
+        start_date, end_date = (d.date() for d in month_range(month))
+        marked = func.sum(AttendanceDaily.present_count + AttendanceDaily.late_count +
+                          AttendanceDaily.absent_count + AttendanceDaily.sick_count)
+        aggregates = (
+            func.sum(AttendanceDaily.present_count).label('present'),
+            func.sum(AttendanceDaily.present_count + AttendanceDaily.late_count).label('attended'),
+            marked.label('marked'),
+            func.sum(AttendanceDaily.lesson_count).label('lesson_count')
+        )
+
+        def month_query(*columns):
+            return db.query(*columns, *aggregates)\
+                .join(Group, Group.id == AttendanceDaily.group_id)\
+                .join(Subject, Subject.id == AttendanceDaily.subject_id)\
+                .filter(AttendanceDaily.day >= start_date, AttendanceDaily.day < end_date)
+
+        if db.get_bind().dialect.name == 'postgresql':
+            by_subject = func.grouping(AttendanceDaily.group_id)
+            return month_query(
+                by_subject.label('by_subject'),
+                case((by_subject == 0, Group.name), else_=Subject.name).label('name')
+            ).group_by(func.grouping_sets(
+                tuple_(AttendanceDaily.group_id, Group.name),
+                tuple_(AttendanceDaily.subject_id, Subject.name)
+            ))
+
+        by_group = month_query(literal(0).label('by_subject'), Group.name.label('name'))\
+            .group_by(AttendanceDaily.group_id, Group.name)
+        by_subject = month_query(literal(1).label('by_subject'), Subject.name.label('name'))\
+            .group_by(AttendanceDaily.subject_id, Subject.name)
+        return by_group.union_all(by_subject)
+
+    @staticmethod
+    def query_stats(db, months):
+        """Данные графиков по месяцам: {месяц: (по группам, по предметам, занятия)}.
+
+        Каждый ряд - список пар (подпись, значение). На каждый месяц выполняется
+        один запрос, поэтому при совпадающих месяцах вкладок он один.
+        """
+        results = {}
+        for month in set(months):
+            by_group, by_subject, lessons = [], [], []
+            for row in StatsWidget.month_stats_query(db, month):
+                if row.by_subject:
+                    lessons.append((row.name, row.lesson_count))
+                    if row.marked:
+                        by_subject.append((row.name, 100.0 * row.present / row.marked))
+                elif row.marked:
+                    by_group.append((f"Группа {row.name}", 100.0 * row.attended / row.marked))
+            results[month] = (by_group, by_subject, lessons)
+        return results
+
     def plot_data(self):
+        """Обновляет все графики"""
+        self.refresh_charts(range(len(CHARTS)))
+        self.refresh_trend()
+
+    def refresh_charts(self, indexes):
+        """Обновляет указанные графики: из кэша или одним фоновым запросом на месяц"""
+        months = {index: self.selected_month(index) for index in indexes}
+        missing = []
+        for index, month in months.items():
+            found, stats = self.cache.get(self.cache.make_key('stats', month))
+            if found:
+                self.draw_chart(index, month, stats)
+            else:
+                missing.append(index)
+        if not missing:
+            return
+
+        def on_result(results):
+            for month, stats in results.items():
+                self.cache.put(self.cache.make_key('stats', month), stats)
+            self.set_charts_busy(missing, False)
+            for index in missing:
+                # Пока шел запрос, на вкладке могли выбрать другой месяц
+                if self.selected_month(index) == months[index]:
+                    self.draw_chart(index, months[index], results[months[index]])
+
+        def on_error(message):
+            self.set_charts_busy(missing, False)
+            show_error("Ошибка", f"Не удалось построить график: {message}")
+
+        # Ключ зависит от набора графиков: смена месяца на одной вкладке
+        # не отменяет запрос для остальных
+        self.set_charts_busy(missing, True)
+        self.executor.submit(
+            'stats_' + '_'.join(map(str, missing)), self.query_stats,
+            [months[index] for index in missing],
+            on_result=on_result,
+            on_error=on_error
+        )
+
+    def set_charts_busy(self, indexes, busy):
+        # Селекторы месяцев остаются доступными: новый выбор отменяет устаревший запрос
+        for index in indexes:
+            set_busy(self.canvases[index], busy)
+
+    def draw_chart(self, index, month, stats):
+        title, _, _ = CHARTS[index]
+        categories = [label for label, _ in stats[index]]
+        values = [value or 0 for _, value in stats[index]]
         try:
-            with get_session() as db:
-                # Get selected dates for each tab
-                selected_date1 = self.month_selector1.itemAt(1).widget().currentData()
-                selected_date2 = self.month_selector2.itemAt(1).widget().currentData()
-                selected_date3 = self.month_selector3.itemAt(1).widget().currentData()
-
-                # Calculate date ranges for each tab
-                start_date1 = selected_date1.replace(day=1)
-                end_date1 = (start_date1 + timedelta(days=32)).replace(day=1) - timedelta(days=1)
-
-                start_date2 = selected_date2.replace(day=1)
-                end_date2 = (start_date2 + timedelta(days=32)).replace(day=1) - timedelta(days=1)
-
-                start_date3 = selected_date3.replace(day=1)
-                end_date3 = (start_date3 + timedelta(days=32)).replace(day=1) - timedelta(days=1)
-
-                # 1. Посещаемость по группам
-                attendance_by_group = db.query(
-                    Student.group_id,
-                    Group.name,
-                    (100.0 * func.count(case((Attendance.status.in_(['present', 'late']), 1))).label('present_count') / 
-                    func.count(Attendance.status)).label('attendance_rate')
-                ).select_from(Student).join(Group, Student.group_id == Group.id)\
-                 .join(Attendance, Attendance.student_id == Student.id)\
-                 .join(Lesson, Lesson.id == Attendance.lesson_id)\
-                 .filter(Lesson.date_time >= start_date1, Lesson.date_time <= end_date1)\
-                 .group_by(Student.group_id, Group.name).all()
-
-                # 2. Посещаемость по предметам
-                attendance_by_subject = db.query(
-                    Subject.id,
-                    Subject.name,
-                    (100.0 * func.count(case((Attendance.status == 'present', 1))).label('present_count') / func.count(Attendance.status)).label('attendance_rate')
-                ).select_from(Subject).join(Lesson, Lesson.subject_id == Subject.id)\
-                 .join(Attendance, Attendance.lesson_id == Lesson.id)\
-                 .filter(Lesson.date_time >= start_date2, Lesson.date_time <= end_date2)\
-                 .group_by(Subject.id, Subject.name).all()
-
-                # 3. Количество предметов за месяц
-                subjects_per_month = db.query(
-                    Subject.name,
-                    func.count(Lesson.id).label('lesson_count')
-                ).join(Lesson).filter(
-                    Lesson.date_time >= start_date3,
-                    Lesson.date_time <= end_date3
-                ).group_by(Subject.name).all()
-
-            # Очистка и подготовка графиков
-            self.figure1.clear()
-            self.figure2.clear()
-            self.figure3.clear()
-
-            # График 1: Посещаемость по группам
-            ax1 = self.figure1.add_subplot(111)
-            groups = [f"Группа {g.name}" for g in attendance_by_group]
-            rates = [g.attendance_rate or 0 for g in attendance_by_group]
-            bars1 = ax1.bar(groups, rates)
-            month_name1 = self.months_ru[selected_date1.month - 1]
-            ax1.set_title(f"Средняя посещаемость по группам за {month_name1} {selected_date1.year}")
-            ax1.set_ylabel("Посещаемость (%)")
-            ax1.set_ylim(0, 100)
-            ax1.tick_params(axis='x', rotation=45)
-            self._add_value_labels(ax1, bars1)
-
-            # График 2: Посещаемость по предметам
-            ax2 = self.figure2.add_subplot(111)
-            subjects = [s.name for s in attendance_by_subject]
-            subject_rates = [s.attendance_rate or 0 for s in attendance_by_subject]
-            bars2 = ax2.bar(subjects, subject_rates)
-            month_name2 = self.months_ru[selected_date2.month - 1]
-            ax2.set_title(f"Средняя посещаемость по предметам за {month_name2} {selected_date2.year}")
-            ax2.set_ylabel("Посещаемость (%)")
-            ax2.set_ylim(0, 100)
-            ax2.tick_params(axis='x', rotation=45)
-            self._add_value_labels(ax2, bars2)
-
-            # График 3: Количество занятий по предметам за месяц
-            ax3 = self.figure3.add_subplot(111)
-            monthly_subjects = [s.name for s in subjects_per_month]
-            lesson_counts = [s.lesson_count for s in subjects_per_month]
-            bars3 = ax3.bar(monthly_subjects, lesson_counts)
-            month_name3 = self.months_ru[selected_date3.month - 1]
-            ax3.set_title(f"Количество занятий по предметам за {month_name3} {selected_date3.year}")
-            ax3.set_ylabel("Количество занятий")
-            ax3.tick_params(axis='x', rotation=45)
-            self._add_value_labels(ax3, bars3)
-
-            # Автоматическая настройка макета
-            self.figure1.tight_layout()
-            self.figure2.tight_layout()
-            self.figure3.tight_layout()
-
-            # Обновление холстов
-            self.canvas1.draw()
-            self.canvas2.draw()
-            self.canvas3.draw()
+            self.charts[index].update(
+                title.format(month=f"{self.months_ru[month.month - 1]} {month.year}"), categories, values
+            )
+            # Скрытые вкладки перерисовываются при открытии
+            if self.isVisible() and self.tabs.currentIndex() == index:
+                self.charts[index].redraw()
+        except Exception as e:
+            show_error("Ошибка", f"Не удалось построить график: {str(e)}")
+
+    def refresh_trend(self):
+        """Обновляет график динамики: из кэша или одним фоновым запросом за период"""
+        params = self.trend_params()
+        start, end, by = params
+        if start > end:
+            return
+        key = self.cache.make_key('trend', *params)
+        found, trend = self.cache.get(key)
+        if found:
+            self.draw_trend(params, trend)
+            return
 
+        def on_result(result):
+            self.cache.put(key, result)
+            self.set_charts_busy([TREND_INDEX], False)
+            # Пока шел запрос, период могли изменить
+            if self.trend_params() == params:
+                self.draw_trend(params, result)
+
+        def on_error(message):
+            self.set_charts_busy([TREND_INDEX], False)
+            show_error("Ошибка", f"Не удалось построить график: {message}")
+
+        self.set_charts_busy([TREND_INDEX], True)
+        self.executor.submit(
+            'trend', TrendAnalytics.trend, start, end, by, TREND_WINDOW, TREND_MAX_POINTS,
+            on_result=on_result,
+            on_error=on_error
+        )
+
+    def draw_trend(self, params, trend):
+        start, end, by = params
+        series = "по группам" if by == 'group' else "по предметам"
+        title = (f"Посещаемость {series} за {TREND_WINDOW} дней"
+                 f" ({start:%d.%m.%Y} - {end:%d.%m.%Y}, рядов: {trend['series']})")
+        try:
+            self.charts[TREND_INDEX].update(title, trend)
+            if self.isVisible() and self.tabs.currentIndex() == TREND_INDEX:
+                self.charts[TREND_INDEX].redraw()
         except Exception as e:
             show_error("Ошибка", f"Не удалось построить график: {str(e)}")
-            print(show_error("Ошибка", f"Не удалось построить график: {str(e)}"))
 
-    def _add_value_labels(self, ax, bars):
-        for bar in bars:
-            height = bar.get_height()
-            # Format all values as integers for better readability
-            ax.text(bar.get_x() + bar.get_width() / 2., height,
-                    f'{int(height)}',
-                    ha='center', va='bottom')
\ No newline at end of file
+    def redraw_current_chart(self, index=None):
+        chart = self.charts[self.tabs.currentIndex()]
+        if chart.dirty:
+            chart.redraw()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.redraw_current_chart()